@@ -0,0 +1,194 @@
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from factory import Factory, SaveSnapshot
+from storage import ConflictError
+
+
+class AutoSaver:
+    """
+    Фоновое автосохранение завода.
+
+    Изменения завода отслеживаются по событиям; сохранение выполняется в
+    отдельном потоке после паузы delay без новых изменений (но не реже
+    чем через max_delay после первого несохраненного изменения), поэтому
+    серия изменений записывается одной записью. Под блокировкой lock
+    только фиксируется снимок (JSON-фрагменты цехов), запись файла идет
+    без нее - интерфейс не ждет диска. Все изменения завода из других
+    потоков должны выполняться под lock.
+    """
+
+    def __init__(self, factory: Factory, delay: float = 2.0, max_delay: float = 10.0):
+        """
+        Инициализация автосохранения.
+
+        Args:
+            factory: Завод
+            delay: Пауза без изменений перед сохранением (секунды)
+            max_delay: Наибольшая задержка сохранения при непрерывных изменениях (секунды)
+        """
+        self.factory = factory
+        self.delay = delay
+        self.max_delay = max(max_delay, delay)
+        self.lock = threading.RLock()
+        self.last_saved_version: Optional[int] = None
+        self.last_saved_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.saves = 0
+        self.__condition = threading.Condition()
+        self.__first_change: Optional[float] = None
+        self.__last_change = 0.0
+        self.__conflict = False
+        self.__stopped = False
+        self.__idle = threading.Event()
+        self.__idle.set()
+        self.__finished: Optional[SaveSnapshot] = None
+        self.__unsubscribe = factory.events.subscribe(lambda events: self.notify(), batched=True)
+        self.__thread = threading.Thread(target=self.__run, name="autosave", daemon=True)
+        self.__thread.start()
+
+    def notify(self) -> None:
+        """Отметка об изменении завода (вызывается подпиской на события)."""
+        now = time.monotonic()
+        with self.__condition:
+            if self.__first_change is None:
+                self.__first_change = now
+            self.__last_change = now
+            self.__condition.notify()
+
+    def __wait_for_changes(self) -> bool:
+        """Ожидание паузы после серии изменений; False - автосохранение остановлено."""
+        with self.__condition:
+            while not self.__stopped:
+                if self.__first_change is None:
+                    self.__condition.wait()
+                    continue
+                now = time.monotonic()
+                due = min(self.__last_change + self.delay, self.__first_change + self.max_delay)
+                if now >= due:
+                    self.__first_change = None
+                    return True
+                self.__condition.wait(due - now)
+            return False
+
+    def __run(self) -> None:
+        """Цикл фонового потока."""
+        while self.__wait_for_changes():
+            try:
+                self.__save()
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                self.__idle.set()
+
+    def __save(self) -> None:
+        """Одно фоновое сохранение."""
+        with self.lock:
+            # Запись идет без блокировки; save_now под блокировкой дожидается ее окончания
+            self.__idle.clear()
+            self.__apply_finished()
+            if self.__conflict:
+                # Файл изменил другой процесс: обычное сохранение с объединением
+                self.__conflict = False
+                try:
+                    if self.factory.save_data():
+                        self.__saved(self.factory.get_version())
+                except ConflictError as e:
+                    self.last_error = str(e)
+                return
+            snapshot = self.factory.capture_snapshot()
+        if snapshot is None:
+            return
+
+        if self.factory.write_snapshot(snapshot):
+            self.__finished = snapshot
+            # Учет записи - под блокировкой; если ее держит интерфейс, учет
+            # выполнит следующее сохранение или save_now
+            if self.lock.acquire(blocking=False):
+                try:
+                    self.__apply_finished()
+                finally:
+                    self.lock.release()
+        else:
+            self.__conflict = True
+            self.notify()
+
+    def __apply_finished(self) -> None:
+        """Учет записанного в фоне снимка (под блокировкой)."""
+        snapshot, self.__finished = self.__finished, None
+        if snapshot is not None:
+            self.factory.commit_snapshot(snapshot)
+            self.__saved(snapshot.header["version"])
+
+    def __saved(self, version: int) -> None:
+        """Обновление состояния после успешной записи."""
+        self.last_saved_version = version
+        self.last_saved_at = datetime.now()
+        self.last_error = None
+        self.saves += 1
+
+    def status(self) -> str:
+        """Строка состояния автосохранения для заголовка меню."""
+        with self.lock:
+            self.__apply_finished()
+            pending = self.factory.has_unsaved_changes()
+        if self.last_saved_version is not None:
+            text = (f"автосохранение: версия {self.last_saved_version} "
+                    f"в {self.last_saved_at:%H:%M:%S}")
+        elif self.factory.get_version():
+            text = f"сохранена версия {self.factory.get_version()}"
+        else:
+            text = "данные еще не сохранялись"
+        if pending:
+            text += ", есть несохраненные изменения"
+        if self.last_error:
+            text += f" (ошибка: {self.last_error})"
+        return text
+
+    def save_now(self) -> bool:
+        """
+        Немедленное сохранение (дожидается фоновой записи, если она идет).
+
+        Returns:
+            True если файл записан, False если изменений не было
+
+        Raises:
+            ConflictError: Если изменения конфликтуют с файлом
+        """
+        with self.lock:
+            self.__idle.wait()
+            self.__apply_finished()
+            with self.__condition:
+                self.__first_change = None
+                self.__conflict = False
+            saved = self.factory.save_data()
+            if saved:
+                self.__saved(self.factory.get_version())
+            return saved
+
+    def discard_pending(self) -> None:
+        """
+        Ожидание фоновой записи перед заменой данных завода (загрузкой файла).
+
+        Вызывается под lock вместе с загрузкой: записанный в фоне снимок
+        относится к прежнему состоянию завода и не учитывается, а
+        отложенное сохранение отменяется.
+        """
+        with self.lock:
+            self.__idle.wait()
+            self.__finished = None
+            with self.__condition:
+                self.__first_change = None
+                self.__conflict = False
+
+    def stop(self) -> None:
+        """Остановка фонового потока (несохраненные изменения остаются в журнале)."""
+        self.__unsubscribe()
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+        self.__thread.join()
+        with self.lock:
+            self.__apply_finished()
@@ -0,0 +1,496 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+NAMES = ["Иван", "Петр", "Анна", "Мария", "Олег", "Елена", "Сергей", "Ольга"]
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Волков"]
+ROLES = {"Turner": "Токарь", "Locksmith": "Слесарь", "Miller": "Фрезеровщик"}
+
+
+def generate_data_file(path: str, employees: int, workshops: int, seed: int = 0) -> None:
+    """
+    Генерация файла данных завода заданного размера.
+
+    Args:
+        path: Путь к создаваемому файлу
+        employees: Общее количество работников
+        workshops: Количество цехов
+        seed: Зерно генератора случайных чисел
+    """
+    rnd = random.Random(seed)
+    per_workshop = [employees // workshops] * workshops
+    for i in range(employees % workshops):
+        per_workshop[i] += 1
+
+    def person(emp_type):
+        data = {
+            "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "name": rnd.choice(NAMES),
+            "surname": rnd.choice(SURNAMES),
+            "age": rnd.randint(18, 65),
+            "gender": rnd.choice(("male", "female")),
+        }
+        if emp_type == "Chief":
+            data["post"] = "Начальник цеха"
+        else:
+            data["post"] = "Рабочий"
+            data["role"] = ROLES[emp_type]
+        data["type"] = emp_type
+        return data
+
+    header = {
+        "version": 1,
+        "factory_name": "ООО 'Промышленный Завод'",
+        "total_workshops": workshops,
+        "total_employees": employees,
+        "save_timestamp": "2025-01-01T00:00:00",
+    }
+    dumps = json.dumps
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(dumps(header, ensure_ascii=False)[:-1] + ', "workshops": [')
+        for w, count in enumerate(per_workshop):
+            staff = [person(rnd.choice(list(ROLES))) for _ in range(count)]
+            distribution = {}
+            for e in staff:
+                distribution[e["role"]] = distribution.get(e["role"], 0) + 1
+            workshop = {
+                "name": f"Цех {w + 1}",
+                "chief": person("Chief"),
+                "employees": staff,
+                "employee_count": count,
+                "distribution": distribution,
+            }
+            f.write(("" if w == 0 else ", ") + dumps(workshop, ensure_ascii=False))
+        f.write("]}")
+
+
+def bench_startup(args) -> None:
+    """Время до появления главного меню (запуск main.py в отдельном процессе)."""
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    data_file = os.path.join(workdir, "factory_data.json")
+    if not os.path.exists(data_file):
+        print(f"Генерация файла на {args.employees} работников...")
+        generate_data_file(data_file, args.employees, args.workshops)
+    print(f"Файл данных: {data_file} ({os.path.getsize(data_file) / 2**20:.1f} МБ)")
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(PROJECT_DIR, "main.py")],
+            cwd=workdir, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, encoding="utf-8"
+        )
+        for line in proc.stdout:
+            if "СИСТЕМА УПРАВЛЕНИЯ ЗАВОДОМ" in line:
+                timings.append((time.perf_counter() - start) * 1000)
+                break
+        proc.communicate("7\nn\n")
+
+    timings.sort()
+    print(f"Появление меню: медиана {timings[len(timings) // 2]:.1f} мс, "
+          f"минимум {timings[0]:.1f} мс, максимум {timings[-1]:.1f} мс")
+
+
+def bench_replay(args) -> None:
+    """Скорость восстановления из журнала: записей журнала в секунду поверх снимка."""
+    sys.path.insert(0, PROJECT_DIR)
+    import shutil
+    from employees import Gender
+    from factory import Factory
+    from wal import session_logs
+    from workers import Turner
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    for path in session_logs("factory_data.json"):
+        os.unlink(path)
+    print(f"Генерация файла на {args.employees} работников в {args.workshops} цехах...")
+    generate_data_file("factory_data.json", args.employees, args.workshops)
+
+    # Журнал: чередование приема и увольнения по одному работнику во все цеха
+    factory = Factory(snapshot_every=args.records + 1)
+    factory.recover()
+    workshops = factory.get_all_workshops()
+    rnd = random.Random(0)
+    hired = []
+    for i in range(args.records):
+        workshop = workshops[i % len(workshops)]
+        if hired and i % 3 == 2:
+            workshop, employee = hired.pop(rnd.randrange(len(hired)))
+            workshop.remove_employee(employee.get_id())
+        else:
+            employee = Turner(rnd.choice(NAMES), rnd.choice(SURNAMES), rnd.randint(18, 65), Gender.MALE)
+            workshop += employee
+            hired.append((workshop, employee))
+    factory.close()
+    journal = session_logs("factory_data.json")[0]
+    shutil.move(journal, "journal.bench")
+    print(f"Журнал: {args.records} записей, {os.path.getsize('journal.bench') / 2**20:.1f} МБ")
+
+    load_times, recover_times = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        Factory(use_wal=False).recover()
+        load_times.append(time.perf_counter() - start)
+
+        shutil.copy("journal.bench", "factory_data.json.bench.wal")
+        factory = Factory()
+        start = time.perf_counter()
+        _, replayed = factory.recover()
+        recover_times.append(time.perf_counter() - start)
+        factory.discard_journal()
+        factory.close()
+        assert replayed == args.records, replayed
+
+    load = sorted(load_times)[len(load_times) // 2]
+    recover = sorted(recover_times)[len(recover_times) // 2]
+    replay = max(recover - load, 1e-9)
+    print(f"Загрузка снимка: {load:.3f} с, восстановление: {recover:.3f} с (медианы)")
+    print(f"Повтор журнала: {replay:.3f} с, {args.records / replay:,.0f} записей/с")
+
+
+def bench_parallel(args) -> None:
+    """Время загрузки и сохранения (с холодным кешем) при разном числе процессов."""
+    sys.path.insert(0, PROJECT_DIR)
+    from factory import Factory
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    source = os.path.join(workdir, "factory_data.source.json")
+    if not os.path.exists(source):
+        print(f"Генерация файла на {args.employees} работников в {args.workshops} цехах...")
+        generate_data_file(source, args.employees, args.workshops)
+    os.chdir(workdir)
+
+    # Параллельный разбор работает с форматом, который пишет save_data
+    with open(source, 'rb') as src, open("factory_data.json", 'wb') as dst:
+        dst.write(src.read())
+    factory = Factory(use_wal=False)
+    factory.load_data()
+    factory.save_data()
+    with open("factory_data.json", 'rb') as f:
+        snapshot = f.read()
+    print(f"Файл данных: {len(snapshot) / 2**20:.1f} МБ, процессоров: {os.cpu_count()}")
+
+    print(f"{'процессов':>10} {'загрузка, с':>12} {'ускорение':>10} {'сохранение, с':>14} {'ускорение':>10}")
+    base = None
+    for workers in args.workers:
+        loads, saves = [], []
+        for _ in range(args.repeat):
+            with open("factory_data.json", 'wb') as f:
+                f.write(snapshot)
+            factory = Factory(use_wal=False, workers=workers)
+            start = time.perf_counter()
+            factory.load_data()
+            loads.append(time.perf_counter() - start)
+            factory.name += " "
+            start = time.perf_counter()
+            factory.save_data()
+            saves.append(time.perf_counter() - start)
+        load, save = min(loads), min(saves)
+        if base is None:
+            base = (load, save)
+        print(f"{workers:>10} {load:>12.2f} {base[0] / load:>9.2f}x {save:>14.2f} {base[1] / save:>9.2f}x")
+
+
+def bench_validation(args) -> None:
+    """Время проверки записей и загрузки файла с несколькими ошибочными записями."""
+    sys.path.insert(0, PROJECT_DIR)
+    from factory import Factory
+    from validation import validate_data
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    if not os.path.exists("factory_data.json"):
+        print(f"Генерация файла на {args.employees} работников с {args.bad} ошибочными записями...")
+        generate_data_file("factory_data.json", args.employees, args.workshops)
+        with open("factory_data.json", encoding="utf-8") as f:
+            data = json.load(f)
+        rnd = random.Random(1)
+        faults = [("gender", "x"), ("age", None), ("type", "Welder")]
+        for i in range(args.bad):
+            staff = rnd.choice(data["workshops"])["employees"]
+            field, value = faults[i % len(faults)]
+            record = rnd.choice(staff)
+            if value is None:
+                record.pop(field, None)
+            else:
+                record[field] = value
+        with open("factory_data.json", 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    with open("factory_data.json", encoding="utf-8") as f:
+        data = json.load(f)
+    start = time.perf_counter()
+    _, report = validate_data(data)
+    validate = time.perf_counter() - start
+    records = report.employees + len(report.issues)
+    print(f"Проверка: {validate:.2f} с ({validate / max(records, 1) * 1e6:.2f} мкс на запись), "
+          f"отбраковано {len(report.issues)}")
+
+    factory = Factory(use_wal=False)
+    start = time.perf_counter()
+    loaded = factory.load_data()
+    load = time.perf_counter() - start
+    print(f"Загрузка: {load:.2f} с, загружено: {loaded}, {factory.get_load_report()}")
+
+
+def bench_compression(args) -> None:
+    """Размер файла данных и время сохранения и загрузки для форматов и уровней сжатия."""
+    sys.path.insert(0, PROJECT_DIR)
+    from factory import Factory
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    source = "factory_data.source.json"
+    if not os.path.exists(source):
+        print(f"Генерация файла на {args.employees} работников...")
+        generate_data_file(source, args.employees, args.workshops)
+    factory = Factory(use_wal=False, data_file=source, log_file="factory_log.source.json")
+    factory.load_data()
+    # Прогрев кеша JSON-фрагментов работников: все строки таблицы сравнивают только запись и сжатие
+    factory.name += " "
+    factory.save_data()
+
+    print(f"{'формат':>8} {'уровень':>8} {'размер, МБ':>11} {'сжатие':>8} {'сохранение, с':>14} {'загрузка, с':>12}")
+    plain = None
+    for compression in args.formats:
+        levels = [None] if compression == "none" else args.levels
+        for level in levels:
+            data_file = f"factory_data.{compression}.json"
+            saves, loads = [], []
+            for _ in range(args.repeat):
+                if os.path.exists(data_file):
+                    os.unlink(data_file)
+                target = Factory(factory.name, use_wal=False, data_file=data_file,
+                                 log_file=f"factory_log.{compression}.json",
+                                 compression=compression, compression_level=level)
+                for workshop in factory.get_all_workshops():
+                    target.add_workshop(workshop)
+                start = time.perf_counter()
+                target.save_data()
+                saves.append(time.perf_counter() - start)
+
+                reader = Factory(use_wal=False, data_file=data_file, log_file=f"factory_log.{compression}.json")
+                start = time.perf_counter()
+                reader.load_data()
+                loads.append(time.perf_counter() - start)
+            size = os.path.getsize(data_file)
+            plain = plain or size
+            print(f"{compression:>8} {level if level is not None else '-':>8} {size / 2**20:>11.2f} "
+                  f"{plain / size:>7.1f}x {min(saves):>14.2f} {min(loads):>12.2f}")
+
+
+def bench_rebalance(args) -> None:
+    """Время расчета и выполнения перераспределения работников под случайный целевой состав."""
+    sys.path.insert(0, PROJECT_DIR)
+    from factory import Factory
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    if not os.path.exists("factory_data.json"):
+        print(f"Генерация файла на {args.employees} работников в {args.workshops} цехах...")
+        generate_data_file("factory_data.json", args.employees, args.workshops)
+    factory = Factory()
+    factory.load_data()
+    factory.save_data()
+
+    # Цель: та же общая численность по специализациям, случайно перераспределенная по цехам
+    rnd = random.Random(args.seed)
+    targets = {}
+    totals = {}
+    for workshop in factory.get_all_workshops():
+        targets[workshop.name] = {}
+        for role, count in workshop.get_employees_by_role().items():
+            totals[role] = totals.get(role, 0) + count
+    names = list(targets)
+    for role, total in totals.items():
+        weights = [rnd.random() for _ in names]
+        scale = total / sum(weights)
+        counts = [int(w * scale) for w in weights]
+        counts[0] += total - sum(counts)
+        for name, count in zip(names, counts):
+            targets[name][role] = count
+
+    start = time.perf_counter()
+    plan = factory.rebalance(targets, apply=False)
+    planned = time.perf_counter() - start
+    start = time.perf_counter()
+    moved = factory.rebalance(targets).moves
+    applied = time.perf_counter() - start
+    left = factory.rebalance(targets, apply=False).moves
+    print(f"Работников: {factory.get_employee_count()}, цехов: {factory.get_workshop_count()}")
+    print(f"План: {plan.moves} переводов в {len(plan.transfers)} группах за {planned:.2f} с")
+    print(f"Расчет и выполнение: {moved} переводов за {applied:.2f} с, после выполнения осталось: {left}")
+
+
+def bench_schedule(args) -> None:
+    """Время полного расчета расписания смен и пересчета после приема и увольнения."""
+    sys.path.insert(0, PROJECT_DIR)
+    from employees import Gender
+    from factory import Factory
+    from scheduler import ShiftScheduler
+    from workers import Turner
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    if not os.path.exists("factory_data.json"):
+        print(f"Генерация файла на {args.employees} работников в {args.workshops} цехах...")
+        generate_data_file("factory_data.json", args.employees, args.workshops)
+    factory = Factory(use_wal=False)
+    factory.load_data()
+
+    # Требование: 1/6, 1/8 и 1/12 рабочих специализации на смену (около половины их 40-часовой недели)
+    requirements = {
+        w.name: {role: {"утро": count // 6, "день": count // 8, "ночь": count // 12}
+                 for role, count in w.get_employees_by_role().items()}
+        for w in factory.get_all_workshops()
+    }
+    scheduler = ShiftScheduler(factory, requirements)
+    start = time.perf_counter()
+    scheduler.refresh()
+    full = time.perf_counter() - start
+    assigned = sum(len(a["employees"]) for a in scheduler.assignments())
+    print(f"Работников: {factory.get_employee_count()}, групп: {scheduler.solved_groups}, "
+          f"назначений: {assigned}, незакрытых слотов: {len(scheduler.shortfalls())}")
+    print(f"Полный расчет: {full:.2f} с")
+
+    workshop = factory.get_all_workshops()[0]
+    timings = []
+    for _ in range(args.repeat):
+        employee = workshop.get_employees()[0]
+        start = time.perf_counter()
+        workshop.remove_employee(employee.get_id())
+        workshop += Turner("Иван", "Иванов", 30, Gender.MALE)
+        scheduler.refresh()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"Увольнение и прием с пересчетом: медиана {timings[len(timings) // 2] * 1000:.2f} мс "
+          f"(полных пересчетов групп: {scheduler.solved_groups})")
+
+
+def bench_memory(args) -> None:
+    """Память по слоям и пики памяти загрузки, сохранения и записи лога (tracemalloc)."""
+    sys.path.insert(0, PROJECT_DIR)
+    from employees import Gender
+    from factory import Factory
+    from workers import Turner
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="factory_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    if not os.path.exists("factory_data.json"):
+        print(f"Генерация файла на {args.employees} работников в {args.workshops} цехах...")
+        generate_data_file("factory_data.json", args.employees, args.workshops)
+    factory = Factory(use_wal=False)
+    factory.enable_memory_profiling(args.frames)
+    start = time.perf_counter()
+    factory.load_data()
+    loaded = time.perf_counter() - start
+    for workshop in factory.get_all_workshops():
+        workshop += Turner("Иван", "Иванов", 30, Gender.MALE)
+    start = time.perf_counter()
+    factory.save_data()
+    saved = time.perf_counter() - start
+
+    report = factory.memory_report(args.top)
+    employees = factory.get_employee_count()
+    print(f"Работников: {employees}, загрузка {loaded:.2f} с, сохранение {saved:.2f} с (с трассировкой)")
+    print(report)
+    for layer in ("employee", "workshop"):
+        size = report.layers.get(layer, {}).get("size", 0)
+        print(f"{layer}: {size / employees:.0f} байт на работника")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def main():
+    """Запуск бенчмарков из командной строки."""
+    parser = argparse.ArgumentParser(description="Бенчмарки системы управления заводом")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    startup = sub.add_parser("startup", help="Время холодного запуска меню")
+    startup.add_argument("--employees", type=int, default=1_000_000)
+    startup.add_argument("--workshops", type=int, default=100)
+    startup.add_argument("--repeat", type=int, default=10)
+    startup.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    startup.set_defaults(func=bench_startup)
+
+    replay = sub.add_parser("replay", help="Скорость восстановления из журнала")
+    replay.add_argument("--employees", type=int, default=10_000)
+    replay.add_argument("--workshops", type=int, default=100)
+    replay.add_argument("--records", type=int, default=300_000, help="Количество записей журнала")
+    replay.add_argument("--repeat", type=int, default=5)
+    replay.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    replay.set_defaults(func=bench_replay)
+
+    parallel = sub.add_parser("parallel", help="Параллельная загрузка и сохранение по процессам")
+    parallel.add_argument("--employees", type=int, default=500_000)
+    parallel.add_argument("--workshops", type=int, default=200)
+    parallel.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parallel.add_argument("--repeat", type=int, default=3)
+    parallel.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    parallel.set_defaults(func=bench_parallel)
+
+    validation = sub.add_parser("validation", help="Проверка записей при загрузке")
+    validation.add_argument("--employees", type=int, default=1_000_000)
+    validation.add_argument("--workshops", type=int, default=100)
+    validation.add_argument("--bad", type=int, default=5, help="Количество ошибочных записей")
+    validation.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    validation.set_defaults(func=bench_validation)
+
+    compression = sub.add_parser("compression", help="Размер и скорость сжатых файлов данных")
+    compression.add_argument("--employees", type=int, default=200_000)
+    compression.add_argument("--workshops", type=int, default=100)
+    compression.add_argument("--formats", nargs="+", default=["none", "gzip", "zlib", "lzma"])
+    compression.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    compression.add_argument("--repeat", type=int, default=3)
+    compression.add_argument("--workdir", help="Каталог с файлами (по умолчанию временный)")
+    compression.set_defaults(func=bench_compression)
+
+    rebalance = sub.add_parser("rebalance", help="Перераспределение работников между цехами")
+    rebalance.add_argument("--employees", type=int, default=100_000)
+    rebalance.add_argument("--workshops", type=int, default=200)
+    rebalance.add_argument("--seed", type=int, default=0)
+    rebalance.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    rebalance.set_defaults(func=bench_rebalance)
+
+    schedule = sub.add_parser("schedule", help="Расчет расписания смен")
+    schedule.add_argument("--employees", type=int, default=20_000)
+    schedule.add_argument("--workshops", type=int, default=50)
+    schedule.add_argument("--repeat", type=int, default=20)
+    schedule.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    schedule.set_defaults(func=bench_schedule)
+
+    memory = sub.add_parser("memory", help="Память по слоям и пики загрузки и сохранения")
+    memory.add_argument("--employees", type=int, default=100_000)
+    memory.add_argument("--workshops", type=int, default=100)
+    memory.add_argument("--frames", type=int, default=6,
+                        help="Глубина стека выделений (больше - точнее слои, но медленнее)")
+    memory.add_argument("--top", type=int, default=10, help="Количество крупнейших мест выделения")
+    memory.add_argument("--json", help="Файл для отчета в JSON (для сравнения между версиями)")
+    memory.add_argument("--workdir", help="Каталог с файлом данных (по умолчанию временный)")
+    memory.set_defaults(func=bench_memory)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
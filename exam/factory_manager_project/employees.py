@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from enum import Enum
-import uuid
+
+from merkle import employee_digest
+from storage import json_fragment
 
 class Gender(Enum):
     """Перечисление для представления пола работника."""
@@ -9,9 +11,20 @@ class Gender(Enum):
     FEMALE = "female"
     MALE = "male"
 
+# Поля, от которых зависит хеш работника
+HASHED_FIELDS = frozenset(("name", "surname", "age", "gender"))
+
+
 class Employee(ABC):
     """Абстрактный базовый класс для всех работников."""
-    def __init__(self, name, surname, age, gender: Gender):
+
+    # Кешированный хеш и узел-родитель (цех) в дереве хешей
+    _digest: Optional[int] = None
+    _merkle_parent = None
+    # Кешированный JSON-фрагмент: (отступ, текст)
+    _json: Optional[Tuple[int, str]] = None
+
+    def __init__(self, name, surname, age, gender: Gender, employee_id: Optional[str] = None):
         """
         Инициализация работника.
 
@@ -20,12 +33,38 @@ class Employee(ABC):
             surname: Фамилия работника
             age: Возраст работника
             gender: Пол работника
+            employee_id: Идентификатор (генерируется, если не указан)
         """
-        self.__id = str(uuid.uuid4())
-        self.name = name
-        self.surname = surname
-        self.age = age
-        self.gender = gender
+        if employee_id is None:
+            # uuid импортируется лениво: при загрузке ID берутся из файла
+            import uuid
+            employee_id = str(uuid.uuid4())
+        self.__id = employee_id
+        # У нового объекта кешей еще нет: поля пишутся напрямую, минуя
+        # сброс кешей в __setattr__ (работники массово создаются при загрузке)
+        self.__dict__.update(name=name, surname=surname, age=age, gender=gender)
+
+    def __setattr__(self, key, value):
+        """Установка атрибута со сбросом кешей при изменении данных работника."""
+        object.__setattr__(self, key, value)
+        if key in HASHED_FIELDS:
+            self.__invalidate()
+
+    def __invalidate(self) -> None:
+        """Сброс хеша и сериализованной формы работника."""
+        if self._json is not None:
+            self._json = None
+        if self._digest is not None:
+            self._digest = None
+            if self._merkle_parent is not None:
+                self._merkle_parent.invalidate_digest()
+
+    def digest(self) -> int:
+        """Хеш содержимого работника (кешируется до изменения полей)."""
+        if self._digest is None:
+            self._digest = employee_digest(self.__class__.__name__, self.__id, self.name,
+                                           self.surname, self.age, self.gender.value)
+        return self._digest
 
     def __str__(self):
         """Строковое представление работника."""
@@ -45,28 +84,47 @@ class Employee(ABC):
         """Получение уникального идентификатора работника."""
         return self.__id
 
+    def set_id(self, employee_id: str) -> None:
+        """
+        Восстановление идентификатора работника (при загрузке из файла).
+
+        Args:
+            employee_id: Сохраненный идентификатор работника
+        """
+        self.__id = employee_id
+        self.__invalidate()
+
     def to_dict(self) -> Dict[str, Any]:
         """Преобразование объекта работника в словарь."""
         info = self.get_info()
         info["type"] = self.__class__.__name__
         return info
 
-
-class Chief(Employee):
-    """Класс начальника цеха."""
-
-    def __init__(self, name: str, surname: str, age: int, gender: Gender):
+    def to_json(self, indent: int = 0) -> str:
         """
-        Инициализация начальника цеха.
+        JSON-представление работника в формате файла данных.
+
+        Текст кешируется до изменения полей работника, поэтому при
+        сохранении неизменившиеся работники не сериализуются заново.
 
         Args:
-            name: Имя начальника
-            surname: Фамилия начальника
-            age: Возраст начальника
-            gender: Пол начальника
+            indent: Отступ строки, на которой начинается объект
+
+        Returns:
+            JSON-текст работника
         """
-        super().__init__(name, surname, age, gender)
-        self.__post = "Начальник цеха"
+        cached = self._json
+        if cached is None or cached[0] != indent:
+            cached = self._json = (indent, json_fragment(self.to_dict(), indent))
+        return cached[1]
+
+
+class Chief(Employee):
+    """Класс начальника цеха."""
+
+    # Должность и специализация - атрибуты класса, а не объекта: работники
+    # массово создаются при загрузке и восстановлении из журнала
+    __post = "Начальник цеха"
 
     def get_post(self):
         """Получение должности начальника."""
@@ -92,23 +150,28 @@ class Chief(Employee):
 class Worker(Employee, ABC):
     """Абстрактный класс рабочего."""
 
-    def __init__(self, name: str, surname: str, age: int, gender: Gender):
-        """
-        Инициализация рабочего.
-
-        Args:
-            name: Имя рабочего
-            surname: Фамилия рабочего
-            age: Возраст рабочего
-            gender: Пол рабочего
-        """
-        super().__init__(name, surname, age, gender)
-        self.__post = "Рабочий"
+    __post = "Рабочий"
 
     def get_post(self) -> str:
         """Получение должности рабочего."""
         return self.__post
 
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Получение общей информации о рабочем (без специализации).
+
+        Returns:
+            Словарь с информацией о рабочем
+        """
+        return {
+            "id": self.get_id(),
+            "name": self.name,
+            "surname": self.surname,
+            "age": self.age,
+            "gender": self.gender.value,
+            "post": self.__post
+        }
+
     @abstractmethod
     def get_role(self) -> str:
         """Получение специализации рабочего."""
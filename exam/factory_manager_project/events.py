@@ -0,0 +1,191 @@
+from contextlib import contextmanager
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class EventType(Enum):
+    """Типы событий изменения завода."""
+
+    WORKSHOP_ADDED = "workshop_added"
+    WORKSHOP_REMOVED = "workshop_removed"
+    EMPLOYEE_HIRED = "employee_hired"
+    EMPLOYEE_REMOVED = "employee_removed"
+    EMPLOYEE_MOVED = "employee_moved"
+    CHIEF_CHANGED = "chief_changed"
+    FACTORY_LOADED = "factory_loaded"
+
+
+class Event:
+    """Событие изменения завода."""
+
+    __slots__ = ("type", "workshop", "employee", "source", "previous")
+
+    def __init__(self, type: EventType, workshop: Optional[str] = None, employee: Any = None,
+                 source: Optional[str] = None, previous: Any = None):
+        """
+        Инициализация события.
+
+        Args:
+            type: Тип события
+            workshop: Название цеха (для перемещения - цех назначения)
+            employee: Работник (для смены начальника - новый начальник)
+            source: Цех, из которого перемещен работник
+            previous: Прежний начальник цеха
+        """
+        self.type = type
+        self.workshop = workshop
+        self.employee = employee
+        self.source = source
+        self.previous = previous
+
+    def __repr__(self) -> str:
+        return f"Event({self.type.value}, workshop={self.workshop!r}, employee={self.employee})"
+
+
+class _Subscription:
+    """Подписка на события."""
+
+    __slots__ = ("callback", "types", "batched")
+
+    def __init__(self, callback: Callable, types: Optional[frozenset], batched: bool):
+        self.callback = callback
+        self.types = types
+        self.batched = batched
+
+
+class EventBus:
+    """
+    Шина событий (наблюдатель) для завода и цехов.
+
+    Подписчики вызываются синхронно после изменения. Внутри batch()
+    события накапливаются и доставляются одним пакетом при выходе из
+    внешнего batch(). Шина цеха передает события шине завода (parent),
+    поэтому на заводе достаточно одной подписки.
+    """
+
+    def __init__(self, parent: Optional["EventBus"] = None):
+        """
+        Инициализация шины.
+
+        Args:
+            parent: Шина, которой передаются все события этой шины
+        """
+        self.parent = parent
+        self.__subscriptions: List[_Subscription] = []
+        self.__batch_depth = 0
+        self.__pending: List[Event] = []
+        self.__muted = 0
+
+    def subscribe(self, callback: Callable, event_types: Optional[Iterable[EventType]] = None,
+                  batched: bool = False) -> Callable[[], None]:
+        """
+        Подписка на события.
+
+        Args:
+            callback: Функция callback(event) или callback(events) при batched=True
+            event_types: Типы событий (по умолчанию - все)
+            batched: Получать события списком одним вызовом на пакет
+
+        Returns:
+            Функция отмены подписки
+        """
+        subscription = _Subscription(
+            callback,
+            frozenset(event_types) if event_types is not None else None,
+            batched
+        )
+        self.__subscriptions.append(subscription)
+        return lambda: self.__subscriptions.remove(subscription)
+
+    def subscribe_async(self, coroutine: Callable, event_types: Optional[Iterable[EventType]] = None,
+                        loop: Optional["asyncio.AbstractEventLoop"] = None) -> Callable[[], None]:
+        """
+        Асинхронная подписка: пакет событий передается корутине в цикле событий.
+
+        Args:
+            coroutine: Асинхронная функция coroutine(events)
+            event_types: Типы событий (по умолчанию - все)
+            loop: Цикл событий (по умолчанию - текущий запущенный)
+
+        Returns:
+            Функция отмены подписки
+        """
+        # asyncio импортируется лениво: он нужен только асинхронным подписчикам,
+        # а этот модуль загружается при каждом запуске
+        import asyncio
+
+        loop = loop or asyncio.get_running_loop()
+
+        def deliver(events: List[Event]) -> None:
+            asyncio.run_coroutine_threadsafe(coroutine(events), loop)
+
+        return self.subscribe(deliver, event_types, batched=True)
+
+    def has_listeners(self) -> bool:
+        """Есть ли получатели событий (позволяет не создавать события зря)."""
+        if self.__subscriptions:
+            return True
+        return self.parent is not None and self.parent.has_listeners()
+
+    def emit(self, event: Event) -> None:
+        """
+        Публикация события.
+
+        Args:
+            event: Событие
+        """
+        self.emit_many([event])
+
+    def emit_many(self, events: List[Event]) -> None:
+        """
+        Публикация нескольких событий одним пакетом.
+
+        Args:
+            events: События
+        """
+        if self.__muted or not events:
+            return
+        if self.__batch_depth:
+            self.__pending.extend(events)
+            return
+        self.__deliver(events)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Накопление событий и доставка одним пакетом в конце блока."""
+        self.__batch_depth += 1
+        try:
+            yield
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth and self.__pending:
+                events, self.__pending = self.__pending, []
+                self.__deliver(events)
+
+    @contextmanager
+    def muted(self) -> Iterator[None]:
+        """Подавление событий внутри блока (составные операции публикуют свое событие)."""
+        self.__muted += 1
+        try:
+            yield
+        finally:
+            self.__muted -= 1
+
+    def __deliver(self, events: List[Event]) -> None:
+        """Доставка пакета событий подписчикам и родительской шине."""
+        for subscription in list(self.__subscriptions):
+            selected = events
+            if subscription.types is not None:
+                selected = [e for e in events if e.type in subscription.types]
+                if not selected:
+                    continue
+            if subscription.batched:
+                subscription.callback(selected)
+            else:
+                for event in selected:
+                    subscription.callback(event)
+        if self.parent is not None:
+            self.parent.emit_many(events)
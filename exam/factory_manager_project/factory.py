@@ -1,25 +1,137 @@
+from contextlib import contextmanager
 from datetime import datetime
+import gc
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
 
-from employees import Gender, Chief
+from employees import Gender, Chief, Employee
 from workshop import WorkShop
 from workers import *
+from storage import (ConflictError, FileLock, atomic_write, compression_for, json_fragment, open_text,
+                     read_header, read_version)
+from validation import LoadReport, validate_data, write_quarantine
+from wal import (WriteAheadLog, encode_employee, decode_employee, session_logs, session_path,
+                 ADD_WORKSHOP, REMOVE_WORKSHOP, HIRE, FIRE, CLEAR, CHIEF)
+from events import Event, EventBus, EventType
+from history import FactoryHistory, FactorySnapshot
+from ranking import WorkshopRanking
+from search import EmployeeSearch
+from optimizer import RebalancePlan, apply_plan, plan_rebalance
+from parallel import load_workshops, warm_json_cache
+from merkle import MODULUS, diff, factory_digest, to_hex, workshop_dict_digest
+from memory import MemoryReport, MemoryTracker, measured
+
+# Версия формата сводки в заголовке файла данных
+SUMMARY_VERSION = 1
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Приостановка сборщика циклического мусора на время массового создания объектов.
+
+    Разбор журнала создает сотни тысяч списков и работников, которые
+    переживают разбор: сборщик, запускаемый по счетчику выделений, обходит
+    их снова и снова, не находя мусора.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SaveSnapshot:
+    """Зафиксированное для фоновой записи состояние завода."""
+
+    __slots__ = ("base_version", "digest", "hashes", "header", "fragments", "wal_position")
+
+    def __init__(self, base_version: int, digest: str, hashes: Dict[str, int],
+                 header: Dict[str, Any], fragments: List[str], wal_position: int):
+        """
+        Инициализация снимка.
+
+        Args:
+            base_version: Версия файла, поверх которой записывается снимок
+            digest: Хеш завода
+            hashes: Хеши цехов
+            header: Заголовок файла данных
+            fragments: JSON-фрагменты цехов
+            wal_position: Позиция в журнале, до которой изменения вошли в снимок
+        """
+        self.base_version = base_version
+        self.digest = digest
+        self.hashes = hashes
+        self.header = header
+        self.fragments = fragments
+        self.wal_position = wal_position
+
 
 class Factory():
     """Класс завода."""
-    def __init__(self, name: str = "Завод"):
+    def __init__(self, name: str = "Завод", use_wal: bool = True, snapshot_every: int = 1000,
+                 lazy: bool = False, workers: int = 1, data_file: str = "factory_data.json",
+                 log_file: str = "factory_log.json", compression: Optional[str] = None,
+                 compression_level: Optional[int] = None):
         """
         Инициализация завода.
 
         Args:
             name: Название завода
+            use_wal: Вести журнал упреждающей записи (защита несохраненных изменений;
+                     у каждого объекта завода свой файл журнала)
+            snapshot_every: Через сколько записей журнала автоматически сохранять снимок
+            lazy: Режим быстрого запуска: файлы не создаются при инициализации,
+                  при загрузке читается только заголовок, а цеха создаются
+                  при первом обращении
+            workers: Количество процессов для разбора и сериализации цехов
+                     (больше 1 - параллельный режим для крупных заводов)
+            data_file: Путь к файлу данных завода
+            log_file: Путь к файлу лога завода
+            compression: Сжатие файлов данных и лога при записи ("gzip", "lzma",
+                         "zlib" или "none"); по умолчанию - по расширению
+                         (.gz, .xz, .zz). Чтение распознает формат само
+            compression_level: Уровень сжатия (по умолчанию - средний для формата)
         """
+        compression_for(data_file, compression)
         self.name = name
-        self.__workshops: List[WorkShop] = []
-        self.__log_file = "factory_log.json"
-        self.__data_file = "factory_data.json"
+        # Элемент списка - цех или еще не развернутый словарь цеха (ленивый режим)
+        self.__workshops: List[Union[WorkShop, Dict[str, Any]]] = []
+        self.__header: Optional[Dict[str, Any]] = None
+        self.__lazy = lazy
+        self.__log_file = log_file
+        self.__data_file = data_file
+        self.__version = 0
+        self.__base_hashes: Dict[str, int] = {}
+        # Названия цехов, измененных с момента последней синхронизации с файлом
+        self.__dirty: set = set()
+        # Журнал у каждого сеанса свой: сохранение очищает только его
+        self.__wal = WriteAheadLog(session_path(self.__data_file)) if use_wal else None
+        self.__snapshot_every = snapshot_every
+        # Глубина пакетных операций: внутри них журнал не сохраняет снимки
+        self.__bulk = 0
+        self.__workers = workers
+        self.__compression = compression
+        self.__compression_level = compression_level
+        self.events = EventBus()
+        self.__history: Optional[FactoryHistory] = None
+        self.__ranking: Optional[WorkshopRanking] = None
+        self.__search: Optional[EmployeeSearch] = None
+        # Сумма хешей цехов (кеш дерева Меркла) и хеш завода в последнем сохранении
+        self.__workshops_digest: Optional[int] = None
+        self.__raw_digests: Dict[str, int] = {}
+        self.__saved_digest: Optional[str] = None
+        # JSON-фрагменты цехов последнего снимка для фоновой записи: название -> (хеш, текст)
+        self.__fragments: Dict[str, Tuple[int, str]] = {}
+        # Отчет проверки записей при последней загрузке файла данных
+        self.__load_report: Optional[LoadReport] = None
+        # Учет памяти (включается enable_memory_profiling)
+        self.memory: Optional[MemoryTracker] = None
+        if lazy:
+            return
         if not os.path.exists(self.__log_file):
             self.__save_log("Инициализация завода", {"name": name})
         if not os.path.exists(self.__data_file):
@@ -32,8 +144,19 @@ class Factory():
         Args:
             workshop: Цех для добавления
         """
+        self.__journal(
+            ADD_WORKSHOP,
+            workshop.name,
+            encode_employee(workshop.get_chief()),
+            [encode_employee(e) for e in workshop.get_employees()]
+        )
+        self.__ensure_loaded()
+        self.__dirty.add(workshop.name)
         self.__workshops.append(workshop)
+        self.__adopt(workshop)
+        self.invalidate_digest()
         self.__save_log("Добавление цеха", {"workshop_name": workshop.name})
+        self.events.emit(Event(EventType.WORKSHOP_ADDED, workshop.name))
 
     def remove_workshop(self, workshop_name: str) -> bool:
         """
@@ -45,13 +168,116 @@ class Factory():
         Returns:
             True если удаление прошло успешно, иначе False
         """
+        self.__ensure_loaded()
         for i, workshop in enumerate(self.__workshops):
-            if workshop.name == workshop_name:
+            if self.__entry_name(workshop) == workshop_name:
+                self.__journal(REMOVE_WORKSHOP, workshop_name)
+                self.__dirty.add(workshop_name)
                 self.__workshops.pop(i)
+                self.invalidate_digest()
+                if isinstance(workshop, WorkShop):
+                    workshop.set_journal(None)
+                    workshop.events.parent = None
+                    workshop._merkle_parent = None
                 self.__save_log("Удаление цеха", {"workshop_name": workshop_name})
+                self.events.emit(Event(EventType.WORKSHOP_REMOVED, workshop_name))
                 return True
         return False
 
+    def move_employee(self, employee_id: str, source: str, target: str) -> bool:
+        """
+        Перевод работника из одного цеха в другой.
+
+        Подписчики завода получают одно событие EMPLOYEE_MOVED
+        (подписчики самих цехов - удаление и прием).
+
+        Args:
+            employee_id: ID работника
+            source: Название цеха, из которого переводится работник
+            target: Название цеха, в который переводится работник
+
+        Returns:
+            True если перевод выполнен, иначе False
+        """
+        source_workshop = self.get_workshop(source)
+        target_workshop = self.get_workshop(target)
+        if source_workshop is None or target_workshop is None or source_workshop is target_workshop:
+            return False
+        employee = source_workshop.get_emloyee(employee_id)
+        if employee is None:
+            return False
+
+        with self.events.muted():
+            source_workshop.remove_employee(employee_id)
+            target_workshop += employee
+        self.events.emit(Event(EventType.EMPLOYEE_MOVED, target, employee, source=source))
+        return True
+
+    def move_employees(self, employee_ids: Iterable[str], source: str, target: str) -> int:
+        """
+        Перевод группы работников из одного цеха в другой за один проход по цеху.
+
+        Подписчики завода получают по событию EMPLOYEE_MOVED на работника
+        одним пакетом (см. bulk).
+
+        Args:
+            employee_ids: ID работников
+            source: Название цеха, из которого переводятся работники
+            target: Название цеха, в который переводятся работники
+
+        Returns:
+            Количество переведенных работников (отсутствующие в цехе ID пропускаются)
+        """
+        source_workshop = self.get_workshop(source)
+        target_workshop = self.get_workshop(target)
+        if source_workshop is None or target_workshop is None or source_workshop is target_workshop:
+            return 0
+        ids = set(employee_ids)
+        moved = [e for e in source_workshop.get_employees() if e.get_id() in ids]
+        if not moved:
+            return 0
+
+        with self.bulk():
+            with self.events.muted():
+                source_workshop -= moved
+                target_workshop += moved
+            self.events.emit_many([Event(EventType.EMPLOYEE_MOVED, target, e, source=source) for e in moved])
+        return len(moved)
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """
+        Пакетная операция: события доставляются одним пакетом, а снимок по
+        журналу сохраняется не посреди операции, а после нее.
+        """
+        self.__bulk += 1
+        try:
+            with self.events.batch():
+                yield
+        finally:
+            self.__bulk -= 1
+        if not self.__bulk:
+            self.__snapshot_if_needed()
+
+    def rebalance(self, targets: Dict[str, Dict[str, int]], apply: bool = True) -> RebalancePlan:
+        """
+        Перераспределение работников между цехами под целевой состав по специализациям.
+
+        Args:
+            targets: Целевая численность {цех: {специализация: количество}}
+            apply: Сразу выполнить план (иначе - только рассчитать)
+
+        Returns:
+            План перераспределения с минимальным числом переводов
+
+        Raises:
+            KeyError: Если в targets указан несуществующий цех
+        """
+        plan = plan_rebalance(self, targets)
+        if apply:
+            apply_plan(self, plan)
+        return plan
+
     def get_workshop(self, name: str) -> Optional[WorkShop]:
         """
         Получение цеха по имени.
@@ -62,104 +288,976 @@ class Factory():
         Returns:
             Найденный цех или None
         """
-        for workshop in self.__workshops:
-            if workshop.name == name:
-                return workshop
+        self.__ensure_loaded()
+        for i, workshop in enumerate(self.__workshops):
+            if self.__entry_name(workshop) == name:
+                return self.__materialize(i)
         return None
 
     def get_all_workshops(self) -> List[WorkShop]:
         """Получение списка всех цехов."""
-        return self.__workshops.copy()
+        self.__ensure_loaded()
+        return [self.__materialize(i) for i in range(len(self.__workshops))]
+
+    def get_workshop_count(self) -> int:
+        """Количество цехов (без загрузки данных, если известно из заголовка)."""
+        if self.__header is not None and "total_workshops" in self.__header:
+            return self.__header["total_workshops"]
+        self.__ensure_loaded()
+        return len(self.__workshops)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Сводка по заводу: численность по цехам, специализациям и полу.
+
+        Пока цеха не загружены (ленивый режим), сводка берется из заголовка
+        файла данных; иначе считается по цехам (с кешированными
+        распределениями цехов, без обхода работников).
+
+        Returns:
+            Словарь {"version", "roles", "genders", "by_workshop": [{"name",
+            "chief", "employees", "roles", "genders"}, ...]}
+        """
+        if self.__header is not None:
+            summary = self.__header.get("summary")
+            if isinstance(summary, dict) and summary.get("version") == SUMMARY_VERSION:
+                return summary
+        self.__ensure_loaded()
+
+        by_workshop = []
+        roles: Dict[str, int] = {}
+        genders: Dict[str, int] = {}
+        for entry in self.__workshops:
+            if isinstance(entry, dict):
+                chief = entry["chief"]
+                chief_name = f"{chief['name']} {chief['surname']}"
+                entry_roles = entry.get("distribution", {})
+                entry_genders: Dict[str, int] = {}
+                for employee in entry.get("employees", []):
+                    entry_genders[employee["gender"]] = entry_genders.get(employee["gender"], 0) + 1
+            else:
+                chief_name = str(entry.get_chief())
+                entry_roles = entry.get_employees_by_role()
+                entry_genders = entry.get_employees_by_gender()
+            for role, count in entry_roles.items():
+                roles[role] = roles.get(role, 0) + count
+            for gender, count in entry_genders.items():
+                genders[gender] = genders.get(gender, 0) + count
+            by_workshop.append({
+                "name": self.__entry_name(entry),
+                "chief": chief_name,
+                "employees": self.__entry_size(entry),
+                "roles": entry_roles,
+                "genders": entry_genders
+            })
+        return {"version": SUMMARY_VERSION, "roles": roles, "genders": genders, "by_workshop": by_workshop}
+
+    def get_role_distribution(self) -> Dict[str, int]:
+        """Распределение работников завода по специализациям (из сводки)."""
+        return dict(self.get_summary()["roles"])
+
+    def has_unsaved_changes(self) -> bool:
+        """Есть ли изменения, не записанные в файл данных."""
+        if self.__dirty:
+            return True
+        if self.__header is not None:
+            return False
+        return to_hex(self.digest()) != self.__saved_digest
+
+    def get_data_file(self) -> str:
+        """Путь к файлу данных завода."""
+        return self.__data_file
+
+    def get_log_file(self) -> str:
+        """Путь к файлу лога завода."""
+        return self.__log_file
+
+    def get_employee_count(self) -> int:
+        """Количество работников завода (без загрузки данных, если известно из заголовка)."""
+        if self.__header is not None and "total_employees" in self.__header:
+            return self.__header["total_employees"]
+        self.__ensure_loaded()
+        return sum(self.__entry_size(w) for w in self.__workshops)
+
+    @staticmethod
+    def __entry_name(entry: Union[WorkShop, Dict[str, Any]]) -> str:
+        """Название цеха (развернутого или еще хранящегося словарем)."""
+        return entry["name"] if isinstance(entry, dict) else entry.name
+
+    @staticmethod
+    def __entry_size(entry: Union[WorkShop, Dict[str, Any]]) -> int:
+        """Количество работников цеха (развернутого или еще хранящегося словарем)."""
+        if isinstance(entry, dict):
+            return len(entry.get("employees", []))
+        return len(entry.get_employees())
+
+    def __materialize(self, index: int) -> WorkShop:
+        """
+        Создание объекта цеха из словаря при первом обращении.
+
+        Args:
+            index: Позиция цеха в списке
+
+        Returns:
+            Объект цеха
+        """
+        workshop = self.__workshops[index]
+        if isinstance(workshop, dict):
+            workshop = self.__build_workshop(workshop)
+            self.__adopt(workshop)
+            self.__workshops[index] = workshop
+        return workshop
+
+    def __ensure_loaded(self) -> None:
+        """Чтение отложенного (ленивого) снимка при первом обращении к цехам."""
+        if self.__header is None:
+            return
+        self.__header = None
+        self.__load_snapshot(hydrate=False)
+
+    def __get_ranking(self) -> WorkshopRanking:
+        """Индекс цехов по численности (создается при первом запросе)."""
+        if self.__ranking is None:
+            self.__ranking = WorkshopRanking(self)
+        return self.__ranking
 
-    def save_data(self):
-        """Сохранение данных завода в JSON файл."""
-        data = {
+    def top_k(self, n: int, role: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Самые крупные цеха завода.
+
+        Args:
+            n: Количество цехов
+            role: Считать только работников этой специализации
+
+        Returns:
+            Список (название, численность) по убыванию численности
+        """
+        return self.__get_ranking().top_k(n, role)
+
+    def workshops_with(self, min: Optional[int] = None, max: Optional[int] = None,
+                       role: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Цеха с численностью в заданных границах (включительно).
+
+        Args:
+            min: Минимальная численность
+            max: Максимальная численность
+            role: Считать только работников этой специализации
+
+        Returns:
+            Список (название, численность) по возрастанию численности
+        """
+        return self.__get_ranking().workshops_with(min, max, role)
+
+    def rank(self, workshop_name: str, role: Optional[str] = None) -> Optional[int]:
+        """
+        Место цеха по численности (1 - самый крупный).
+
+        Args:
+            workshop_name: Название цеха
+            role: Считать только работников этой специализации
+
+        Returns:
+            Место цеха или None, если цеха нет
+        """
+        return self.__get_ranking().rank(workshop_name, role)
+
+    def search_employees(self, name: Optional[str] = None, surname: Optional[str] = None,
+                         age_min: Optional[int] = None, age_max: Optional[int] = None,
+                         gender: Optional[str] = None, role: Optional[str] = None,
+                         workshop: Optional[str] = None) -> List[Tuple[Employee, str]]:
+        """
+        Поиск работников по всему заводу (по индексам, без перебора цехов).
+
+        Args:
+            name: Префикс имени (без учета регистра)
+            surname: Префикс фамилии (без учета регистра)
+            age_min: Минимальный возраст (включительно)
+            age_max: Максимальный возраст (включительно)
+            gender: Пол ("male"/"female")
+            role: Специализация или должность
+            workshop: Название цеха
+
+        Returns:
+            Список (работник, название цеха)
+        """
+        if self.__search is None:
+            self.__search = EmployeeSearch(self)
+        return self.__search.search(name, surname, age_min, age_max, gender, role, workshop)
+
+    def invalidate_digest(self) -> None:
+        """Сброс хеша завода (вызывается при изменении состава цехов или цеха)."""
+        self.__workshops_digest = None
+
+    def digest(self) -> int:
+        """
+        Хеш содержимого завода (корень дерева Меркла: завод - цеха - работники).
+
+        После изменений пересчитываются только измененные цеха; цеха,
+        еще не развернутые из файла, хешируются по словарю без создания
+        объектов.
+        """
+        self.__ensure_loaded()
+        if self.__workshops_digest is None:
+            total = 0
+            for entry in self.__workshops:
+                if isinstance(entry, dict):
+                    total += self.__raw_digest(entry)
+                else:
+                    entry._merkle_parent = self
+                    total += entry.digest()
+            self.__workshops_digest = total % MODULUS
+        return factory_digest(self.name, self.__workshops_digest, len(self.__workshops))
+
+    def __raw_digest(self, data: Dict[str, Any]) -> int:
+        """Хеш цеха, хранящегося словарем (кешируется до следующей загрузки)."""
+        digest = self.__raw_digests.get(data["name"])
+        if digest is None:
+            digest = self.__raw_digests[data["name"]] = workshop_dict_digest(data)
+        return digest
+
+    def __entry_digest(self, entry: Union[WorkShop, Dict[str, Any]]) -> int:
+        """Хеш цеха (развернутого или еще хранящегося словарем)."""
+        if isinstance(entry, dict):
+            return self.__raw_digest(entry)
+        return entry.digest()
+
+    @staticmethod
+    def __entry_json(entry: Union[WorkShop, Dict[str, Any]]) -> str:
+        """JSON-текст цеха на уровне списка workshops файла данных."""
+        if isinstance(entry, dict):
+            return json_fragment(entry, 4)
+        return entry.to_json(4)
+
+    def diff(self, other) -> Dict[str, Any]:
+        """
+        Набор изменений от этого завода к другому заводу или версии истории.
+
+        Args:
+            other: Factory или FactorySnapshot
+
+        Returns:
+            Словарь изменений (см. merkle.diff)
+        """
+        return diff(self, other)
+
+    def apply_changes(self, changes: Dict[str, Any]) -> None:
+        """
+        Применение набора изменений (результата diff) к заводу.
+
+        Изменения применяются одной пакетной операцией (см. bulk): каждое
+        попадает в журнал и в события, а снимок по журналу сохраняется
+        только после всех изменений.
+
+        Args:
+            changes: Словарь изменений
+        """
+        with self.bulk():
+            if "name" in changes:
+                self.name = changes["name"]
+            for name in changes.get("workshops_removed", []):
+                self.remove_workshop(name)
+            for workshop_data in changes.get("workshops_added", []):
+                self.add_workshop(self.__build_workshop(workshop_data))
+            for change in changes.get("workshops_changed", []):
+                workshop = self.get_workshop(change["name"])
+                if workshop is None:
+                    continue
+                if "chief" in change:
+                    workshop.set_chief(employee_from_dict(change["chief"]))
+                hired = list(change.get("hired", []))
+                fired = set(change.get("fired", []))
+                staff = {e.get_id(): e for e in workshop.get_employees()}
+                # Измененный работник увольняется и принимается заново с тем же ID:
+                # изменение попадает в журнал, а индексы получают события
+                for data in change.get("updated", []):
+                    fired.add(data["id"])
+                    hired.append(data)
+                if fired:
+                    workshop -= [e for e in staff.values() if e.get_id() in fired]
+                if hired:
+                    workshop += [employee_from_dict(e) for e in hired]
+
+    def get_version(self) -> int:
+        """Получение версии данных, с которой синхронизирован завод."""
+        return self.__version
+
+    def enable_history(self) -> FactoryHistory:
+        """
+        Включение истории версий завода.
+
+        После включения версия фиксируется при каждом сохранении данных
+        и при явном вызове commit().
+
+        Returns:
+            История версий завода
+        """
+        if self.__history is None:
+            self.__history = FactoryHistory(self)
+            self.__history.commit()
+        return self.__history
+
+    def enable_memory_profiling(self, frames: int = 6) -> MemoryTracker:
+        """
+        Включение учета памяти (tracemalloc).
+
+        После включения запоминаются пики памяти при загрузке, сохранении
+        и записи лога, а memory_report() показывает занятую память по
+        слоям. Трассировка замедляет работу, поэтому учет выключен по умолчанию.
+
+        Args:
+            frames: Глубина стека вызовов, сохраняемого для выделений
+
+        Returns:
+            Учет памяти завода
+        """
+        if self.memory is None:
+            self.memory = MemoryTracker(frames)
+            self.memory.register("log", Factory.__save_log)
+        self.memory.start()
+        return self.memory
+
+    def memory_report(self, limit: int = 10) -> MemoryReport:
+        """
+        Отчет о памяти: занятая память по слоям (factory, workshop, employee,
+        serialization, log) и пики памяти операций завода.
+
+        Args:
+            limit: Количество крупнейших мест выделения в отчете
+
+        Returns:
+            Отчет о памяти
+
+        Raises:
+            LookupError: Если учет памяти не включен
+        """
+        if self.memory is None or not self.memory.active:
+            raise LookupError("Учет памяти не включен (enable_memory_profiling)")
+        return self.memory.report(limit)
+
+    def commit(self) -> FactorySnapshot:
+        """
+        Фиксация текущего состояния завода как новой версии истории.
+
+        Returns:
+            Созданная версия
+        """
+        if self.__history is None:
+            return self.enable_history().at(1)
+        return self.__history.commit()
+
+    def at(self, version_or_timestamp: Union[int, datetime, str]) -> FactorySnapshot:
+        """
+        Получение состояния завода на момент версии или времени (только чтение).
+
+        Args:
+            version_or_timestamp: Номер версии, datetime или строка ISO 8601
+
+        Returns:
+            Версия завода
+
+        Raises:
+            LookupError: Если история не включена или версии нет
+        """
+        if self.__history is None:
+            raise LookupError("История версий не включена (enable_history)")
+        return self.__history.at(version_or_timestamp)
+
+    @measured("save")
+    def save_data(self) -> bool:
+        """
+        Сохранение данных завода в JSON файл.
+
+        Запись выполняется под блокировкой файла по принципу
+        compare-and-swap: если с момента последней загрузки или сохранения
+        файл изменил другой процесс, изменения других процессов
+        объединяются с локальными по цехам. Если хеш завода совпадает с
+        хешем в файле и файл не менялся, запись пропускается.
+
+        Returns:
+            True если файл записан, False если изменений не было
+
+        Raises:
+            ConflictError: Если один и тот же цех изменен и локально, и в файле
+        """
+        self.__ensure_loaded()
+        digest = to_hex(self.digest())
+        if (digest == self.__saved_digest and os.path.exists(self.__data_file)
+                and read_version(self.__data_file) == self.__version):
+            self.__dirty.clear()
+            if self.__wal is not None:
+                self.__wal.truncate()
+            return False
+
+        hashes = {self.__entry_name(w): self.__entry_digest(w) for w in self.__workshops}
+        if self.__workers > 1:
+            warm_json_cache([w for w in self.__workshops if isinstance(w, WorkShop)], self.__workers)
+
+        with FileLock(self.__data_file):
+            disk_version = read_version(self.__data_file)
+            if disk_version != self.__version:
+                hashes = self.__merge(hashes)
+                self.__attach_journal()
+                self.invalidate_digest()
+                digest = to_hex(self.digest())
+                merged = True
+            else:
+                merged = False
+
+            header = self.__build_header(disk_version + 1, digest)
+            self.__write_data(header, (self.__entry_json(entry) for entry in self.__workshops))
+
+        self.__version = header["version"]
+        self.__base_hashes = hashes
+        self.__saved_digest = digest
+        self.__dirty.clear()
+        if self.__wal is not None:
+            self.__wal.truncate()
+        self.__save_log("Сохранение данных", {"data_file": self.__data_file, "version": self.__version})
+        if merged:
+            self.events.emit(Event(EventType.FACTORY_LOADED))
+        if self.__history is not None:
+            self.__history.commit()
+        return True
+
+    def __build_header(self, version: int, digest: str) -> Dict[str, Any]:
+        """Заголовок файла данных для текущего состояния завода."""
+        return {
+            "version": version,
             "factory_name": self.name,
-            "workshops": [w.to_dict() for w in self.__workshops],
             "total_workshops": len(self.__workshops),
-            "total_employees": sum(len(w.get_employees()) for w in self.__workshops),
-            "save_timestamp": datetime.now().isoformat()
+            "total_employees": sum(self.__entry_size(w) for w in self.__workshops),
+            "save_timestamp": datetime.now().isoformat(),
+            "content_hash": digest,
+            "summary": self.get_summary()
         }
 
-        with open(self.__data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def __write_data(self, header: Dict[str, Any], fragments: Iterable[str]) -> None:
+        """
+        Атомарная запись файла данных.
+
+        Текст совпадает с json.dump(..., indent=2): заголовок, затем
+        склеенные JSON-фрагменты цехов (у неизменившихся работников - из кеша).
+        """
+        with atomic_write(self.__data_file, self.__compression, self.__compression_level) as f:
+            f.write(json.dumps(header, ensure_ascii=False, indent=2)[:-2])
+            f.write(',\n  "workshops": [')
+            separator = "\n    "
+            for fragment in fragments:
+                f.write(separator)
+                f.write(fragment)
+                separator = ",\n    "
+            f.write("]\n}" if separator == "\n    " else "\n  ]\n}")
+
+    @measured("snapshot")
+    def capture_snapshot(self) -> Optional[SaveSnapshot]:
+        """
+        Фиксация состояния завода для сохранения в фоне.
+
+        Снимок - готовые JSON-фрагменты цехов (для цехов, не менявшихся с
+        прошлого снимка, - из кеша по хешу), поэтому его запись не зависит
+        от дальнейших изменений завода.
+
+        Returns:
+            Снимок или None, если изменений с последнего сохранения нет
+        """
+        self.__ensure_loaded()
+        digest = to_hex(self.digest())
+        if digest == self.__saved_digest and os.path.exists(self.__data_file):
+            return None
+
+        hashes = {}
+        fragments = []
+        cache = {}
+        for entry in self.__workshops:
+            name = self.__entry_name(entry)
+            entry_digest = self.__entry_digest(entry)
+            cached = self.__fragments.get(name)
+            if cached is None or cached[0] != entry_digest:
+                cached = (entry_digest, self.__entry_json(entry))
+            cache[name] = cached
+            hashes[name] = entry_digest
+            fragments.append(cached[1])
+        self.__fragments = cache
+
+        return SaveSnapshot(
+            self.__version,
+            digest,
+            hashes,
+            self.__build_header(self.__version + 1, digest),
+            fragments,
+            self.__wal.position() if self.__wal is not None else 0
+        )
+
+    @measured("write")
+    def write_snapshot(self, snapshot: SaveSnapshot) -> bool:
+        """
+        Запись снимка в файл данных (можно вызывать из другого потока).
 
-        self.__save_log("Сохранение данных", {"data_file": self.__data_file})
+        Состояние завода не меняется: после записи нужно вызвать
+        commit_snapshot. Из журнала удаляются записи, вошедшие в снимок.
+
+        Args:
+            snapshot: Снимок из capture_snapshot
+
+        Returns:
+            True если снимок записан, False если файл изменил другой
+            процесс (нужно обычное сохранение с объединением)
+        """
+        with FileLock(self.__data_file):
+            if read_version(self.__data_file) != snapshot.base_version:
+                return False
+            self.__write_data(snapshot.header, snapshot.fragments)
+        if self.__wal is not None:
+            self.__wal.discard(snapshot.wal_position)
+        return True
+
+    def commit_snapshot(self, snapshot: SaveSnapshot) -> None:
+        """
+        Учет записанного снимка: версия файла, базовые хеши цехов.
+
+        Цеха, изменившиеся после фиксации снимка, остаются несохраненными.
+
+        Args:
+            snapshot: Записанный снимок
+        """
+        self.__version = snapshot.header["version"]
+        self.__base_hashes = snapshot.hashes
+        self.__saved_digest = snapshot.digest
+        current = {self.__entry_name(w): w for w in self.__workshops}
+        self.__dirty = {
+            name for name in self.__dirty
+            if name not in current or self.__entry_digest(current[name]) != snapshot.hashes.get(name)
+        }
+        self.__save_log("Автосохранение данных", {"data_file": self.__data_file, "version": self.__version})
+
+    def __merge(self, hashes: Dict[str, int]) -> Dict[str, int]:
+        """
+        Объединение локальных изменений с изменениями в файле.
+
+        Изменившимся считается цех, хэш которого отличается от хэша на момент
+        последней синхронизации (добавленные и удаленные цеха тоже учитываются).
+        Список цехов завода заменяется объединенным.
+
+        Args:
+            hashes: Хэши локальных цехов
+
+        Returns:
+            Хэши цехов после объединения
+        """
+        with open_text(self.__data_file) as f:
+            disk = json.load(f)
+        disk_data = {d["name"]: d for d in disk.get("workshops", [])}
+        disk_hashes = {name: workshop_dict_digest(d) for name, d in disk_data.items()}
+
+        base = self.__base_hashes
+        names = set(base) | set(hashes) | set(disk_hashes)
+        local_changed = {n for n in names if hashes.get(n) != base.get(n)}
+        remote_changed = {n for n in names if disk_hashes.get(n) != base.get(n)}
+
+        conflicts = sorted(
+            n for n in local_changed & remote_changed
+            if hashes.get(n) != disk_hashes.get(n)
+        )
+        if conflicts:
+            self.__save_log("Конфликт сохранения", {"workshops": conflicts})
+            raise ConflictError(f"Цеха изменены другим процессом: {', '.join(conflicts)}")
+
+        by_name = {}
+        for entry in self.__workshops:
+            by_name.setdefault(self.__entry_name(entry), entry)
+        merged_workshops = []
+        merged_hashes = {}
+        for name in list(by_name) + [n for n in disk_data if n not in by_name]:
+            if name in remote_changed - local_changed:
+                if name in disk_data:
+                    merged_workshops.append(self.__build_workshop(disk_data[name]))
+                    merged_hashes[name] = disk_hashes[name]
+            elif name in by_name:
+                merged_workshops.append(by_name[name])
+                merged_hashes[name] = hashes[name]
+
+        self.__workshops = merged_workshops
+        return merged_hashes
+
+    def get_load_report(self) -> Optional[LoadReport]:
+        """
+        Отчет проверки записей при последней загрузке файла данных.
+
+        Записи с ошибками (неизвестный тип, неверный пол, нет возраста и
+        т.п.) не загружаются и дописываются в файл "<файл данных>.quarantine.json"
+        с JSON-путями; остальные цеха и работники загружаются.
+
+        Returns:
+            Отчет или None, если цеха из файла еще не читались
+        """
+        return self.__load_report
 
     def load_data(self) -> bool:
         """
         Загрузка данных завода из JSON файла.
 
+        Несохраненные изменения (в памяти и в журнале) отбрасываются.
+        В ленивом режиме читается только заголовок файла.
+
+        Returns:
+            True если загрузка прошла успешно, иначе False
+        """
+        if not (self.__lazy and self.__load_header()) and not self.__load_snapshot():
+            return False
+        if self.__wal is not None:
+            self.__wal.truncate()
+        self.__attach_journal()
+        self.events.emit(Event(EventType.FACTORY_LOADED))
+        return True
+
+    def recover(self) -> Tuple[bool, int]:
+        """
+        Восстановление состояния при запуске.
+
+        Загружает последний снимок и повторно применяет к нему изменения
+        из журнала упреждающей записи, не попавшие в снимок. Журналы
+        завершившихся (или упавших) сеансов переносятся в журнал этого
+        сеанса; журналы работающих процессов не трогаются.
+
+        Returns:
+            (загружен ли снимок, количество восстановленных операций)
+        """
+        if self.__wal is not None:
+            for path in session_logs(self.__data_file):
+                if path != self.__wal.path:
+                    self.__wal.claim(path)
+        has_journal = self.__wal is not None and os.path.exists(self.__wal.path)
+        if self.__lazy and not has_journal and self.__load_header():
+            self.events.emit(Event(EventType.FACTORY_LOADED))
+            return True, 0
+
+        loaded = self.__load_snapshot()
+        replayed = 0
+        if has_journal:
+            with _gc_paused():
+                replayed = self.__replay(self.__wal.read())
+            if replayed:
+                self.__save_log("Восстановление из журнала", {"operations": replayed})
+        self.__attach_journal()
+        self.events.emit(Event(EventType.FACTORY_LOADED))
+        return loaded, replayed
+
+    def discard_journal(self) -> None:
+        """
+        Отказ от несохраненных изменений: журнал сеанса очищается, и
+        recover() их больше не восстановит (объекты в памяти не меняются).
+        """
+        if self.__wal is not None:
+            self.__wal.truncate()
+
+    def close(self) -> None:
+        """
+        Завершение сеанса: закрытие журнала.
+
+        Несохраненные изменения остаются в журнале и восстанавливаются
+        следующим вызовом recover().
+        """
+        if self.__wal is not None:
+            self.__wal.close()
+
+    def __load_header(self) -> bool:
+        """
+        Чтение только заголовка файла данных (ленивый режим).
+
+        Цеха будут прочитаны из файла при первом обращении к ним; до этого
+        текущие объекты цехов сохраняются, чтобы их можно было переиспользовать.
+
+        Returns:
+            True если заголовок прочитан, иначе False
+        """
+        header = read_header(self.__data_file)
+        if header is None:
+            return False
+        self.name = header.get("factory_name", self.name)
+        self.__version = header.get("version", 0)
+        self.__saved_digest = header.get("content_hash")
+        self.__header = header
+        return True
+
+    @measured("load")
+    def __load_snapshot(self, hydrate: bool = True) -> bool:
+        """
+        Чтение снимка данных завода из JSON файла.
+
+        Общий загрузчик для Factory и Menu. Состояние заменяется целиком
+        только после успешного разбора файла; цеха, которые не менялись
+        ни в памяти, ни в файле с момента последней синхронизации,
+        переиспользуются без повторного создания объектов. В лог пишется
+        одна итоговая запись.
+
+        Args:
+            hydrate: Сразу создавать объекты цехов (иначе - при первом обращении)
+
         Returns:
             True если загрузка прошла успешно, иначе False
         """
         try:
-            with open(self.__data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with FileLock(self.__data_file, exclusive=False):
+                with open_text(self.__data_file) as f:
+                    text = f.read()
+
+            # В параллельном режиме цеха разбираются в пуле процессов
+            # Записи проверяются до создания цехов: ошибочные отбраковываются, остальные загружаются
+            parsed = None
+            if hydrate and self.__workers > 1:
+                parsed = load_workshops(text, self.__workers)
+            if parsed is not None:
+                data, built, report = parsed
+                report.source = self.__data_file
+                workshops_data = [w for w, _ in built]
+                hashes = {w.name: digest for w, digest in built}
+            else:
+                data = json.loads(text)
+                workshops_data, report = validate_data(data, self.__data_file)
+                hashes = {d["name"]: workshop_dict_digest(d) for d in workshops_data}
+
+            unchanged = {}
+            for entry in self.__workshops:
+                name = self.__entry_name(entry)
+                if name not in self.__dirty and self.__base_hashes.get(name) == hashes.get(name):
+                    unchanged.setdefault(name, entry)
+
+            workshops = []
+            reused = 0
+            for workshop_data in workshops_data:
+                entry = unchanged.pop(self.__entry_name(workshop_data), None)
+                if entry is not None:
+                    reused += 1
+                elif parsed is not None:
+                    entry = workshop_data
+                elif hydrate:
+                    entry = self.__build_workshop(workshop_data)
+                else:
+                    entry = workshop_data
+                workshops.append(entry)
 
             self.name = data.get("factory_name", self.name)
-            self.__workshops = []
-
-            for workshop_data in data.get("workshops", []):
-                chief_data = workshop_data["chief"]
-                chief = Chief(
-                    name=chief_data["name"],
-                    surname=chief_data["surname"],
-                    age=chief_data["age"],
-                    gender=Gender(chief_data["gender"])
-                )
-                chief.__id = chief_data["id"]
-
-                employees = []
-                for emp_data in workshop_data.get("employees", []):
-                    emp_type = emp_data.get("type", "Worker")
-
-                    if emp_type == "Chief":
-                        emp = Chief(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    elif emp_type == "Turner":
-                        emp = Turner(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    elif emp_type == "Locksmith":
-                        emp = Locksmith(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    elif emp_type == "Miller":
-                        emp = Miller(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    else:
-                        continue
-
-                    emp.__id = emp_data["id"]
-                    employees.append(emp)
-
-                workshop = WorkShop(workshop_data["name"], chief, employees)
-                self.__workshops.append(workshop)
-
-            self.__save_log("Загрузка данных", {"data_file": self.__data_file})
+            self.__workshops = workshops
+            self.__version = data.get("version", 0)
+            self.__saved_digest = data.get("content_hash")
+            self.__raw_digests = {}
+            self.invalidate_digest()
+            self.__base_hashes = hashes
+            self.__dirty.clear()
+            if not report.ok:
+                write_quarantine(self.__data_file + ".quarantine.json", report, self.__version)
+            self.__load_report = report
+            self.__save_log("Загрузка данных", {
+                "data_file": self.__data_file,
+                "version": self.__version,
+                "workshops": len(workshops),
+                "employees": report.employees,
+                "reused_workshops": reused,
+                "quarantined": len(report.issues)
+            })
             return True
 
         except FileNotFoundError:
             return False
-        except Exception as e:
+        except ValueError as e:
+            # Файл не разбирается как JSON или не является данными завода
+            self.__load_report = None
             self.__save_log("Ошибка загрузки данных", {"error": str(e)})
             return False
 
+    def __journal(self, *record) -> None:
+        """
+        Запись изменения в журнал до его применения.
+
+        Если журнал разросся, перед записью сохраняется снимок: все
+        предыдущие изменения к этому моменту уже применены.
+        """
+        if self.__wal is None:
+            return
+        if not self.__bulk:
+            self.__snapshot_if_needed()
+        self.__wal.append(*record)
+
+    def __snapshot_if_needed(self) -> None:
+        """Сохранение снимка, если журнал разросся."""
+        if self.__wal is None or len(self.__wal) < self.__snapshot_every:
+            return
+        try:
+            self.save_data()
+        except ConflictError as e:
+            self.__save_log("Ошибка сохранения снимка", {"error": str(e)})
+
+    def __journal_workshop(self, workshop: WorkShop, op: str, *args) -> None:
+        """Запись изменения состава цеха в журнал."""
+        if self.__wal is not None:
+            if op == "hire":
+                self.__journal(HIRE, workshop.name, *[encode_employee(e) for e in args])
+            elif op == "fire":
+                self.__journal(FIRE, workshop.name, *args)
+            elif op == "clear":
+                self.__journal(CLEAR, workshop.name)
+            elif op == "chief":
+                self.__journal(CHIEF, workshop.name, encode_employee(args[0]))
+        # После журнала: сохранение снимка в нем очищает список измененных цехов
+        self.__dirty.add(workshop.name)
+
+    def __adopt(self, workshop: WorkShop) -> None:
+        """Подключение цеха к журналу и шине событий завода."""
+        workshop.set_journal(self.__journal_workshop)
+        workshop.events.parent = self.events
+
+    def __attach_journal(self) -> None:
+        """Подключение журнала и шины событий ко всем цехам завода."""
+        for workshop in self.__workshops:
+            if isinstance(workshop, WorkShop):
+                self.__adopt(workshop)
+
+    def __replay(self, records) -> int:
+        """
+        Повторное применение записей журнала.
+
+        Args:
+            records: Записи журнала
+
+        Returns:
+            Количество примененных записей
+        """
+        self.invalidate_digest()
+        workshops: Dict[str, WorkShop] = {}
+        for workshop in self.__workshops:
+            # Повтор не пишется в журнал заново (журнал подключается после повтора)
+            workshop.set_journal(None)
+            workshops.setdefault(workshop.name, workshop)
+
+        # Состав цехов, затронутых приемом и увольнением, собирается в словарях
+        # ID -> работник (прием и увольнение - O(1), порядок списка сохраняется)
+        # и переносится в цеха один раз в конце. Принятые работники хранятся
+        # записями журнала и создаются только если не уволены до конца журнала
+        staffs: Dict[int, Tuple[WorkShop, Dict[str, Union[Employee, List[Any]]]]] = {}
+        # Собираемый состав по названию цеха (прием и увольнение - большая часть
+        # журнала: для них на запись приходится один поиск в словаре)
+        staged: Dict[str, Dict[str, Union[Employee, List[Any]]]] = {}
+        dirty = self.__dirty
+
+        def stage(name: str) -> Optional[Dict[str, Union[Employee, List[Any]]]]:
+            dirty.add(name)
+            workshop = workshops.get(name)
+            if workshop is None:
+                return None
+            staff = staged[name] = {e.get_id(): e for e in workshop.get_employees()}
+            staffs[id(workshop)] = (workshop, staff)
+            return staff
+
+        count = 0
+        for record in records:
+            op = record[0]
+            if op == HIRE:
+                staff = staged.get(record[1])
+                if staff is None:
+                    staff = stage(record[1])
+                if staff is not None:
+                    for data in record[2:]:
+                        staff[data[1]] = data
+                count += 1
+                continue
+            if op == FIRE:
+                staff = staged.get(record[1])
+                if staff is None:
+                    staff = stage(record[1])
+                if staff is not None:
+                    for emp_id in record[2:]:
+                        staff.pop(emp_id, None)
+                count += 1
+                continue
+
+            dirty.add(record[1])
+            if op == ADD_WORKSHOP:
+                workshop = WorkShop(record[1], decode_employee(record[2]),
+                                    [decode_employee(e) for e in record[3]])
+                # Цех с тем же названием заменяется, а не дублируется: после падения
+                # между записью снимка и очисткой журнала журнал повторяется поверх
+                # снимка, который уже содержит его записи
+                previous = workshops.get(workshop.name)
+                if previous is None:
+                    self.__workshops.append(workshop)
+                else:
+                    for i, current in enumerate(self.__workshops):
+                        if current is previous:
+                            self.__workshops[i] = workshop
+                            break
+                    staffs.pop(id(previous), None)
+                    staged.pop(workshop.name, None)
+                workshops[workshop.name] = workshop
+            elif op == REMOVE_WORKSHOP:
+                name = record[1]
+                for i, workshop in enumerate(self.__workshops):
+                    if workshop.name == name:
+                        self.__workshops.pop(i)
+                        staffs.pop(id(workshop), None)
+                        break
+                workshops.pop(name, None)
+                staged.pop(name, None)
+                for workshop in self.__workshops:
+                    if workshop.name == name:
+                        workshops[name] = workshop
+                        break
+            elif op == CLEAR:
+                staff = staged.get(record[1])
+                if staff is None:
+                    staff = stage(record[1])
+                if staff is not None:
+                    staff.clear()
+            elif op == CHIEF:
+                workshop = workshops.get(record[1])
+                if workshop is not None:
+                    workshop.set_chief(decode_employee(record[2]))
+            else:
+                continue
+            count += 1
+
+        for workshop, staff in staffs.values():
+            workshop.del_employees()
+            workshop += [decode_employee(e) if isinstance(e, list) else e for e in staff.values()]
+        return count
+
+    def __build_workshop(self, workshop_data: Dict[str, Any]) -> WorkShop:
+        """
+        Создание цеха из словаря.
+
+        Args:
+            workshop_data: Словарь с данными цеха
+
+        Returns:
+            Цех с начальником и работниками
+
+        Raises:
+            ValueError: Если тип работника неизвестен (записи файла
+                        данных проверяются до создания цехов)
+        """
+        chief_data = workshop_data["chief"]
+        chief = Chief(
+            name=chief_data["name"],
+            surname=chief_data["surname"],
+            age=chief_data["age"],
+            gender=Gender(chief_data["gender"])
+        )
+        chief.set_id(chief_data["id"])
+
+        employees = [employee_from_dict(emp_data) for emp_data in workshop_data.get("employees", [])]
+        return WorkShop(workshop_data["name"], chief, employees)
+
+    def log_action(self, action: str, details: Dict[str, Any]) -> None:
+        """
+        Запись действия в лог завода.
+
+        Args:
+            action: Описание действия
+            details: Детали действия
+        """
+        self.__save_log(action, details)
+
+    @measured("log")
     def __save_log(self, action: str, details: Dict[str, Any]) -> None:
         """
         Сохранение лога действий.
@@ -174,29 +1272,24 @@ class Factory():
             "details": details
         }
 
-        logs = []
-        if os.path.exists(self.__log_file):
-            try:
-                with open(self.__log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            except:
-                logs = []
+        with FileLock(self.__log_file):
+            logs = []
+            if os.path.exists(self.__log_file):
+                try:
+                    with open_text(self.__log_file) as f:
+                        logs = json.load(f)
+                except:
+                    logs = []
 
-        logs.append(log_entry)
+            logs.append(log_entry)
 
-        with open(self.__log_file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=2)
+            with atomic_write(self.__log_file, self.__compression, self.__compression_level) as f:
+                json.dump(logs, f, ensure_ascii=False, indent=2)
 
     def __str__(self) -> str:
-        """Строковое представление завода."""
-        result = f"Завод: {self.name}\n"
-        result += f"Количество цехов: {len(self.__workshops)}\n"
-
-        total_employees = 0
-        for workshop in self.__workshops:
-            employees_count = len(workshop.get_employees())
-            total_employees += employees_count
-            result += f"\n{workshop.name}: {employees_count} работников"
-
-        result += f"\n\nВсего работников на заводе: {total_employees}"
-        return result
+        """Строковое представление завода (по сводке, без загрузки работников)."""
+        by_workshop = self.get_summary()["by_workshop"]
+        lines = [f"Завод: {self.name}", f"Количество цехов: {len(by_workshop)}", ""]
+        lines += [f"{w['name']}: {w['employees']} работников" for w in by_workshop]
+        lines.append(f"\nВсего работников на заводе: {sum(w['employees'] for w in by_workshop)}")
+        return "\n".join(lines)
@@ -0,0 +1,301 @@
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from employees import Employee, Worker
+from events import Event, EventType
+from merkle import digest_sum, factory_digest, employee_digest, workshop_digest
+
+
+class EmployeeRecord(NamedTuple):
+    """Неизменяемая запись о работнике в снимке истории."""
+
+    id: str
+    type: str
+    name: str
+    surname: str
+    age: int
+    gender: str
+    post: str
+    role: Optional[str]
+
+    @classmethod
+    def from_employee(cls, employee: Employee) -> "EmployeeRecord":
+        """Создание записи по текущему состоянию работника."""
+        return cls(
+            employee.get_id(),
+            employee.__class__.__name__,
+            employee.name,
+            employee.surname,
+            employee.age,
+            employee.gender.value,
+            employee.get_post(),
+            employee.get_role() if isinstance(employee, Worker) else None
+        )
+
+    def matches(self, employee: Employee) -> bool:
+        """Совпадает ли запись с текущим состоянием работника."""
+        return (self.name == employee.name and self.surname == employee.surname
+                and self.age == employee.age and self.gender == employee.gender.value
+                and self.type == employee.__class__.__name__)
+
+    def get_id(self) -> str:
+        """Получение идентификатора работника."""
+        return self.id
+
+    def digest(self) -> int:
+        """Хеш записи (совпадает с Employee.digest для тех же данных)."""
+        return employee_digest(self.type, self.id, self.name, self.surname, self.age, self.gender)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование записи в словарь (формат Employee.to_dict)."""
+        info = {
+            "id": self.id,
+            "name": self.name,
+            "surname": self.surname,
+            "age": self.age,
+            "gender": self.gender,
+            "post": self.post,
+        }
+        if self.role is not None:
+            info["role"] = self.role
+        info["type"] = self.type
+        return info
+
+    def __str__(self) -> str:
+        return f"{self.name} {self.surname}"
+
+
+class WorkShopSnapshot:
+    """Неизменяемое представление цеха в одной из версий истории."""
+
+    __slots__ = ("name", "chief", "employees", "_digest")
+
+    def __init__(self, name: str, chief: EmployeeRecord, employees: Tuple[EmployeeRecord, ...]):
+        """
+        Инициализация снимка цеха.
+
+        Args:
+            name: Название цеха
+            chief: Запись о начальнике цеха
+            employees: Записи о работниках цеха
+        """
+        self.name = name
+        self.chief = chief
+        self.employees = employees
+        self._digest: Optional[int] = None
+
+    def digest(self) -> int:
+        """Хеш снимка цеха (совпадает с WorkShop.digest для тех же данных)."""
+        if self._digest is None:
+            self._digest = workshop_digest(self.name, self.chief.digest(),
+                                           digest_sum(e.digest() for e in self.employees),
+                                           len(self.employees))
+        return self._digest
+
+    def get_chief(self) -> EmployeeRecord:
+        """Получение начальника цеха."""
+        return self.chief
+
+    def get_employees(self) -> Tuple[EmployeeRecord, ...]:
+        """Получение работников цеха."""
+        return self.employees
+
+    def get_employees_by_role(self) -> Dict[str, int]:
+        """Получение распределения работников по специализациям."""
+        distribution = {}
+        for employee in self.employees:
+            key = employee.role or employee.post
+            distribution[key] = distribution.get(key, 0) + 1
+        return distribution
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование снимка цеха в словарь (формат WorkShop.to_dict)."""
+        return {
+            "name": self.name,
+            "chief": self.chief.to_dict(),
+            "employees": [e.to_dict() for e in self.employees],
+            "employee_count": len(self.employees),
+            "distribution": self.get_employees_by_role()
+        }
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+
+class FactorySnapshot:
+    """Неизменяемое представление завода в одной из версий истории."""
+
+    def __init__(self, revision: int, timestamp: datetime, name: str, data_version: int,
+                 workshops: Tuple[WorkShopSnapshot, ...]):
+        """
+        Инициализация снимка завода.
+
+        Args:
+            revision: Номер версии в истории
+            timestamp: Время создания версии
+            name: Название завода
+            data_version: Версия файла данных на момент снимка
+            workshops: Снимки цехов
+        """
+        self.revision = revision
+        self.timestamp = timestamp
+        self.name = name
+        self.data_version = data_version
+        self.__workshops = workshops
+        self.__digest: Optional[int] = None
+
+    def digest(self) -> int:
+        """Хеш снимка завода (совпадает с Factory.digest для тех же данных)."""
+        if self.__digest is None:
+            self.__digest = factory_digest(self.name, digest_sum(w.digest() for w in self.__workshops),
+                                           len(self.__workshops))
+        return self.__digest
+
+    def get_workshop(self, name: str) -> Optional[WorkShopSnapshot]:
+        """Получение цеха по имени."""
+        for workshop in self.__workshops:
+            if workshop.name == name:
+                return workshop
+        return None
+
+    def get_all_workshops(self) -> List[WorkShopSnapshot]:
+        """Получение списка всех цехов."""
+        return list(self.__workshops)
+
+    def __str__(self) -> str:
+        """Строковое представление версии завода."""
+        lines = [
+            f"Завод: {self.name} (версия {self.revision}, {self.timestamp.isoformat(timespec='seconds')})",
+            f"Количество цехов: {len(self.__workshops)}",
+            ""
+        ]
+        lines += [f"{w.name}: {len(w)} работников" for w in self.__workshops]
+        lines.append(f"\nВсего работников на заводе: {sum(len(w) for w in self.__workshops)}")
+        return "\n".join(lines)
+
+
+class FactoryHistory:
+    """
+    История версий завода с копированием при записи.
+
+    Каждая версия хранит кортеж снимков цехов. Цеха, которые не менялись
+    с предыдущей версии (по событиям завода), переиспользуются целиком, а
+    записи о неизменившихся работниках - поштучно, поэтому память растет
+    пропорционально изменениям, а не размеру завода.
+
+    Изменения полей работников в обход API (без событий) обнаруживаются
+    только в цехах, которые менялись в этой версии.
+    """
+
+    def __init__(self, factory):
+        """
+        Инициализация истории.
+
+        Args:
+            factory: Завод, историю которого нужно вести
+        """
+        self.__factory = factory
+        self.__versions: List[FactorySnapshot] = []
+        self.__timestamps: List[datetime] = []
+        self.__changed: set = set()
+        self.__all_changed = True
+        # Последний снимок каждого цеха вместе с объектом, по которому он сделан
+        self.__workshop_cache: Dict[str, Tuple[Any, WorkShopSnapshot]] = {}
+        self.__records: Dict[str, EmployeeRecord] = {}
+        factory.events.subscribe(self.__on_events, batched=True)
+
+    def __on_events(self, events: List[Event]) -> None:
+        """Учет цехов, изменившихся с последней версии."""
+        for event in events:
+            if event.type == EventType.FACTORY_LOADED:
+                self.__all_changed = True
+            else:
+                if event.workshop is not None:
+                    self.__changed.add(event.workshop)
+                if event.source is not None:
+                    self.__changed.add(event.source)
+
+    def commit(self, timestamp: Optional[datetime] = None) -> FactorySnapshot:
+        """
+        Создание новой версии по текущему состоянию завода.
+
+        Args:
+            timestamp: Время версии (по умолчанию - текущее)
+
+        Returns:
+            Созданная версия
+        """
+        workshops = []
+        cache = {}
+        for workshop in self.__factory.get_all_workshops():
+            cached = self.__workshop_cache.get(workshop.name)
+            if (cached is not None and cached[0] is workshop
+                    and not self.__all_changed and workshop.name not in self.__changed):
+                snapshot = cached[1]
+            else:
+                snapshot = WorkShopSnapshot(
+                    workshop.name,
+                    self.__record(workshop.get_chief()),
+                    tuple(self.__record(e) for e in workshop.get_employees())
+                )
+            cache[workshop.name] = (workshop, snapshot)
+            workshops.append(snapshot)
+
+        self.__workshop_cache = cache
+        self.__changed = set()
+        self.__all_changed = False
+
+        timestamp = timestamp or datetime.now()
+        if self.__timestamps and timestamp < self.__timestamps[-1]:
+            timestamp = self.__timestamps[-1]
+        version = FactorySnapshot(
+            len(self.__versions) + 1,
+            timestamp,
+            self.__factory.name,
+            self.__factory.get_version(),
+            tuple(workshops)
+        )
+        self.__versions.append(version)
+        self.__timestamps.append(timestamp)
+        return version
+
+    def __record(self, employee: Employee) -> EmployeeRecord:
+        """Запись о работнике (существующая, если он не менялся)."""
+        record = self.__records.get(employee.get_id())
+        if record is None or not record.matches(employee):
+            record = EmployeeRecord.from_employee(employee)
+            self.__records[record.id] = record
+        return record
+
+    def at(self, version_or_timestamp: Union[int, datetime, str]) -> FactorySnapshot:
+        """
+        Получение состояния завода на момент версии или времени.
+
+        Args:
+            version_or_timestamp: Номер версии, datetime или строка ISO 8601
+
+        Returns:
+            Версия завода (только для чтения)
+
+        Raises:
+            LookupError: Если такой версии нет
+        """
+        if isinstance(version_or_timestamp, int):
+            if not 1 <= version_or_timestamp <= len(self.__versions):
+                raise LookupError(f"Версия {version_or_timestamp} не найдена")
+            return self.__versions[version_or_timestamp - 1]
+
+        if isinstance(version_or_timestamp, str):
+            version_or_timestamp = datetime.fromisoformat(version_or_timestamp)
+        index = bisect_right(self.__timestamps, version_or_timestamp)
+        if index == 0:
+            raise LookupError(f"На момент {version_or_timestamp} версий нет")
+        return self.__versions[index - 1]
+
+    def __len__(self) -> int:
+        return len(self.__versions)
+
+    def versions(self) -> List[Tuple[int, datetime, int]]:
+        """Список версий: (номер, время, версия файла данных)."""
+        return [(v.revision, v.timestamp, v.data_version) for v in self.__versions]
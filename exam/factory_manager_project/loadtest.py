@@ -0,0 +1,432 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from employees import Chief, Gender
+from factory import Factory
+from storage import ConflictError, lock_stats, reset_lock_stats
+from wal import session_logs
+from workers import Locksmith, Miller, Turner
+from workshop import WorkShop
+
+OPERATIONS = ("hire", "fire", "view", "compare", "save")
+DEFAULT_MIX = "hire=30,fire=20,view=30,compare=15,save=5"
+NAMES = ["Иван", "Петр", "Анна", "Мария", "Олег", "Елена"]
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов"]
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """
+    Разбор набора операций вида "hire=30,fire=20,view=50".
+
+    Args:
+        text: Операции с весами через запятую
+
+    Returns:
+        Словарь {операция: вес}
+
+    Raises:
+        ValueError: Если операция неизвестна или вес не целое неотрицательное число
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Неизвестная операция: {name!r} (допустимы: {', '.join(OPERATIONS)})")
+        if not weight.isdigit():
+            raise ValueError(f"Вес операции {name!r} должен быть целым неотрицательным числом")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("Сумма весов операций должна быть больше нуля")
+    return mix
+
+
+def prepare(workdir: str, workshops: int, employees: int, seed: int = 0) -> str:
+    """
+    Создание файла данных завода для нагрузочного теста.
+
+    Args:
+        workdir: Каталог теста
+        workshops: Количество цехов
+        employees: Количество работников в каждом цехе
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        Путь к файлу данных
+    """
+    rnd = random.Random(seed)
+    data_file = os.path.join(workdir, "factory_data.json")
+    factory = Factory(use_wal=False, data_file=data_file, log_file=os.path.join(workdir, "factory_log.json"))
+    for w in range(workshops):
+        staff = [_person(rnd) for _ in range(employees)]
+        factory.add_workshop(WorkShop(f"Цех {w + 1}", Chief("Олег", "Петров", 45, Gender.MALE), staff))
+    factory.save_data()
+    return data_file
+
+
+def _person(rnd: random.Random):
+    """Случайный рабочий."""
+    worker_class = rnd.choice((Turner, Locksmith, Miller))
+    return worker_class(rnd.choice(NAMES), rnd.choice(SURNAMES), rnd.randint(18, 65),
+                        rnd.choice((Gender.MALE, Gender.FEMALE)))
+
+
+class Session:
+    """
+    Сеанс оператора: те же вызовы завода и записи в лог, что у пунктов меню.
+
+    hire - "Добавить работника", fire - "Удалить работника", view -
+    "Просмотр состояния завода" и страница работников цеха, compare -
+    "Сравнение цехов", save - "Сохранить данные" (при конфликте данные
+    загружаются заново, как советует меню).
+
+    Сеанс запоминает ID принятых работников, которые не были отменены
+    повторной загрузкой после конфликта, и ID всех уволенных: по ним после
+    теста проверяется, что восстановление не потеряло изменений.
+    """
+
+    def __init__(self, factory: Factory, rnd: random.Random, lock=None):
+        """
+        Инициализация сеанса.
+
+        Args:
+            factory: Завод сеанса (в режиме потоков - общий)
+            rnd: Генератор случайных чисел сеанса
+            lock: Блокировка общего завода (в режиме потоков)
+        """
+        self.factory = factory
+        self.rnd = rnd
+        self.lock = lock
+        self.conflicts = 0
+        self.hired: set = set()
+        self.fired: set = set()
+        # Принятые после последнего сохранения (отменяются при повторной загрузке)
+        self.__pending: set = set()
+
+    def __workshop(self) -> WorkShop:
+        return self.rnd.choice(self.factory.get_all_workshops())
+
+    def hire(self) -> None:
+        workshop = self.__workshop()
+        employee = _person(self.rnd)
+        workshop += employee
+        self.__pending.add(employee.get_id())
+        self.factory.log_action("Добавление работника", {
+            "workshop": workshop.name, "employee": str(employee), "position": employee.get_post()
+        })
+
+    def fire(self) -> None:
+        workshop = self.__workshop()
+        count = workshop.get_employee_count()
+        if not count:
+            return
+        idx = self.rnd.randrange(count)
+        employee = workshop.get_emloyee(idx)
+        workshop.remove_employee(idx)
+        self.fired.add(employee.get_id())
+        self.factory.log_action("Удаление работника", {
+            "workshop": workshop.name, "employee": str(employee), "position": employee.get_post()
+        })
+
+    def view(self) -> None:
+        str(self.factory)
+        workshop = self.__workshop()
+        "\n".join(f"{i}. {e}" for i, e in enumerate(workshop.get_employees_slice(0, 20), 1))
+
+    def compare(self) -> None:
+        w1, w2 = self.__workshop(), self.__workshop()
+        self.factory.log_action("Сравнение цехов", {
+            "workshop1": w1.name,
+            "workshop2": w2.name,
+            "are_equal_distribution": w1 == w2,
+            "workshop1_count": w1.get_employee_count(),
+            "workshop2_count": w2.get_employee_count(),
+            "workshop1_lt_workshop2": w1 < w2,
+            "workshop1_gt_workshop2": w1 > w2
+        })
+
+    def save(self) -> None:
+        try:
+            self.factory.save_data()
+        except ConflictError:
+            self.conflicts += 1
+            self.factory.load_data()
+        else:
+            self.hired |= self.__pending
+        self.__pending.clear()
+
+    def run(self, mix: Dict[str, int], deadline: float) -> Dict[str, Any]:
+        """
+        Выполнение случайных операций до наступления deadline.
+
+        Returns:
+            {"latencies": {операция: [секунды]}, "errors": {операция: количество}, "conflicts",
+            "hired": [ID], "fired": [ID]}
+        """
+        ops = [op for op in mix if mix[op]]
+        weights = [mix[op] for op in ops]
+        actions: Dict[str, Callable[[], None]] = {op: getattr(self, op) for op in ops}
+        latencies: Dict[str, List[float]] = {op: [] for op in ops}
+        errors: Dict[str, int] = {}
+        while time.perf_counter() < deadline:
+            op = self.rnd.choices(ops, weights)[0]
+            start = time.perf_counter()
+            try:
+                if self.lock is not None:
+                    with self.lock:
+                        actions[op]()
+                else:
+                    actions[op]()
+            except Exception:
+                errors[op] = errors.get(op, 0) + 1
+            latencies[op].append(time.perf_counter() - start)
+        # Несохраненные приемы остаются в журнале сеанса и должны пережить восстановление
+        return {"latencies": latencies, "errors": errors, "conflicts": self.conflicts,
+                "hired": sorted(self.hired | self.__pending), "fired": sorted(self.fired)}
+
+
+def _process_session(data_file: str, log_file: str, mix: Dict[str, int], duration: float,
+                     seed: int, start_at: float, results) -> None:
+    """
+    Сеанс в отдельном процессе: свой завод над общими файлами.
+
+    Завод настроен как у меню (журнал, быстрый запуск, recover). В конце
+    сеанс завершается без сохранения: несохраненное остается в его журнале.
+    """
+    factory = Factory(lazy=True, data_file=data_file, log_file=log_file)
+    factory.recover()
+    factory.get_all_workshops()
+    reset_lock_stats()
+    time.sleep(max(0.0, start_at - time.time()))
+    result = Session(factory, random.Random(seed)).run(mix, time.perf_counter() + duration)
+    factory.close()
+    result["locks"] = lock_stats()
+    results.put(result)
+
+
+def verify(data_file: str, log_file: str, results: List[Dict[str, Any]]) -> int:
+    """
+    Проверка сохранности изменений: восстановление (снимок и журналы
+    сеансов) должно вернуть всех принятых сеансами работников, которых
+    никто не уволил.
+
+    Args:
+        data_file: Файл данных завода
+        log_file: Файл лога завода
+        results: Результаты сеансов
+
+    Returns:
+        Количество потерянных работников
+    """
+    fired = set()
+    expected = set()
+    for result in results:
+        fired.update(result["fired"])
+        expected.update(result["hired"])
+    factory = Factory(data_file=data_file, log_file=log_file)
+    factory.recover()
+    present = {e.get_id() for w in factory.get_all_workshops() for e in w.get_employees()}
+    factory.close()
+    return len(expected - fired - present)
+
+
+def run(sessions: int, duration: float, mix: Dict[str, int], data_file: str,
+        mode: str = "process", seed: int = 0, timeout: float = 30.0) -> Dict[str, Any]:
+    """
+    Нагрузочный тест: sessions одновременных сеансов в течение duration секунд.
+
+    В режиме "process" у каждого сеанса свой процесс и свой завод над
+    общими файлами данных и лога (как у нескольких запущенных меню):
+    сохранения идут через compare-and-swap, возможны конфликты. В режиме
+    "thread" сеансы - потоки с общим заводом под одной блокировкой (как
+    меню с фоновым автосохранением). Заводы ведут журнал, как в рабочей
+    конфигурации; после теста восстановление проверяется через verify.
+
+    Args:
+        sessions: Количество сеансов
+        duration: Длительность теста (секунды)
+        mix: Веса операций {операция: вес}
+        data_file: Файл данных завода
+        mode: "process" или "thread"
+        seed: Зерно генераторов случайных чисел сеансов
+        timeout: Сколько ждать результатов процессов сверх duration (секунды);
+                 не приславшие результат процессы считаются упавшими
+
+    Returns:
+        Итоги: операции, пропускная способность, задержки, ошибки, конфликты,
+        блокировки файлов, упавшие сеансы, потерянные изменения
+    """
+    log_file = os.path.join(os.path.dirname(data_file), "factory_log.json")
+    results: List[Dict[str, Any]] = []
+    dead = 0
+    if mode == "process":
+        results_queue = multiprocessing.Queue()
+        start_at = time.time() + 1.0
+        workers = [
+            multiprocessing.Process(target=_process_session,
+                                    args=(data_file, log_file, mix, duration, seed + i, start_at, results_queue))
+            for i in range(sessions)
+        ]
+        for worker in workers:
+            worker.start()
+        deadline = start_at + duration + timeout
+        while len(results) < len(workers):
+            try:
+                results.append(results_queue.get(timeout=0.5))
+            except queue.Empty:
+                # Упавший процесс результата не пришлет: не ждем его до бесконечности
+                if time.time() > deadline or not any(w.is_alive() for w in workers):
+                    break
+        while len(results) < len(workers):
+            try:
+                results.append(results_queue.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        dead = len(workers) - len(results)
+    elif mode == "thread":
+        factory = Factory(data_file=data_file, log_file=log_file)
+        factory.recover()
+        lock = threading.Lock()
+        reset_lock_stats()
+        deadline = time.perf_counter() + duration
+
+        def target(i: int) -> None:
+            results.append(Session(factory, random.Random(seed + i), lock).run(mix, deadline))
+
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        factory.close()
+        for result in results:
+            result["locks"] = {}
+        results[0]["locks"] = lock_stats()
+    else:
+        raise ValueError(f"Неизвестный режим: {mode!r}")
+    report = summarize(results, duration)
+    report["dead_sessions"] = dead
+    report["lost"] = verify(data_file, log_file, results)
+    return report
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Процентиль отсортированного списка (ближайший ранг)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(results: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    """
+    Сведение результатов сеансов.
+
+    Args:
+        results: Результаты Session.run с полем "locks"
+        duration: Длительность теста (секунды)
+
+    Returns:
+        {"operations", "throughput", "conflicts", "by_operation": {...}, "locks": {...}}
+    """
+    by_operation = {}
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for result in results:
+        for op, values in result["latencies"].items():
+            latencies.setdefault(op, []).extend(values)
+        for op, count in result["errors"].items():
+            errors[op] = errors.get(op, 0) + count
+    for op, values in latencies.items():
+        values.sort()
+        by_operation[op] = {
+            "count": len(values),
+            "throughput": len(values) / duration,
+            "p50": _percentile(values, 0.50),
+            "p90": _percentile(values, 0.90),
+            "p99": _percentile(values, 0.99),
+            "max": values[-1] if values else 0.0,
+            "errors": errors.get(op, 0),
+        }
+
+    locks: Dict[str, Dict[str, float]] = {}
+    for result in results:
+        for path, stats in result["locks"].items():
+            total = locks.setdefault(os.path.basename(path), {"acquired": 0, "contended": 0, "wait": 0.0, "max_wait": 0.0})
+            total["acquired"] += stats["acquired"]
+            total["contended"] += stats["contended"]
+            total["wait"] += stats["wait"]
+            total["max_wait"] = max(total["max_wait"], stats["max_wait"])
+
+    operations = sum(op["count"] for op in by_operation.values())
+    return {
+        "sessions": len(results),
+        "operations": operations,
+        "throughput": operations / duration,
+        "conflicts": sum(r["conflicts"] for r in results),
+        "by_operation": by_operation,
+        "locks": locks,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Вывод итогов нагрузочного теста."""
+    print(f"Сеансов: {report['sessions']}, операций: {report['operations']}, "
+          f"пропускная способность: {report['throughput']:.1f} оп/с, конфликтов сохранения: {report['conflicts']}")
+    if report.get("dead_sessions"):
+        print(f"Сеансов без результата (упали или зависли): {report['dead_sessions']}")
+    print(f"Потеряно работников после восстановления: {report.get('lost', 0)}")
+    print(f"{'операция':>10} {'кол-во':>8} {'оп/с':>8} {'p50, мс':>9} {'p90, мс':>9} "
+          f"{'p99, мс':>9} {'макс, мс':>9} {'ошибок':>7}")
+    for op, s in sorted(report["by_operation"].items()):
+        print(f"{op:>10} {s['count']:>8} {s['throughput']:>8.1f} {s['p50'] * 1000:>9.2f} {s['p90'] * 1000:>9.2f} "
+              f"{s['p99'] * 1000:>9.2f} {s['max'] * 1000:>9.2f} {s['errors']:>7}")
+    print("Блокировки файлов:")
+    for path, s in sorted(report["locks"].items()):
+        share = s["contended"] / s["acquired"] * 100 if s["acquired"] else 0.0
+        print(f"  {path}: захватов {s['acquired']}, с ожиданием {s['contended']} ({share:.0f}%), "
+              f"ожидание всего {s['wait']:.2f} с, наибольшее {s['max_wait'] * 1000:.1f} мс")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запуск нагрузочного теста из командной строки."""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест: одновременные сеансы операторов")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Количество сеансов (несколько значений - серия запусков)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность запуска (секунды)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Веса операций (по умолчанию {DEFAULT_MIX})")
+    parser.add_argument("--mode", choices=("process", "thread"), default="process")
+    parser.add_argument("--workshops", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=200, help="Работников в каждом цехе")
+    parser.add_argument("--workdir", help="Каталог теста (по умолчанию временный)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="Ожидание результатов процессов сверх длительности (секунды)")
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    for sessions in args.sessions:
+        workdir = args.workdir or tempfile.mkdtemp(prefix="factory_load_")
+        os.makedirs(workdir, exist_ok=True)
+        data_file = os.path.join(workdir, "factory_data.json")
+        # Журналы прошлого запуска иначе восстановились бы поверх нового файла
+        for path in [data_file, os.path.join(workdir, "factory_log.json")] + session_logs(data_file):
+            if os.path.exists(path):
+                os.unlink(path)
+        data_file = prepare(workdir, args.workshops, args.employees, args.seed)
+        print(f"\n=== {sessions} сеанс(ов), режим {args.mode}, {args.duration:.0f} с ===")
+        print_report(run(sessions, args.duration, mix, data_file, args.mode, args.seed, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,39 @@
+import argparse
+import os
+
 from menu_facade import Menu
+from registry import FactoryRegistry
+from storage import DEFAULT_LEVELS
 
 def main():
     """Основная функция программы."""
-    menu = Menu()
+    parser = argparse.ArgumentParser(description="Система управления заводом")
+    parser.add_argument("--plant", help="Идентификатор завода в реестре (по умолчанию - файлы в текущем каталоге)")
+    parser.add_argument("--root", default="factories", help="Каталог реестра заводов")
+    parser.add_argument("--autosave", type=float, default=2.0,
+                        help="Пауза перед фоновым автосохранением в секундах (0 - выключить)")
+    parser.add_argument("--compression", choices=sorted(DEFAULT_LEVELS) + ["none"],
+                        help="Сжатие файлов данных и лога при записи (по умолчанию - по расширению файла)")
+    parser.add_argument("--level", type=int, help="Уровень сжатия")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Учет памяти (tracemalloc) с отчетом при выходе")
+    args = parser.parse_args()
+    autosave = args.autosave if args.autosave > 0 else None
+
+    options = dict(fast_start=True, autosave=autosave, compression=args.compression,
+                   compression_level=args.level)
+    if args.plant:
+        data_file, log_file = FactoryRegistry(args.root).paths(args.plant)
+        os.makedirs(os.path.dirname(data_file), exist_ok=True)
+        menu = Menu(data_file=data_file, log_file=log_file, **options)
+    else:
+        menu = Menu(**options)
+    if args.profile_memory:
+        menu.factory.enable_memory_profiling()
     menu.run()
+    if args.profile_memory:
+        print(menu.factory.memory_report())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,280 @@
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LAYERS = ("factory", "workshop", "employee", "serialization", "log", "other")
+
+# Слой по модулю проекта
+MODULE_LAYERS = {
+    "factory.py": "factory",
+    "events.py": "factory",
+    "ranking.py": "factory",
+    "search.py": "factory",
+    "history.py": "factory",
+    "optimizer.py": "factory",
+    "scheduler.py": "factory",
+    "pager.py": "factory",
+    "registry.py": "factory",
+    "autosave.py": "factory",
+    "workshop.py": "workshop",
+    "employees.py": "employee",
+    "workers.py": "employee",
+    "storage.py": "serialization",
+    "validation.py": "serialization",
+    "parallel.py": "serialization",
+    "wal.py": "serialization",
+    "merkle.py": "serialization",
+}
+# Модули стандартной библиотеки, относящиеся к сериализации
+SERIALIZATION_MODULES = frozenset(("gzip.py", "lzma.py", "_compression.py"))
+
+
+class MemoryReport:
+    """Отчет о памяти: занятая память по слоям и пики по операциям."""
+
+    def __init__(self, traced: int, peak: int, layers: Dict[str, Dict[str, int]],
+                 operations: Dict[str, Dict[str, int]], top: List[Dict[str, Any]]):
+        """
+        Инициализация отчета.
+
+        Args:
+            traced: Занятая память (байты)
+            peak: Пик занятой памяти с момента включения или сброса (байты)
+            layers: Занятая память по слоям {слой: {"size", "blocks"}}
+            operations: Операции завода {операция: {"calls", "peak", "last_peak", "retained"}}
+            top: Крупнейшие места выделения {"layer", "line", "size", "blocks"}
+        """
+        self.traced = traced
+        self.peak = peak
+        self.layers = layers
+        self.operations = operations
+        self.top = top
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Отчет в виде словаря."""
+        return {
+            "traced": self.traced,
+            "peak": self.peak,
+            "layers": self.layers,
+            "operations": self.operations,
+            "top": self.top,
+        }
+
+    def __str__(self) -> str:
+        lines = [f"Занято: {_mb(self.traced)}, пик: {_mb(self.peak)}"]
+        for layer in LAYERS:
+            stats = self.layers.get(layer)
+            if stats:
+                lines.append(f"  {layer}: {_mb(stats['size'])} ({stats['blocks']} блоков)")
+        for name, stats in sorted(self.operations.items()):
+            lines.append(f"  {name}: вызовов {stats['calls']}, пик {_mb(stats['peak'])}, "
+                         f"последний пик {_mb(stats['last_peak'])}, осталось {_mb(stats['retained'])}")
+        for place in self.top:
+            lines.append(f"  {place['line']} [{place['layer']}]: {_mb(place['size'])}")
+        return "\n".join(lines)
+
+
+def _mb(size: int) -> str:
+    return f"{size / 2 ** 20:.1f} МБ"
+
+
+class MemoryTracker:
+    """
+    Учет памяти завода на основе tracemalloc (включается явно).
+
+    Выделения относятся к слою по стеку вызовов: к слою лога - если в
+    стеке есть зарегистрированная функция лога, иначе - по самому
+    внутреннему кадру из модулей проекта или json (объекты работников -
+    employee, списки цехов - workshop, разобранное дерево JSON и
+    JSON-фрагменты - serialization). Для операций завода (загрузка,
+    сохранение, запись лога) запоминается пик памяти сверх занятой на
+    начало операции. tracemalloc действует на весь процесс, поэтому при
+    одновременных операциях в нескольких потоках пики приблизительны.
+    """
+
+    def __init__(self, frames: int = 6):
+        """
+        Инициализация учета.
+
+        Args:
+            frames: Глубина стека вызовов, сохраняемого для выделений
+        """
+        self.frames = frames
+        # Функции слоев: (файл, первая строка, последняя строка, слой)
+        self.__spans: List[Tuple[str, int, int, str]] = []
+        self.__operations: Dict[str, Dict[str, int]] = {}
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__started = False
+
+    @property
+    def active(self) -> bool:
+        """Идет ли трассировка выделений."""
+        import tracemalloc
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        """Включение трассировки (если она еще не включена)."""
+        # tracemalloc и inspect импортируются лениво: модуль загружается при
+        # каждом запуске, а учет памяти включается только явно
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.__started = True
+
+    def stop(self) -> None:
+        """Выключение трассировки, если ее включил этот учет."""
+        if self.__started:
+            import tracemalloc
+            tracemalloc.stop()
+            self.__started = False
+
+    def register(self, layer: str, function: Callable) -> None:
+        """
+        Отнесение всех выделений внутри функции к слою.
+
+        Args:
+            layer: Слой
+            function: Функция или метод (в том числе обернутый measured)
+        """
+        import inspect
+        code = inspect.unwrap(function).__code__
+        last = max(line for _, _, line in code.co_lines() if line is not None)
+        self.__spans.append((code.co_filename, code.co_firstlineno, last, layer))
+
+    @contextmanager
+    def measure(self, operation: str) -> Iterator[None]:
+        """
+        Учет пика памяти операции.
+
+        Вложенные операции (запись лога при сохранении) учитываются и сами
+        по себе, и в пике внешней операции.
+
+        Args:
+            operation: Название операции
+        """
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        stack = getattr(self.__local, "stack", None)
+        if stack is None:
+            stack = self.__local.stack = []
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        # [занято на начало, наибольший пик вложенных операций]
+        frame = [current, current]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame[1])
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            with self.__lock:
+                stats = self.__operations.setdefault(operation, {"calls": 0, "peak": 0, "last_peak": 0, "retained": 0})
+                stats["calls"] += 1
+                stats["last_peak"] = peak - frame[0]
+                stats["peak"] = max(stats["peak"], stats["last_peak"])
+                stats["retained"] = current - frame[0]
+
+    def reset(self) -> None:
+        """Сброс статистики операций и пика памяти."""
+        with self.__lock:
+            self.__operations.clear()
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def layer_of(self, traceback: "tracemalloc.Traceback") -> str:
+        """
+        Слой выделения по стеку вызовов.
+
+        Args:
+            traceback: Стек вызовов выделения (от внешнего кадра к внутреннему)
+
+        Returns:
+            Название слоя
+        """
+        for frame in traceback:
+            for filename, first, last, layer in self.__spans:
+                if frame.lineno >= first and frame.lineno <= last and frame.filename == filename:
+                    return layer
+        for frame in reversed(traceback):
+            directory, name = os.path.split(frame.filename)
+            if directory == PROJECT_DIR and name in MODULE_LAYERS:
+                return MODULE_LAYERS[name]
+            if os.path.basename(directory) == "json" or name in SERIALIZATION_MODULES:
+                return "serialization"
+        return "other"
+
+    def report(self, limit: int = 10) -> MemoryReport:
+        """
+        Отчет о занятой памяти по слоям и пиках операций.
+
+        Args:
+            limit: Количество крупнейших мест выделения в отчете
+
+        Returns:
+            Отчет
+
+        Raises:
+            LookupError: Если учет памяти не включен
+        """
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            raise LookupError("Учет памяти не включен (enable_memory_profiling)")
+        traced, peak = tracemalloc.get_traced_memory()
+        # Выделения учета отбрасываются после группировки (filter_traces медленнее на порядки)
+        layers: Dict[str, Dict[str, int]] = {}
+        places = []
+        for stat in tracemalloc.take_snapshot().statistics("traceback"):
+            if stat.traceback[-1].filename in (tracemalloc.__file__, __file__):
+                continue
+            layer = self.layer_of(stat.traceback)
+            totals = layers.setdefault(layer, {"size": 0, "blocks": 0})
+            totals["size"] += stat.size
+            totals["blocks"] += stat.count
+            places.append((stat.size, stat.count, layer, stat.traceback[-1]))
+
+        # Крупнейшие места выделения - по строке самого внутреннего кадра
+        by_line: Dict[Tuple[str, str], List[int]] = {}
+        for size, count, layer, frame in places:
+            totals = by_line.setdefault((layer, f"{os.path.basename(frame.filename)}:{frame.lineno}"), [0, 0])
+            totals[0] += size
+            totals[1] += count
+        top = [{"layer": layer, "line": line, "size": size, "blocks": blocks}
+               for (layer, line), (size, blocks) in sorted(by_line.items(), key=lambda item: -item[1][0])[:limit]]
+        with self.__lock:
+            operations = {name: dict(stats) for name, stats in self.__operations.items()}
+        return MemoryReport(traced, peak, layers, operations, top)
+
+
+def measured(operation: str) -> Callable[[Callable], Callable]:
+    """
+    Декоратор метода завода: учет пика памяти операции в self.memory (если учет включен).
+
+    Args:
+        operation: Название операции
+    """
+    def decorate(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracker: Optional[MemoryTracker] = self.memory
+            if tracker is None:
+                return method(self, *args, **kwargs)
+            with tracker.measure(operation):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -1,25 +1,48 @@
-from datetime import datetime
-import json
+from contextlib import nullcontext
+from typing import Optional
 import os
 from employees import Chief, Employee
 from workshop import WorkShop
 from factory import Factory
+from autosave import AutoSaver
 from workers import *
+from storage import ConflictError
+from pager import Pager
+from ranking import employee_role
+from validation import check_field, check_workshop_name
 
 
 class Menu:
     """Класс-фасад для взаимодействия с пользователем и управления всей системой."""
 
-    def __init__(self, factory_name: str = "ООО 'Промышленный Завод'"):
+    def __init__(self, factory_name: str = "ООО 'Промышленный Завод'", fast_start: bool = False,
+                 data_file: str = "factory_data.json", log_file: str = "factory_log.json",
+                 autosave: Optional[float] = None, compression: Optional[str] = None,
+                 compression_level: Optional[int] = None):
         """
         Инициализация меню-фасада.
 
         Args:
             factory_name: Название завода
+            fast_start: Быстрый запуск: файлы создаются при первой записи,
+                        цеха загружаются при первом обращении
+            data_file: Путь к файлу данных завода
+            log_file: Путь к файлу лога завода
+            autosave: Пауза без изменений перед фоновым автосохранением
+                      (секунды); None - автосохранение выключено
+            compression: Сжатие файлов данных и лога ("gzip", "lzma", "zlib",
+                         "none"; по умолчанию - по расширению файла)
+            compression_level: Уровень сжатия
         """
-        self.factory = Factory(factory_name)
-        self.data_file = "factory_data.json"
-        self.log_file = "factory_log.json"
+        self.factory = Factory(factory_name, lazy=fast_start, data_file=data_file, log_file=log_file,
+                               compression=compression, compression_level=compression_level)
+        self.data_file = data_file
+        self.log_file = log_file
+        self.autosave_delay = autosave
+        self.autosaver: Optional[AutoSaver] = None
+
+        if fast_start:
+            return
 
         if not os.path.exists(self.log_file):
             self._save_log("Инициализация системы", {"factory_name": factory_name})
@@ -29,49 +52,49 @@ class Menu:
 
     def _save_log(self, action: str, details: dict) -> None:
         """
-        Сохранение лога действий.
+        Сохранение лога действий (через завод: формат и сжатие файла лога общие).
 
         Args:
             action: Описание действия
             details: Детали действия
         """
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "action": action,
-            "details": details
-        }
-
-        logs = []
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            except:
-                logs = []
+        self.factory.log_action(action, details)
 
-        logs.append(log_entry)
-
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=2)
+    def _save_data(self) -> bool:
+        """
+        Сохранение данных завода в JSON файл.
 
-    def _save_data(self) -> None:
-        """Сохранение данных завода в JSON файл."""
-        workshops_data = []
-        for workshop in self.factory.get_all_workshops():
-            workshops_data.append(workshop.to_dict())
+        Returns:
+            True если сохранение прошло успешно, иначе False
+        """
+        try:
+            if self.autosaver is not None:
+                self.autosaver.save_now()
+            else:
+                self.factory.save_data()
+            return True
+        except ConflictError as e:
+            print(f"Ошибка сохранения: {e}")
+            print("Загрузите данные заново и повторите изменения.")
+            return False
 
-        data = {
-            "factory_name": self.factory.name,
-            "workshops": workshops_data,
-            "total_workshops": len(self.factory.get_all_workshops()),
-            "total_employees": sum(len(w.get_employees()) for w in self.factory.get_all_workshops()),
-            "save_timestamp": datetime.now().isoformat()
-        }
+    def _locked(self):
+        """
+        Блокировка автосохранения на время одного изменения завода.
 
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        Берется только вокруг самого изменения, а не на время ввода:
+        пока оператор отвечает на вопросы, автосохранение продолжает работать.
+        """
+        return self.autosaver.lock if self.autosaver is not None else nullcontext()
 
-        self._save_log("Сохранение данных", {"data_file": self.data_file})
+    def _discard_changes(self) -> None:
+        """Отмена несохраненных изменений перед выходом (журнал очищается)."""
+        if self.autosaver is not None:
+            # Иначе фоновое сохранение может успеть записать отменяемые изменения
+            self.autosaver.stop()
+            self.autosaver = None
+        self.factory.discard_journal()
+        self._save_log("Отмена несохраненных изменений", {"data_file": self.data_file})
 
     def _load_data(self) -> bool:
         """
@@ -80,80 +103,62 @@ class Menu:
         Returns:
             True если загрузка прошла успешно, иначе False
         """
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            self.factory.name = data.get("factory_name", self.factory.name)
-
-            for workshop_data in data.get("workshops", []):
-                chief_data = workshop_data["chief"]
-                chief = Chief(
-                    name=chief_data["name"],
-                    surname=chief_data["surname"],
-                    age=chief_data["age"],
-                    gender=Gender(chief_data["gender"])
-                )
-                chief._id = chief_data["id"]
-
-                employees = []
-                for emp_data in workshop_data.get("employees", []):
-                    emp_type = emp_data.get("type", "Worker")
-
-                    if emp_type == "Chief":
-                        emp = Chief(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    elif emp_type == "Turner":
-                        emp = Turner(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    elif emp_type == "Locksmith":
-                        emp = Locksmith(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    elif emp_type == "Miller":
-                        emp = Miller(
-                            name=emp_data["name"],
-                            surname=emp_data["surname"],
-                            age=emp_data["age"],
-                            gender=Gender(emp_data["gender"])
-                        )
-                    else:
-                        continue
-
-                    emp._id = emp_data["id"]
-                    employees.append(emp)
-
-                workshop = WorkShop(workshop_data["name"], chief, employees)
-                self.factory.add_workshop(workshop)
-
-            self._save_log("Загрузка данных", {"data_file": self.data_file})
-            return True
-
-        except FileNotFoundError:
-            return False
-        except Exception as e:
-            self._save_log("Ошибка загрузки данных", {"error": str(e)})
+        with self._locked():
+            if self.autosaver is not None:
+                # Фоновая запись не должна идти во время загрузки и учитываться после нее
+                self.autosaver.discard_pending()
+            loaded = self.factory.load_data()
+        if not loaded:
             return False
+        self._print_load_report()
+        return True
+
+    def _print_load_report(self) -> None:
+        """Вывод отбракованных при загрузке записей (если они есть)."""
+        report = self.factory.get_load_report()
+        if report is None or report.ok:
+            return
+        print(f"Внимание! {report}")
+        for issue in report.issues[:10]:
+            print(f"  {issue['path']}: {issue['error']}")
+        if len(report.issues) > 10:
+            print(f"  ... и еще {len(report.issues) - 10}")
+
+    @staticmethod
+    def _input_field(prompt: str, field: str, convert=str):
+        """
+        Ввод поля работника с повтором до корректного значения.
+
+        Значение проверяется теми же правилами, что и записи файла при
+        загрузке, поэтому введенный работник не попадет в карантин.
+
+        Args:
+            prompt: Приглашение к вводу
+            field: Имя поля работника
+            convert: Преобразование введенной строки
+
+        Returns:
+            Проверенное значение поля
+        """
+        while True:
+            raw = input(prompt)
+            try:
+                value = convert(raw)
+            except ValueError:
+                value = raw
+            error = check_field(field, value)
+            if error is None:
+                return value
+            print(f"Ошибка: {error}")
 
     def _create_employee(self) -> Employee:
         """Создание работника через пользовательский ввод."""
         print("\nСоздание нового работника")
         print("-"*20)
 
-        name = input("Имя: ")
-        surname = input("Фамилия: ")
-        age = int(input("Возраст: "))
+        name = self._input_field("Имя: ", "name")
+        surname = self._input_field("Фамилия: ", "surname")
+        age = self._input_field("Возраст: ", "age", int)
 
         print("Выберите пол:")
         print("1. Мужской")
@@ -213,6 +218,13 @@ class Menu:
         """Создание нового цеха."""
         print("\nСоздание нового цеха")
         name = input("Название цеха: ")
+        error = check_workshop_name(name)
+        if error is not None:
+            print(f"Ошибка: {error}")
+            return
+        if self.factory.get_workshop(name) is not None:
+            print(f"Ошибка: Цех '{name}' уже существует")
+            return
 
         print("\nСоздание начальника цеха:")
         chief = self._create_employee()
@@ -221,7 +233,8 @@ class Menu:
             return
 
         workshop = WorkShop(name, chief, [])
-        self.factory.add_workshop(workshop)
+        with self._locked():
+            self.factory.add_workshop(workshop)
         self._save_log("Создание цеха", {"workshop_name": name, "chief": str(chief)})
         print(f"Цех '{name}' успешно создан!")
 
@@ -238,7 +251,9 @@ class Menu:
     def _remove_workshop(self) -> None:
         """Удаление цеха с завода."""
         name = input("Введите название цеха для удаления: ")
-        if self.factory.remove_workshop(name):
+        with self._locked():
+            removed = self.factory.remove_workshop(name)
+        if removed:
             self._save_log("Удаление цеха", {"workshop_name": name})
             print(f"Цех '{name}' успешно удален!")
         else:
@@ -253,10 +268,11 @@ class Menu:
             print("1. Добавить работника в цех")
             print("2. Удалить работника из цеха")
             print("3. Просмотреть работников цеха")
-            print("4. Назад")
+            print("4. Поиск работников")
+            print("5. Назад")
             print("-"*30)
 
-            employee_choice = input("Ваш выбор (1-4): ")
+            employee_choice = input("Ваш выбор (1-5): ")
 
             if employee_choice == "1":
                 self._add_employee_to_workshop()
@@ -268,6 +284,9 @@ class Menu:
                 self._view_workshop_employees()
 
             elif employee_choice == "4":
+                self._search_employees()
+
+            elif employee_choice == "5":
                 break
             else:
                 print("Неверный выбор!")
@@ -279,7 +298,8 @@ class Menu:
 
         if workshop:
             employee = self._create_employee()
-            workshop += employee
+            with self._locked():
+                workshop += employee
             self._save_log("Добавление работника", {
                 "workshop": workshop_name,
                 "employee": str(employee),
@@ -296,15 +316,15 @@ class Menu:
 
         if workshop:
             print(f"\nРаботники цеха '{workshop_name}':")
-            employees = workshop.get_employees()
-            for i, emp in enumerate(employees, 1):
-                print(f"{i}. {emp} ({emp.get_post()})")
+            self._employee_pager(workshop, lambda i, emp: f"{i}. {emp} ({emp.get_post()})").browse()
 
             try:
                 idx = int(input("\nВведите номер работника для удаления: ")) - 1
-                if 0 <= idx < len(employees):
-                    employee = employees[idx]
-                    workshop.remove_employee(idx)
+                with self._locked():
+                    employee = workshop.get_emloyee(idx) if 0 <= idx < workshop.get_employee_count() else None
+                    if employee is not None:
+                        workshop.remove_employee(idx)
+                if employee is not None:
                     self._save_log("Удаление работника", {
                         "workshop": workshop_name,
                         "employee": str(employee),
@@ -326,25 +346,72 @@ class Menu:
         if workshop:
             print(f"\n{workshop}")
             print("Список работников:")
-            employees = workshop.get_employees()
-            for i, emp in enumerate(employees, 1):
-                info = emp.get_info()
-                role_info = f" ({info.get('role', '')})" if 'role' in info else ""
-                print(f"{i}. {emp} - {info['post']}{role_info}")
+            self._employee_pager(workshop, self._employee_row).browse()
         else:
             print(f"Цех с названием '{workshop_name}' не найден")
 
+    @staticmethod
+    def _employee_row(i: int, emp: Employee) -> str:
+        """Строка списка работников: номер, имя, должность и специализация."""
+        post = emp.get_post()
+        role = employee_role(emp)
+        role_info = f" ({role})" if role != post else ""
+        return f"{i}. {emp} - {post}{role_info}"
+
+    @staticmethod
+    def _employee_pager(workshop: WorkShop, render, page_size: int = 20) -> Pager:
+        """Постраничный вывод работников цеха (выбираются только строки видимой страницы)."""
+        return Pager(workshop.get_employee_count(), workshop.get_employees_slice, render, page_size)
+
+    def _search_employees(self) -> None:
+        """Поиск работников по всему заводу."""
+        print("\nУсловия поиска (пустой ввод - без условия):")
+        surname = input("Начало фамилии: ").strip()
+        name = input("Начало имени: ").strip()
+        role = input("Специализация или должность: ").strip()
+        try:
+            age_min = input("Возраст от: ").strip()
+            age_max = input("Возраст до: ").strip()
+            age_min = int(age_min) if age_min else None
+            age_max = int(age_max) if age_max else None
+        except ValueError:
+            print("Введите число!")
+            return
+
+        found = self.factory.search_employees(
+            name=name or None,
+            surname=surname or None,
+            age_min=age_min,
+            age_max=age_max,
+            role=role or None
+        )
+        if not found:
+            print("Работники не найдены")
+            return
+
+        print(f"\nНайдено работников: {len(found)}")
+        for i, (emp, workshop_name) in enumerate(found, 1):
+            info = emp.get_info()
+            role_info = f" ({info.get('role', '')})" if 'role' in info else ""
+            print(f"{i}. {emp}, {emp.age} - {info['post']}{role_info}, цех '{workshop_name}'")
+
     def _view_factory_state(self) -> None:
         """Просмотр текущего состояния завода."""
         print("\n" + "="*50)
         print(self.factory)
 
-        workshops = self.factory.get_all_workshops()
+        # Детали берутся из сводки: работники цехов не загружаются
+        workshops = self.factory.get_summary()["by_workshop"]
         if workshops:
             print("\nДетальная информация по цехам:")
             for workshop in workshops:
                 print(f"\n{'-'*30}")
-                print(workshop)
+                print(f"Цех: {workshop['name']}")
+                print(f"Начальник: {workshop['chief']}")
+                print(f"Общее количество работников: {workshop['employees']}")
+                for role, count in workshop["roles"].items():
+                    print(f"  {role}: {count}")
+                print()
 
     def _compare_workshops(self) -> None:
         """Сравнение цехов по распределению работников."""
@@ -355,7 +422,7 @@ class Menu:
 
         print("\nСписок цехов:")
         for i, workshop in enumerate(workshops, 1):
-            print(f"{i}. {workshop.name} (работников: {len(workshop.get_employees())})")
+            print(f"{i}. {workshop.name} (работников: {workshop.get_employee_count()})")
 
         try:
             idx1 = int(input("Введите номер первого цеха: ")) - 1
@@ -374,8 +441,10 @@ class Menu:
                     print("✗ Цеха имеют разное распределение работников по классам!")
 
                 print(f"\nСравнение по количеству работников:")
-                print(f"В цехе '{w1.name}': {len(w1.get_employees())} работников")
-                print(f"В цехе '{w2.name}': {len(w2.get_employees())} работников")
+                print(f"В цехе '{w1.name}': {w1.get_employee_count()} работников")
+                print(f"В цехе '{w2.name}': {w2.get_employee_count()} работников")
+                print(f"Место по численности: '{w1.name}' - {self.factory.rank(w1.name)}, "
+                      f"'{w2.name}' - {self.factory.rank(w2.name)} из {len(workshops)}")
 
                 if w1 < w2:
                     print(f"✓ '{w1.name}' МЕНЬШЕ чем '{w2.name}' по количеству работников")
@@ -405,8 +474,8 @@ class Menu:
                     "workshop1": w1.name,
                     "workshop2": w2.name,
                     "are_equal_distribution": w1 == w2,
-                    "workshop1_count": len(w1.get_employees()),
-                    "workshop2_count": len(w2.get_employees()),
+                    "workshop1_count": w1.get_employee_count(),
+                    "workshop2_count": w2.get_employee_count(),
                     "workshop1_lt_workshop2": w1 < w2,
                     "workshop1_gt_workshop2": w1 > w2
                 })
@@ -418,12 +487,32 @@ class Menu:
 
     def run(self) -> None:
         """Запуск основного цикла меню."""
-        if self._load_data():
+        loaded, replayed = self.factory.recover()
+        if loaded:
             print("Данные успешно загружены!")
-
+            print(f"Завод '{self.factory.name}': цехов {self.factory.get_workshop_count()}, "
+                  f"работников {self.factory.get_employee_count()}")
+            self._print_load_report()
+        if replayed:
+            print(f"Восстановлено несохраненных изменений: {replayed}")
+
+        if self.autosave_delay is not None:
+            self.autosaver = AutoSaver(self.factory, self.autosave_delay, max(self.autosave_delay * 5, 10.0))
+        try:
+            self._loop()
+        finally:
+            if self.autosaver is not None:
+                self.autosaver.stop()
+                self.autosaver = None
+            self.factory.close()
+
+    def _loop(self) -> None:
+        """Основной цикл меню."""
         while True:
             print("\n" + "="*50)
             print("СИСТЕМА УПРАВЛЕНИЯ ЗАВОДОМ")
+            if self.autosaver is not None:
+                print(self.autosaver.status())
             print("="*50)
             print("1. Управление цехами")
             print("2. Управление работниками")
@@ -436,35 +525,53 @@ class Menu:
 
             choice = input("Ваш выбор (1-7): ")
 
-            if choice == "1":
-                self._manage_workshops()
+            if not self._dispatch(choice):
+                break
+
+    def _dispatch(self, choice: str) -> bool:
+        """
+        Выполнение команды главного меню.
 
-            elif choice == "2":
-                self._manage_employees()
+        Args:
+            choice: Выбранный пункт меню
 
-            elif choice == "3":
-                self._save_data()
-                print("Данные успешно сохранены!")
+        Returns:
+            False если нужно завершить работу
+        """
+        if choice == "1":
+            self._manage_workshops()
 
-            elif choice == "4":
-                if self._load_data():
-                    print("Данные успешно загружены!")
-                else:
-                    print("Ошибка при загрузке данных!")
+        elif choice == "2":
+            self._manage_employees()
 
-            elif choice == "5":
-                self._view_factory_state()
+        elif choice == "3":
+            if self._save_data():
+                print("Данные успешно сохранены!")
+
+        elif choice == "4":
+            if self._load_data():
+                print("Данные успешно загружены!")
+            else:
+                print("Ошибка при загрузке данных!")
 
-            elif choice == "6":
-                self._compare_workshops()
+        elif choice == "5":
+            self._view_factory_state()
 
-            elif choice == "7":
-                save = input("Сохранить данные перед выходом? (y/n): ")
-                if save.lower() == 'y':
-                    self._save_data()
-                    print("Данные сохранены!")
-                print("До свидания!")
-                break
+        elif choice == "6":
+            self._compare_workshops()
 
+        elif choice == "7":
+            save = input("Сохранить данные перед выходом? (y - сохранить, n - отменить изменения, еще не записанные в файл): ")
+            if save.lower() == 'y':
+                if not self._save_data():
+                    return True
+                print("Данные сохранены!")
             else:
-                print("Неверный выбор! Попробуйте снова.")
+                self._discard_changes()
+                print("Изменения, еще не записанные в файл, отменены")
+            print("До свидания!")
+            return False
+
+        else:
+            print("Неверный выбор! Попробуйте снова.")
+        return True
@@ -0,0 +1,157 @@
+from typing import Any, Dict, Iterable, List
+
+# Суммы хешей детей берутся по модулю 2**160: порядок работников и цехов
+# не влияет на хеш, а повторы не сокращаются (в отличие от XOR)
+MODULUS = 1 << 160
+
+
+def _sha1(*parts: Any) -> int:
+    """Хеш SHA-1 от полей, разделенных символом \\x1f, в виде числа."""
+    # hashlib импортируется лениво: хеши нужны при сохранении и сравнении,
+    # а модуль загружается при каждом запуске (через employees)
+    import hashlib
+    text = "\x1f".join(map(str, parts))
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest(), "big")
+
+
+def employee_digest(emp_type: str, emp_id: str, name: str, surname: str,
+                    age: int, gender: str) -> int:
+    """
+    Хеш работника по его полям.
+
+    Args:
+        emp_type: Имя класса работника
+        emp_id: Идентификатор работника
+        name: Имя
+        surname: Фамилия
+        age: Возраст
+        gender: Пол (значение Gender)
+
+    Returns:
+        Хеш работника
+    """
+    return _sha1("E", emp_type, emp_id, name, surname, age, gender)
+
+
+def workshop_digest(name: str, chief: int, employees_sum: int, count: int) -> int:
+    """
+    Хеш цеха по хешам начальника и работников.
+
+    Args:
+        name: Название цеха
+        chief: Хеш начальника
+        employees_sum: Сумма хешей работников по модулю MODULUS
+        count: Количество работников
+
+    Returns:
+        Хеш цеха
+    """
+    return _sha1("W", name, chief, employees_sum, count)
+
+
+def workshop_dict_digest(data: Dict[str, Any]) -> int:
+    """
+    Хеш цеха, записанного словарем (формат WorkShop.to_dict).
+
+    Совпадает с WorkShop.digest для тех же данных.
+
+    Args:
+        data: Словарь цеха
+
+    Returns:
+        Хеш цеха
+    """
+    def person(e):
+        return employee_digest(e["type"], e["id"], e["name"], e["surname"], e["age"], e["gender"])
+
+    staff = data.get("employees", [])
+    return workshop_digest(data["name"], person(data["chief"]),
+                           sum(person(e) for e in staff) % MODULUS, len(staff))
+
+
+def factory_digest(name: str, workshops_sum: int, count: int) -> int:
+    """
+    Хеш завода по хешам цехов.
+
+    Args:
+        name: Название завода
+        workshops_sum: Сумма хешей цехов по модулю MODULUS
+        count: Количество цехов
+
+    Returns:
+        Хеш завода (корень дерева)
+    """
+    return _sha1("F", name, workshops_sum, count)
+
+
+def digest_sum(digests: Iterable[int]) -> int:
+    """Сумма хешей по модулю MODULUS."""
+    return sum(digests) % MODULUS
+
+
+def to_hex(digest: int) -> str:
+    """Запись хеша в виде шестнадцатеричной строки."""
+    return format(digest, "040x")
+
+
+def diff(snapshot_a, snapshot_b) -> Dict[str, Any]:
+    """
+    Набор изменений, переводящий состояние A в состояние B.
+
+    Состояниями могут быть Factory или FactorySnapshot (любые объекты с
+    digest() и get_all_workshops()). Сравниваются хеши цехов, и только в
+    цеха с разными хешами выполняется спуск до работников.
+
+    Args:
+        snapshot_a: Исходное состояние
+        snapshot_b: Целевое состояние
+
+    Returns:
+        Словарь изменений: from/to (хеши корней), name (если изменилось),
+        workshops_added (цеха целиком), workshops_removed (названия),
+        workshops_changed (по цеху: chief, hired, updated, fired)
+    """
+    changes: Dict[str, Any] = {
+        "from": to_hex(snapshot_a.digest()),
+        "to": to_hex(snapshot_b.digest()),
+        "workshops_added": [],
+        "workshops_removed": [],
+        "workshops_changed": [],
+    }
+    if changes["from"] == changes["to"]:
+        return changes
+    if snapshot_a.name != snapshot_b.name:
+        changes["name"] = snapshot_b.name
+
+    workshops_a = {w.name: w for w in snapshot_a.get_all_workshops()}
+    workshops_b = {w.name: w for w in snapshot_b.get_all_workshops()}
+
+    for name, workshop in workshops_b.items():
+        old = workshops_a.get(name)
+        if old is None:
+            changes["workshops_added"].append(workshop.to_dict())
+        elif old.digest() != workshop.digest():
+            changes["workshops_changed"].append(_diff_workshop(old, workshop))
+    changes["workshops_removed"] = [name for name in workshops_a if name not in workshops_b]
+    return changes
+
+
+def _diff_workshop(old, new) -> Dict[str, Any]:
+    """Изменения состава одного цеха."""
+    change: Dict[str, Any] = {"name": new.name}
+    if old.get_chief().digest() != new.get_chief().digest():
+        change["chief"] = new.get_chief().to_dict()
+
+    old_staff = {e.get_id(): e for e in old.get_employees()}
+    hired: List[Dict[str, Any]] = []
+    updated: List[Dict[str, Any]] = []
+    for employee in new.get_employees():
+        previous = old_staff.pop(employee.get_id(), None)
+        if previous is None:
+            hired.append(employee.to_dict())
+        elif previous.digest() != employee.digest():
+            updated.append(employee.to_dict())
+    change["hired"] = hired
+    change["updated"] = updated
+    change["fired"] = list(old_staff)
+    return change
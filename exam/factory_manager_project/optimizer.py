@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Tuple
+
+from ranking import employee_role
+
+
+class RebalancePlan:
+    """План перераспределения работников: переводы групп работников между цехами."""
+
+    def __init__(self):
+        """Инициализация пустого плана."""
+        # Переводы: {"role", "source", "target", "employees": [ID]}
+        self.transfers: List[Dict[str, Any]] = []
+        # Недостижимые отклонения по специализациям: {специализация: {"surplus", "deficit"}}
+        self.unmet: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def moves(self) -> int:
+        """Количество переводимых работников."""
+        return sum(len(t["employees"]) for t in self.transfers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """План в виде словаря."""
+        return {"moves": self.moves, "transfers": self.transfers, "unmet": self.unmet}
+
+    def __str__(self) -> str:
+        lines = [f"Переводов: {self.moves}"]
+        lines += [f"{t['role']}: {t['source']} -> {t['target']}: {len(t['employees'])}" for t in self.transfers]
+        for role, gap in self.unmet.items():
+            lines.append(f"{role}: не хватает {gap['deficit']}, лишних {gap['surplus']}")
+        return "\n".join(lines)
+
+
+def _pair(surplus: List[Tuple[int, str]], deficit: List[Tuple[int, str]]) -> Tuple[List[Tuple[str, str, int]], int, int]:
+    """
+    Сопоставление избытков и недостатков одной специализации.
+
+    Перевод стоит одинаково между любыми цехами, поэтому задача о
+    потоке минимальной стоимости вырождается: любое полное сопоставление
+    дает минимум min(избыток, недостаток) переводов. Крупнейшие избытки
+    сопоставляются с крупнейшими недостатками, чтобы переводов между
+    разными парами цехов было меньше.
+
+    Returns:
+        (список (источник, цель, количество), оставшийся избыток, оставшийся недостаток)
+    """
+    surplus = sorted(surplus, reverse=True)
+    deficit = sorted(deficit, reverse=True)
+    pairs = []
+    i = j = 0
+    left = surplus[0][0] if surplus else 0
+    need = deficit[0][0] if deficit else 0
+    while i < len(surplus) and j < len(deficit):
+        count = min(left, need)
+        pairs.append((surplus[i][1], deficit[j][1], count))
+        left -= count
+        need -= count
+        if not left:
+            i += 1
+            left = surplus[i][0] if i < len(surplus) else 0
+        if not need:
+            j += 1
+            need = deficit[j][0] if j < len(deficit) else 0
+    rest_surplus = left + sum(s for s, _ in surplus[i + 1:])
+    rest_deficit = need + sum(d for d, _ in deficit[j + 1:])
+    return pairs, rest_surplus, rest_deficit
+
+
+def plan_rebalance(factory, targets: Dict[str, Dict[str, int]]) -> RebalancePlan:
+    """
+    Расчет плана перераспределения с минимальным числом переводов.
+
+    Специализация работника при переводе не меняется, поэтому задача
+    решается отдельно по каждой специализации: цеха с избытком отдают
+    работников цехам с недостатком. Цеха и специализации без цели не
+    участвуют. Численности берутся из кешей распределений цехов, по
+    работникам проходят только цеха-источники.
+
+    Args:
+        factory: Завод
+        targets: Целевая численность {цех: {специализация: количество}}
+
+    Returns:
+        План перераспределения
+
+    Raises:
+        KeyError: Если в targets указан несуществующий цех
+        ValueError: Если целевая численность отрицательна
+    """
+    workshops = {w.name: w for w in factory.get_all_workshops()}
+    by_role: Dict[str, Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]] = {}
+    for name, roles in targets.items():
+        if name not in workshops:
+            raise KeyError(name)
+        current = workshops[name].get_employees_by_role()
+        for role, target in roles.items():
+            if target < 0:
+                raise ValueError(f"Отрицательная целевая численность: {name}, {role}")
+            surplus, deficit = by_role.setdefault(role, ([], []))
+            delta = current.get(role, 0) - target
+            if delta > 0:
+                surplus.append((delta, name))
+            elif delta < 0:
+                deficit.append((-delta, name))
+
+    plan = RebalancePlan()
+    # Количество переводимых работников по цеху-источнику и специализации
+    wanted: Dict[str, Dict[str, List[Tuple[str, int]]]] = {}
+    for role, (surplus, deficit) in by_role.items():
+        pairs, rest_surplus, rest_deficit = _pair(surplus, deficit)
+        for source, target, count in pairs:
+            wanted.setdefault(source, {}).setdefault(role, []).append((target, count))
+        if rest_surplus or rest_deficit:
+            plan.unmet[role] = {"surplus": rest_surplus, "deficit": rest_deficit}
+
+    for source, roles in wanted.items():
+        # Один проход по цеху: переводятся последние принятые работники специализации
+        staff: Dict[str, List[str]] = {role: [] for role in roles}
+        for employee in workshops[source].get_employees():
+            ids = staff.get(employee_role(employee))
+            if ids is not None:
+                ids.append(employee.get_id())
+        for role, destinations in roles.items():
+            ids = staff[role]
+            for target, count in destinations:
+                plan.transfers.append({
+                    "role": role,
+                    "source": source,
+                    "target": target,
+                    "employees": ids[len(ids) - count:],
+                })
+                del ids[len(ids) - count:]
+    return plan
+
+
+def apply_plan(factory, plan: RebalancePlan) -> int:
+    """
+    Выполнение плана одной пакетной операцией.
+
+    Работники переводятся группами (Factory.move_employees) внутри
+    Factory.bulk: подписчики получают все события одним пакетом, снимок
+    по журналу сохраняется один раз после перевода.
+
+    Args:
+        factory: Завод
+        plan: План перераспределения
+
+    Returns:
+        Количество переведенных работников
+    """
+    moved = 0
+    with factory.bulk():
+        for transfer in plan.transfers:
+            moved += factory.move_employees(transfer["employees"], transfer["source"], transfer["target"])
+    factory.log_action("Перераспределение работников", {"moves": moved, "transfers": len(plan.transfers)})
+    return moved
@@ -0,0 +1,92 @@
+import sys
+from typing import Any, Callable, Optional, Sequence, TextIO
+
+
+class Pager:
+    """
+    Постраничный вывод длинных списков.
+
+    Строки запрашиваются только для видимой страницы (fetch(start, stop)),
+    страница собирается в одну строку и выводится одной записью в поток,
+    поэтому время вывода не зависит от длины списка.
+    """
+
+    def __init__(self, total: int, fetch: Callable[[int, int], Sequence[Any]],
+                 render: Callable[[int, Any], str], page_size: int = 20,
+                 out: Optional[TextIO] = None):
+        """
+        Инициализация постраничного вывода.
+
+        Args:
+            total: Количество строк
+            fetch: Функция fetch(start, stop), возвращающая элементы диапазона
+            render: Функция render(номер, элемент), возвращающая строку вывода
+            page_size: Количество строк на странице
+            out: Поток вывода (по умолчанию - sys.stdout)
+        """
+        self.total = total
+        self.page_size = max(1, page_size)
+        self.page = 0
+        self.__fetch = fetch
+        self.__render = render
+        self.__out = out
+
+    @property
+    def pages(self) -> int:
+        """Количество страниц (не меньше одной)."""
+        return max(1, -(-self.total // self.page_size))
+
+    def render_page(self, page: int) -> str:
+        """
+        Текст страницы.
+
+        Args:
+            page: Номер страницы (с нуля)
+
+        Returns:
+            Строки страницы и строка с номером страницы
+        """
+        start = page * self.page_size
+        stop = min(start + self.page_size, self.total)
+        items = self.__fetch(start, stop)
+        lines = [self.__render(start + i + 1, item) for i, item in enumerate(items)]
+        lines.append(f"-- Страница {page + 1} из {self.pages} (строки {start + 1 if stop else 0}-{stop} из {self.total}) --")
+        return "\n".join(lines) + "\n"
+
+    def show(self, page: Optional[int] = None) -> None:
+        """
+        Вывод страницы одной записью в поток.
+
+        Args:
+            page: Номер страницы (по умолчанию - текущая); ограничивается допустимым диапазоном
+        """
+        if page is not None:
+            self.page = min(max(page, 0), self.pages - 1)
+        out = self.__out or sys.stdout
+        out.write(self.render_page(self.page))
+        out.flush()
+
+    def browse(self, read: Optional[Callable[[str], str]] = None) -> None:
+        """
+        Интерактивный просмотр: n - следующая, p - предыдущая,
+        номер - переход к странице, q или пустой ввод - выход.
+
+        Args:
+            read: Функция чтения команды (по умолчанию - input)
+        """
+        read = read or input
+        self.show()
+        if self.pages == 1:
+            return
+        while True:
+            command = read("[n] след., [p] пред., [номер] страница, [q] выход: ").strip().lower()
+            if command in ("", "q"):
+                return
+            if command == "n":
+                self.show(self.page + 1)
+            elif command == "p":
+                self.show(self.page - 1)
+            elif command.isdigit():
+                self.show(int(command) - 1)
+            else:
+                print("Неверная команда!")
@@ -0,0 +1,167 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from employees import Employee, Gender
+from storage import json_fragment
+from validation import LoadReport, validate_workshop
+from workers import EMPLOYEE_TYPES
+from workshop import WorkShop
+
+# Границы цехов в файле данных (формат json.dump(..., indent=2)): объект цеха
+# начинается и заканчивается на уровне отступа 4, глубже - только его содержимое
+WORKSHOPS_START = '\n  "workshops": [\n'
+WORKSHOPS_END = '\n  ]\n}'
+WORKSHOP_SEPARATOR = '\n    },\n    {'
+
+
+def split_workshops(text: str) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """
+    Разбиение текста файла данных на заголовок и JSON-тексты цехов.
+
+    Args:
+        text: Содержимое файла данных
+
+    Returns:
+        (заголовок, тексты цехов) или None, если файл записан в другом формате
+    """
+    start = text.find(WORKSHOPS_START)
+    if start < 0 or not text.endswith(WORKSHOPS_END):
+        return None
+    try:
+        header = json.loads(text[:start].rstrip(",") + "\n}")
+    except ValueError:
+        return None
+
+    body = text[start + len(WORKSHOPS_START):-len(WORKSHOPS_END)]
+    parts = body.split(WORKSHOP_SEPARATOR)
+    if len(parts) != header.get("total_workshops"):
+        return None
+    chunks = []
+    last = len(parts) - 1
+    for i, part in enumerate(parts):
+        chunks.append(("{" if i else "") + part + ("\n    }" if i < last else ""))
+    return header, chunks
+
+
+def _build_workshop(data: Dict[str, Any]) -> WorkShop:
+    """Создание цеха из проверенного словаря (validate_workshop)."""
+    def person(e):
+        return EMPLOYEE_TYPES[e["type"]](e["name"], e["surname"], e["age"],
+                                         Gender(e["gender"]), e["id"])
+
+    employees = [person(e) for e in data.get("employees", [])]
+    chief = data["chief"]
+    chief = EMPLOYEE_TYPES["Chief"](chief["name"], chief["surname"], chief["age"],
+                                    Gender(chief["gender"]), chief["id"])
+    return WorkShop(data["name"], chief, employees)
+
+
+def _decode_chunks(chunks: List[Tuple[int, str]]) -> Tuple[List[Tuple[WorkShop, int]], LoadReport]:
+    """
+    Разбор и проверка цехов в процессе-исполнителе.
+
+    Returns:
+        (список (цех, хеш цеха), отчет проверки); хеши работников передаются с цехом
+    """
+    result = []
+    report = LoadReport()
+    for index, chunk in chunks:
+        data = validate_workshop(json.loads(chunk), index, report)
+        if data is not None:
+            workshop = _build_workshop(data)
+            result.append((workshop, workshop.digest()))
+    return result, report
+
+
+def _encode_records(records: List[Dict[str, Any]], indent: int) -> List[str]:
+    """Сериализация работников в процессе-исполнителе."""
+    return [json_fragment(record, indent) for record in records]
+
+
+def _batches(items: List[Any], workers: int) -> List[List[Any]]:
+    """Разбиение списка на пачки (по несколько на исполнителя для выравнивания нагрузки)."""
+    size = max(1, -(-len(items) // (workers * 4)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _pool(workers: int):
+    """
+    Пул процессов для разбора и сериализации цехов.
+
+    concurrent.futures импортируется только при создании пула: параллельный
+    режим включается явно, а обычный запуск не должен платить за импорт.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def load_workshops(text: str, workers: int
+                   ) -> Optional[Tuple[Dict[str, Any], List[Tuple[WorkShop, int]], LoadReport]]:
+    """
+    Параллельный разбор и проверка файла данных по цехам.
+
+    Тексты цехов разбираются в пуле процессов, результаты собираются в
+    исходном порядке цехов.
+
+    Args:
+        text: Содержимое файла данных
+        workers: Количество процессов
+
+    Returns:
+        (заголовок, список (цех, хеш цеха), отчет проверки) или None,
+        если формат файла не подходит
+    """
+    split = split_workshops(text)
+    if split is None:
+        return None
+    header, chunks = split
+    report = LoadReport()
+    built: List[Tuple[WorkShop, int]] = []
+    if not chunks:
+        return header, built, report
+    with _pool(workers) as pool:
+        for batch, batch_report in pool.map(_decode_chunks, _batches(list(enumerate(chunks)), workers)):
+            built.extend(batch)
+            report.extend(batch_report)
+    return header, built, report
+
+
+def warm_json_cache(workshops: List[WorkShop], workers: int, indent: int = 4) -> int:
+    """
+    Параллельное заполнение кеша JSON-фрагментов работников перед сохранением.
+
+    Сериализуются только работники без актуального кеша; остальное
+    сохранение - склейка строк в основном процессе.
+
+    Args:
+        workshops: Цеха
+        workers: Количество процессов
+        indent: Отступ цеха в файле данных
+
+    Returns:
+        Количество сериализованных работников
+    """
+    stale: List[Tuple[Employee, int]] = []
+    for workshop in workshops:
+        for employee in workshop.get_employees():
+            cached = employee._json
+            if cached is None or cached[0] != indent + 4:
+                stale.append((employee, indent + 4))
+        chief = workshop.get_chief()
+        if chief._json is None or chief._json[0] != indent + 2:
+            stale.append((chief, indent + 2))
+    if not stale:
+        return 0
+
+    with _pool(workers) as pool:
+        futures = []
+        for level in (indent + 2, indent + 4):
+            employees = [e for e, i in stale if i == level]
+            for batch in _batches(employees, workers):
+                futures.append((batch, level, pool.submit(
+                    _encode_records, [e.to_dict() for e in batch], level)))
+        for batch, level, future in futures:
+            for employee, text in zip(batch, future.result()):
+                employee._json = (level, text)
+    return len(stale)
@@ -0,0 +1,183 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from employees import Employee, Worker
+from events import Event, EventType
+
+
+def employee_role(employee: Employee) -> str:
+    """Специализация рабочего или должность для остальных работников."""
+    if isinstance(employee, Worker):
+        return employee.get_role()
+    return employee.get_post()
+
+
+class _SortedCounts:
+    """Отсортированный по численности список цехов: ключи (численность, название)."""
+
+    def __init__(self):
+        self.keys: List[Tuple[int, str]] = []
+        self.counts: Dict[str, int] = {}
+
+    def set(self, name: str, count: int) -> None:
+        """Установка численности цеха с перестановкой в списке."""
+        old = self.counts.get(name)
+        if old == count:
+            return
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (old, name))]
+        self.counts[name] = count
+        insort(self.keys, (count, name))
+
+    def remove(self, name: str) -> None:
+        """Удаление цеха из списка."""
+        old = self.counts.pop(name, None)
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (old, name))]
+
+
+class WorkshopRanking:
+    """
+    Индекс цехов, упорядоченных по численности (всего и по специализациям).
+
+    Поддерживается инкрементально по событиям завода: при приеме или
+    удалении работника меняется позиция только одного цеха (поиск -
+    бинарный). Запросы top_k, workshops_with и rank не сортируют цеха.
+    """
+
+    def __init__(self, factory):
+        """
+        Инициализация индекса.
+
+        Args:
+            factory: Завод, цеха которого индексируются
+        """
+        self.__factory = factory
+        self.__total = _SortedCounts()
+        self.__by_role: Dict[str, _SortedCounts] = {}
+        self.__stale = True
+        factory.events.subscribe(self.__on_events, batched=True)
+
+    def __rebuild(self) -> None:
+        """Полное построение индекса по текущему состоянию завода."""
+        self.__total = _SortedCounts()
+        self.__by_role = {}
+        workshops = self.__factory.get_all_workshops()
+        for workshop in workshops:
+            self.__total.set(workshop.name, len(workshop.get_employees()))
+        for workshop in workshops:
+            for role, count in workshop.get_employees_by_role().items():
+                self.__role_index(role).set(workshop.name, count)
+        self.__stale = False
+
+    def __role_index(self, role: str) -> _SortedCounts:
+        """Индекс по специализации (создается при первом обращении, все цеха - с нулем)."""
+        index = self.__by_role.get(role)
+        if index is None:
+            index = self.__by_role[role] = _SortedCounts()
+            index.counts = dict.fromkeys(self.__total.counts, 0)
+            index.keys = sorted((0, name) for name in index.counts)
+        return index
+
+    def __on_events(self, events: List[Event]) -> None:
+        """Инкрементальное обновление индекса по пакету событий."""
+        if self.__stale:
+            return
+        deltas: Dict[Tuple[Optional[str], str], int] = {}
+        # Добавленные цеха пересчитываются целиком по их текущему составу
+        added = set()
+
+        def change(workshop: str, employee: Employee, delta: int) -> None:
+            for key in ((None, workshop), (employee_role(employee), workshop)):
+                deltas[key] = deltas.get(key, 0) + delta
+
+        for event in events:
+            if event.type == EventType.EMPLOYEE_HIRED:
+                change(event.workshop, event.employee, 1)
+            elif event.type == EventType.EMPLOYEE_REMOVED:
+                change(event.workshop, event.employee, -1)
+            elif event.type == EventType.EMPLOYEE_MOVED:
+                change(event.source, event.employee, -1)
+                change(event.workshop, event.employee, 1)
+            elif event.type == EventType.WORKSHOP_ADDED:
+                added.add(event.workshop)
+            elif event.type == EventType.WORKSHOP_REMOVED:
+                added.discard(event.workshop)
+                self.__total.remove(event.workshop)
+                for index in self.__by_role.values():
+                    index.remove(event.workshop)
+                for key in [k for k in deltas if k[1] == event.workshop]:
+                    del deltas[key]
+            elif event.type == EventType.FACTORY_LOADED:
+                self.__stale = True
+                return
+
+        for (role, workshop), delta in deltas.items():
+            if workshop in added:
+                continue
+            index = self.__total if role is None else self.__role_index(role)
+            index.set(workshop, index.counts.get(workshop, 0) + delta)
+
+        for name in added:
+            workshop = self.__factory.get_workshop(name)
+            if workshop is None:
+                continue
+            self.__total.set(name, len(workshop.get_employees()))
+            distribution = workshop.get_employees_by_role()
+            for role in set(self.__by_role) | set(distribution):
+                self.__role_index(role).set(name, distribution.get(role, 0))
+
+    def __index(self, role: Optional[str]) -> _SortedCounts:
+        """Индекс по всем работникам или по специализации."""
+        if self.__stale:
+            self.__rebuild()
+        return self.__total if role is None else self.__role_index(role)
+
+    def top_k(self, n: int, role: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Самые крупные цеха.
+
+        Args:
+            n: Количество цехов
+            role: Считать только работников этой специализации
+
+        Returns:
+            Список (название, численность) по убыванию численности
+        """
+        keys = self.__index(role).keys
+        return [(name, count) for count, name in reversed(keys[max(len(keys) - n, 0):])]
+
+    def workshops_with(self, min: Optional[int] = None, max: Optional[int] = None,
+                       role: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Цеха с численностью в заданных границах (включительно).
+
+        Args:
+            min: Минимальная численность
+            max: Максимальная численность
+            role: Считать только работников этой специализации
+
+        Returns:
+            Список (название, численность) по возрастанию численности
+        """
+        keys = self.__index(role).keys
+        start = 0 if min is None else bisect_left(keys, (min,))
+        stop = len(keys) if max is None else bisect_left(keys, (max + 1,))
+        return [(name, count) for count, name in keys[start:stop]]
+
+    def rank(self, name: str, role: Optional[str] = None) -> Optional[int]:
+        """
+        Место цеха по численности (1 - самый крупный; равные делят место).
+
+        Args:
+            name: Название цеха
+            role: Считать только работников этой специализации
+
+        Returns:
+            Место цеха или None, если цеха нет
+        """
+        index = self.__index(role)
+        count = index.counts.get(name)
+        if count is None:
+            return None
+        return len(index.keys) - bisect_left(index.keys, (count + 1,)) + 1
@@ -0,0 +1,239 @@
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from factory import SUMMARY_VERSION, Factory
+from storage import ConflictError, read_header
+
+KEY_PATTERN = re.compile(r"^[\w.-]+$")
+DATA_FILE = "factory_data.json"
+LOG_FILE = "factory_log.json"
+
+
+class FactoryRegistry:
+    """
+    Реестр заводов: у каждого завода свой каталог с файлами данных и лога.
+
+    Заводы загружаются при первом обращении (в ленивом режиме) и
+    вытесняются из памяти, когда загруженных больше max_loaded: первым -
+    тот, к которому дольше всего не обращались. Несохраненные изменения
+    перед вытеснением записываются; завод, изменения которого конфликтуют
+    с файлом, остается загруженным (загруженных может стать больше
+    max_loaded, пока конфликт не разрешен). Сводные запросы отвечают по
+    заголовкам файлов, не загружая цеха.
+    """
+
+    def __init__(self, root: str = "factories", max_loaded: int = 4, **factory_options):
+        """
+        Инициализация реестра.
+
+        Args:
+            root: Каталог, в котором лежат каталоги заводов
+            max_loaded: Сколько заводов держать загруженными в памяти
+            factory_options: Параметры создания Factory (use_wal, workers, ...)
+        """
+        self.root = root
+        self.max_loaded = max_loaded
+        self.__options = factory_options
+        self.__loaded: "OrderedDict[str, Factory]" = OrderedDict()
+        os.makedirs(root, exist_ok=True)
+
+    def paths(self, key: str) -> Tuple[str, str]:
+        """
+        Пути к файлам данных и лога завода.
+
+        Args:
+            key: Идентификатор завода (буквы, цифры, "_", "-", ".")
+
+        Returns:
+            (файл данных, файл лога)
+
+        Raises:
+            ValueError: Если идентификатор недопустим
+        """
+        if not KEY_PATTERN.match(key) or key in (".", ".."):
+            raise ValueError(f"Недопустимый идентификатор завода: {key!r}")
+        directory = os.path.join(self.root, key)
+        return os.path.join(directory, DATA_FILE), os.path.join(directory, LOG_FILE)
+
+    def keys(self) -> List[str]:
+        """Идентификаторы всех заводов реестра."""
+        return sorted(
+            key for key in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, key, DATA_FILE))
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.paths(key)[0])
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def create(self, key: str, name: str) -> Factory:
+        """
+        Создание нового завода.
+
+        Args:
+            key: Идентификатор завода
+            name: Название завода
+
+        Returns:
+            Созданный завод
+
+        Raises:
+            ValueError: Если завод с таким идентификатором уже есть
+        """
+        if key in self:
+            raise ValueError(f"Завод {key!r} уже существует")
+        data_file, log_file = self.paths(key)
+        os.makedirs(os.path.dirname(data_file), exist_ok=True)
+        options = dict(self.__options, lazy=False)
+        factory = Factory(name, data_file=data_file, log_file=log_file, **options)
+        self.__remember(key, factory)
+        return factory
+
+    def get(self, key: str) -> Factory:
+        """
+        Получение завода (загружается при первом обращении).
+
+        Args:
+            key: Идентификатор завода
+
+        Returns:
+            Завод
+
+        Raises:
+            KeyError: Если завода нет
+        """
+        factory = self.__loaded.get(key)
+        if factory is not None:
+            self.__loaded.move_to_end(key)
+            return factory
+        if key not in self:
+            raise KeyError(key)
+
+        data_file, log_file = self.paths(key)
+        options = dict(self.__options, lazy=True)
+        factory = Factory(data_file=data_file, log_file=log_file, **options)
+        factory.recover()
+        self.__remember(key, factory)
+        return factory
+
+    def is_loaded(self, key: str) -> bool:
+        """Загружен ли завод в память."""
+        return key in self.__loaded
+
+    def __remember(self, key: str, factory: Factory) -> None:
+        """
+        Добавление завода в список загруженных с вытеснением лишних.
+
+        Конфликт сохранения вытесняемого завода не прерывает обращение к
+        другому заводу: конфликт записывается в лог вытесняемого завода, он
+        остается загруженным (изменения - в его журнале), и вытесняется
+        следующий по давности обращения. Сам добавляемый завод не
+        вытесняется: его возвращают вызывающему.
+        """
+        self.__loaded[key] = factory
+        self.__loaded.move_to_end(key)
+        for candidate in list(self.__loaded)[:-1]:
+            if len(self.__loaded) <= self.max_loaded:
+                break
+            try:
+                self.evict(candidate)
+            except ConflictError as e:
+                self.__loaded[candidate].log_action("Вытеснение из памяти отложено", {"error": str(e)})
+
+    def evict(self, key: str) -> bool:
+        """
+        Выгрузка завода из памяти (несохраненные изменения записываются).
+
+        Args:
+            key: Идентификатор завода
+
+        Returns:
+            True если завод был загружен
+
+        Raises:
+            ConflictError: Если изменения конфликтуют с файлом (завод остается загруженным)
+        """
+        factory = self.__loaded.get(key)
+        if factory is None:
+            return False
+        if factory.has_unsaved_changes():
+            factory.save_data()
+        factory.close()
+        del self.__loaded[key]
+        return True
+
+    def save_all(self) -> None:
+        """Сохранение всех загруженных заводов с несохраненными изменениями."""
+        for factory in self.__loaded.values():
+            if factory.has_unsaved_changes():
+                factory.save_data()
+
+    def summary(self, key: str) -> Dict[str, Any]:
+        """
+        Сводка по заводу: название, количество цехов и работников, распределение.
+
+        Для загруженного завода с несохраненными изменениями сводка строится
+        по памяти, иначе - по сводке в заголовке файла данных.
+
+        Args:
+            key: Идентификатор завода
+
+        Returns:
+            Словарь {"factory_name", "total_workshops", "total_employees",
+            "distribution", "genders"}
+        """
+        factory = self.__loaded.get(key)
+        if factory is None or not factory.has_unsaved_changes():
+            header = read_header(self.paths(key)[0]) or {}
+            summary = header.get("summary")
+            if isinstance(summary, dict) and summary.get("version") == SUMMARY_VERSION:
+                return {
+                    "factory_name": header.get("factory_name"),
+                    "total_workshops": header.get("total_workshops", 0),
+                    "total_employees": header.get("total_employees", 0),
+                    "distribution": summary["roles"],
+                    "genders": summary["genders"],
+                }
+            # Файл без сводки (старый формат): сводка считается по самому заводу
+            factory = self.get(key)
+        summary = factory.get_summary()
+        return {
+            "factory_name": factory.name,
+            "total_workshops": len(summary["by_workshop"]),
+            "total_employees": sum(w["employees"] for w in summary["by_workshop"]),
+            "distribution": summary["roles"],
+            "genders": summary["genders"],
+        }
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Сводки по всем заводам реестра."""
+        return {key: self.summary(key) for key in self.keys()}
+
+    def total_employees(self) -> int:
+        """Общее количество работников всех заводов."""
+        return sum(s.get("total_employees", 0) for s in self.summaries().values())
+
+    def total_workshops(self) -> int:
+        """Общее количество цехов всех заводов."""
+        return sum(s.get("total_workshops", 0) for s in self.summaries().values())
+
+    def role_distribution(self, key: Optional[str] = None) -> Dict[str, int]:
+        """
+        Распределение работников по специализациям.
+
+        Args:
+            key: Идентификатор завода (по умолчанию - по всем заводам)
+
+        Returns:
+            Словарь {специализация: количество}
+        """
+        keys = [key] if key is not None else self.keys()
+        distribution: Dict[str, int] = {}
+        for k in keys:
+            for role, count in self.summary(k)["distribution"].items():
+                distribution[role] = distribution.get(role, 0) + count
+        return distribution
@@ -0,0 +1,320 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from employees import Employee, Worker
+from events import Event, EventType
+
+DAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+
+# Группа планирования: (цех, специализация); слот: (день недели, смена)
+Group = Tuple[str, str]
+Slot = Tuple[int, str]
+
+
+class Shift:
+    """Смена: название, час начала и продолжительность."""
+
+    __slots__ = ("name", "start", "hours")
+
+    def __init__(self, name: str, start: int, hours: int):
+        """
+        Инициализация смены.
+
+        Args:
+            name: Название смены
+            start: Час начала (0-23)
+            hours: Продолжительность в часах (ночная смена переходит на следующий день)
+        """
+        self.name = name
+        self.start = start
+        self.hours = hours
+
+    def __repr__(self) -> str:
+        return f"Shift({self.name!r}, {self.start}, {self.hours})"
+
+
+DEFAULT_SHIFTS = (Shift("утро", 6, 8), Shift("день", 14, 8), Shift("ночь", 22, 8))
+
+
+class ShiftScheduler:
+    """
+    Недельное расписание смен рабочих по цехам и специализациям.
+
+    Требования задаются на цех и специализацию: сколько рабочих нужно в
+    каждой смене каждого дня. Рабочие назначаются по слотам в порядке
+    времени, в слот - наименее загруженные из подходящих: не больше
+    max_hours часов в неделю и не меньше min_rest часов отдыха между
+    сменами. Группы (цех, специализация) независимы, поэтому при приеме,
+    увольнении или переводе рабочего по событиям завода пересчитывается
+    только его группа: уволенный освобождает свои слоты, и заполняются
+    только незакрытые слоты группы. Полный расчет группы - после
+    изменения требований или загрузки завода.
+    """
+
+    def __init__(self, factory, requirements: Optional[Dict[str, Dict[str, Dict[str, int]]]] = None,
+                 shifts=DEFAULT_SHIFTS, max_hours: int = 40, min_rest: int = 11):
+        """
+        Инициализация расписания.
+
+        Args:
+            factory: Завод
+            requirements: Требования {цех: {специализация: {смена: рабочих в день}}}
+            shifts: Смены суток
+            max_hours: Наибольшее количество часов в неделю
+            min_rest: Наименьший отдых между сменами (часы)
+        """
+        self.__factory = factory
+        self.__shifts = {shift.name: shift for shift in shifts}
+        # Слоты недели в порядке начала: (начало, конец, слот)
+        self.__slots: List[Tuple[int, int, Slot]] = sorted(
+            (day * 24 + shift.start, day * 24 + shift.start + shift.hours, (day, shift.name))
+            for day in range(len(DAYS)) for shift in shifts
+        )
+        self.max_hours = max_hours
+        self.min_rest = min_rest
+        self.__requirements: Dict[Group, Dict[str, int]] = {}
+        for workshop, roles in (requirements or {}).items():
+            for role, coverage in roles.items():
+                self.__set_requirement((workshop, role), coverage)
+        self.__limits: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+        # Счетчики пересчетов (полных и дозаполнений) групп
+        self.solved_groups = 0
+        self.filled_groups = 0
+        self.__stale = True
+        self.__reset()
+        factory.events.subscribe(self.__on_events, batched=True)
+
+    def __reset(self) -> None:
+        """Очистка состава групп и назначений."""
+        self.__members: Dict[Group, Dict[str, Employee]] = {}
+        self.__group_of: Dict[str, Group] = {}
+        self.__assigned: Dict[Group, Dict[Slot, List[str]]] = {}
+        self.__busy: Dict[str, List[Tuple[int, int, Slot]]] = {}
+        self.__hours: Dict[str, int] = {}
+        self.__unsolved: Set[Group] = set()
+        self.__unfilled: Set[Group] = set()
+
+    def __set_requirement(self, group: Group, coverage: Dict[str, int]) -> None:
+        """Проверка и запись требований группы."""
+        for name, count in coverage.items():
+            if name not in self.__shifts:
+                raise ValueError(f"Неизвестная смена: {name!r}")
+            if count < 0:
+                raise ValueError(f"Отрицательное количество рабочих: {group}, {name}")
+        self.__requirements[group] = dict(coverage)
+
+    def set_requirement(self, workshop: str, role: str, coverage: Dict[str, int]) -> None:
+        """
+        Изменение требований группы (группа будет рассчитана заново).
+
+        Args:
+            workshop: Название цеха
+            role: Специализация
+            coverage: Рабочих в день по сменам {смена: количество}
+
+        Raises:
+            ValueError: Если смена неизвестна или количество отрицательно
+        """
+        group = (workshop, role)
+        self.__set_requirement(group, coverage)
+        self.__unsolved.add(group)
+
+    def set_limits(self, employee_id: str, max_hours: Optional[int] = None,
+                   min_rest: Optional[int] = None) -> None:
+        """
+        Личные ограничения рабочего (группа рабочего будет рассчитана заново).
+
+        Args:
+            employee_id: ID рабочего
+            max_hours: Наибольшее количество часов в неделю (по умолчанию - общее)
+            min_rest: Наименьший отдых между сменами (по умолчанию - общий)
+        """
+        self.__limits[employee_id] = (max_hours, min_rest)
+        group = self.__group_of.get(employee_id)
+        if group is not None:
+            self.__unsolved.add(group)
+
+    # Состав групп
+
+    def __add(self, employee: Employee, workshop: str) -> None:
+        """Добавление рабочего в группу его специализации."""
+        if not isinstance(employee, Worker):
+            return
+        group = (workshop, employee.get_role())
+        emp_id = employee.get_id()
+        self.__members.setdefault(group, {})[emp_id] = employee
+        self.__group_of[emp_id] = group
+        self.__unfilled.add(group)
+
+    def __remove(self, emp_id: str) -> None:
+        """Исключение рабочего из группы с освобождением его слотов."""
+        group = self.__group_of.pop(emp_id, None)
+        if group is None:
+            return
+        self.__members[group].pop(emp_id, None)
+        assigned = self.__assigned.get(group, {})
+        for _, _, slot in self.__busy.pop(emp_id, ()):
+            assigned[slot].remove(emp_id)
+        self.__hours.pop(emp_id, None)
+        self.__unfilled.add(group)
+
+    def __drop_workshop(self, workshop: str) -> None:
+        """Удаление всех групп цеха вместе с требованиями."""
+        for group in [g for g in set(self.__members) | set(self.__requirements) if g[0] == workshop]:
+            for emp_id in list(self.__members.pop(group, ())):
+                self.__group_of.pop(emp_id, None)
+                self.__busy.pop(emp_id, None)
+                self.__hours.pop(emp_id, None)
+            self.__assigned.pop(group, None)
+            self.__requirements.pop(group, None)
+            self.__unsolved.discard(group)
+            self.__unfilled.discard(group)
+
+    def __rebuild(self) -> None:
+        """Полный расчет расписания по текущему составу завода."""
+        self.__reset()
+        for workshop in self.__factory.get_all_workshops():
+            for employee in workshop.get_employees():
+                self.__add(employee, workshop.name)
+        self.__unsolved = set(self.__members) | set(self.__requirements)
+        self.__unfilled.clear()
+        self.__stale = False
+
+    def __on_events(self, events: List[Event]) -> None:
+        """Обновление состава групп по пакету событий завода."""
+        if self.__stale:
+            return
+        for event in events:
+            if event.type == EventType.EMPLOYEE_HIRED:
+                self.__add(event.employee, event.workshop)
+            elif event.type == EventType.EMPLOYEE_REMOVED:
+                self.__remove(event.employee.get_id())
+            elif event.type == EventType.EMPLOYEE_MOVED:
+                self.__remove(event.employee.get_id())
+                self.__add(event.employee, event.workshop)
+            elif event.type == EventType.WORKSHOP_ADDED:
+                workshop = self.__factory.get_workshop(event.workshop)
+                if workshop is not None:
+                    for employee in workshop.get_employees():
+                        self.__add(employee, workshop.name)
+            elif event.type == EventType.WORKSHOP_REMOVED:
+                self.__drop_workshop(event.workshop)
+            elif event.type == EventType.FACTORY_LOADED:
+                self.__stale = True
+                return
+
+    # Расчет
+
+    def __fits(self, emp_id: str, start: int, end: int, hours: int) -> bool:
+        """Можно ли назначить рабочего на смену с учетом часов и отдыха."""
+        max_hours, min_rest = self.__limits.get(emp_id, (None, None))
+        if self.__hours.get(emp_id, 0) + hours > (self.max_hours if max_hours is None else max_hours):
+            return False
+        rest = self.min_rest if min_rest is None else min_rest
+        for busy_start, busy_end, _ in self.__busy.get(emp_id, ()):
+            if start < busy_end + rest and busy_start < end + rest:
+                return False
+        return True
+
+    def __fill(self, group: Group) -> None:
+        """Дозаполнение незакрытых слотов группы наименее загруженными рабочими."""
+        coverage = self.__requirements.get(group)
+        members = self.__members.get(group)
+        if not coverage or not members:
+            return
+        assigned = self.__assigned.setdefault(group, {})
+        hours = self.__hours
+        for start, end, slot in self.__slots:
+            required = coverage.get(slot[1], 0)
+            staff = assigned.setdefault(slot, [])
+            if len(staff) >= required:
+                continue
+            length = end - start
+            taken = set(staff)
+            candidates = sorted(
+                (hours.get(emp_id, 0), emp_id) for emp_id in members
+                if emp_id not in taken and self.__fits(emp_id, start, end, length)
+            )
+            for _, emp_id in candidates[:required - len(staff)]:
+                staff.append(emp_id)
+                self.__busy.setdefault(emp_id, []).append((start, end, slot))
+                hours[emp_id] = hours.get(emp_id, 0) + length
+
+    def __solve(self, group: Group) -> None:
+        """Полный расчет группы."""
+        for emp_id in self.__members.get(group, ()):
+            self.__busy.pop(emp_id, None)
+            self.__hours.pop(emp_id, None)
+        self.__assigned.pop(group, None)
+        self.__fill(group)
+        self.solved_groups += 1
+
+    def refresh(self) -> None:
+        """Пересчет групп, затронутых изменениями (вызывается запросами автоматически)."""
+        if self.__stale:
+            self.__rebuild()
+        for group in self.__unsolved:
+            self.__solve(group)
+        for group in self.__unfilled - self.__unsolved:
+            self.__fill(group)
+            self.filled_groups += 1
+        self.__unsolved.clear()
+        self.__unfilled.clear()
+
+    # Запросы
+
+    def assignments(self, workshop: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Назначения на смены.
+
+        Args:
+            workshop: Название цеха (по умолчанию - все цеха)
+
+        Returns:
+            Список {"workshop", "role", "day", "shift", "employees": [ID]} в порядке времени
+        """
+        self.refresh()
+        groups = sorted(g for g in self.__assigned if workshop is None or g[0] == workshop)
+        result = []
+        for _, _, slot in self.__slots:
+            for group in groups:
+                staff = self.__assigned[group].get(slot)
+                if staff:
+                    result.append({"workshop": group[0], "role": group[1], "day": DAYS[slot[0]],
+                                   "shift": slot[1], "employees": list(staff)})
+        return result
+
+    def employee_schedule(self, employee_id: str) -> List[Tuple[str, str]]:
+        """
+        Смены рабочего на неделю.
+
+        Args:
+            employee_id: ID рабочего
+
+        Returns:
+            Список (день, смена) в порядке времени
+        """
+        self.refresh()
+        return [(DAYS[slot[0]], slot[1]) for _, _, slot in sorted(self.__busy.get(employee_id, ()))]
+
+    def hours(self, employee_id: str) -> int:
+        """Часы рабочего за неделю."""
+        self.refresh()
+        return self.__hours.get(employee_id, 0)
+
+    def shortfalls(self) -> List[Dict[str, Any]]:
+        """
+        Незакрытые слоты (не хватает рабочих с учетом ограничений).
+
+        Returns:
+            Список {"workshop", "role", "day", "shift", "missing"} в порядке времени
+        """
+        self.refresh()
+        result = []
+        for _, _, slot in self.__slots:
+            for group, coverage in self.__requirements.items():
+                required = coverage.get(slot[1], 0)
+                staffed = len(self.__assigned.get(group, {}).get(slot, ()))
+                if staffed < required:
+                    result.append({"workshop": group[0], "role": group[1], "day": DAYS[slot[0]],
+                                   "shift": slot[1], "missing": required - staffed})
+        return result
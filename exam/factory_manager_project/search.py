@@ -0,0 +1,239 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from employees import Employee
+from events import Event, EventType
+from ranking import employee_role
+
+
+def normalize(text: str) -> str:
+    """Приведение строки к виду для поиска: без учета регистра, "ё" = "е"."""
+    return text.casefold().replace("ё", "е")
+
+
+class PrefixTrie:
+    """
+    Префиксное дерево по строкам.
+
+    В каждом узле хранится множество ID, чьи строки проходят через узел,
+    поэтому поиск по префиксу стоит O(длина префикса) плюс размер ответа.
+    """
+
+    def __init__(self):
+        self.__root: Dict = {}
+        self.__all: Set[str] = set()
+
+    def add(self, text: str, item_id: str) -> None:
+        """Добавление строки с идентификатором."""
+        node = self.__root
+        for char in normalize(text):
+            node = node.setdefault(char, {})
+            node.setdefault(None, set()).add(item_id)
+        self.__all.add(item_id)
+
+    def remove(self, text: str, item_id: str) -> None:
+        """Удаление строки с идентификатором."""
+        path = []
+        node = self.__root
+        for char in normalize(text):
+            child = node.get(char)
+            if child is None:
+                break
+            path.append((node, char, child))
+            node = child
+        for parent, char, child in reversed(path):
+            ids = child.get(None)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del child[None]
+            if not child:
+                del parent[char]
+        self.__all.discard(item_id)
+
+    def find(self, prefix: str) -> Set[str]:
+        """
+        Поиск идентификаторов по префиксу.
+
+        Args:
+            prefix: Префикс (без учета регистра)
+
+        Returns:
+            Множество подходящих ID (не изменять)
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return self.__all
+        node = self.__root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node.get(None, set())
+
+
+class EmployeeSearch:
+    """
+    Поиск работников по всему заводу.
+
+    Имя и фамилия индексируются префиксными деревьями, возраст -
+    отсортированным списком значений с корзинами ID, пол и специализация -
+    множествами ID. Условия запроса объединяются пересечением, начиная с
+    самого маленького множества, без перебора всех работников. Индексы
+    поддерживаются по событиям завода.
+    """
+
+    def __init__(self, factory):
+        """
+        Инициализация поиска.
+
+        Args:
+            factory: Завод, работники которого индексируются
+        """
+        self.__factory = factory
+        self.__stale = True
+        self.__reset()
+        factory.events.subscribe(self.__on_events, batched=True)
+
+    def __reset(self) -> None:
+        """Очистка всех индексов."""
+        self.__employees: Dict[str, Tuple[Employee, str]] = {}
+        self.__by_workshop: Dict[str, Set[str]] = {}
+        self.__names = PrefixTrie()
+        self.__surnames = PrefixTrie()
+        self.__ages: List[int] = []
+        self.__age_buckets: Dict[int, Set[str]] = {}
+        self.__genders: Dict[str, Set[str]] = {}
+        self.__roles: Dict[str, Set[str]] = {}
+
+    def __rebuild(self) -> None:
+        """Полное построение индексов по текущему состоянию завода."""
+        self.__reset()
+        for workshop in self.__factory.get_all_workshops():
+            self.__add(workshop.get_chief(), workshop.name)
+            for employee in workshop.get_employees():
+                self.__add(employee, workshop.name)
+        self.__stale = False
+
+    def __add(self, employee: Employee, workshop: str) -> None:
+        """Добавление работника во все индексы."""
+        emp_id = employee.get_id()
+        if emp_id in self.__employees:
+            self.__remove(emp_id)
+        self.__employees[emp_id] = (employee, workshop)
+        self.__by_workshop.setdefault(workshop, set()).add(emp_id)
+        self.__names.add(employee.name, emp_id)
+        self.__surnames.add(employee.surname, emp_id)
+        bucket = self.__age_buckets.get(employee.age)
+        if bucket is None:
+            bucket = self.__age_buckets[employee.age] = set()
+            insort(self.__ages, employee.age)
+        bucket.add(emp_id)
+        self.__genders.setdefault(employee.gender.value, set()).add(emp_id)
+        self.__roles.setdefault(employee_role(employee), set()).add(emp_id)
+
+    def __remove(self, emp_id: str) -> None:
+        """Удаление работника из всех индексов."""
+        entry = self.__employees.pop(emp_id, None)
+        if entry is None:
+            return
+        employee, workshop = entry
+        self.__by_workshop.get(workshop, set()).discard(emp_id)
+        self.__names.remove(employee.name, emp_id)
+        self.__surnames.remove(employee.surname, emp_id)
+        bucket = self.__age_buckets.get(employee.age)
+        if bucket is not None:
+            bucket.discard(emp_id)
+            if not bucket:
+                del self.__age_buckets[employee.age]
+                del self.__ages[bisect_left(self.__ages, employee.age)]
+        self.__genders.get(employee.gender.value, set()).discard(emp_id)
+        self.__roles.get(employee_role(employee), set()).discard(emp_id)
+
+    def __on_events(self, events: List[Event]) -> None:
+        """Инкрементальное обновление индексов по пакету событий."""
+        if self.__stale:
+            return
+        for event in events:
+            if event.type == EventType.EMPLOYEE_HIRED:
+                self.__add(event.employee, event.workshop)
+            elif event.type == EventType.EMPLOYEE_REMOVED:
+                self.__remove(event.employee.get_id())
+            elif event.type == EventType.EMPLOYEE_MOVED:
+                emp_id = event.employee.get_id()
+                self.__by_workshop.get(event.source, set()).discard(emp_id)
+                self.__by_workshop.setdefault(event.workshop, set()).add(emp_id)
+                self.__employees[emp_id] = (event.employee, event.workshop)
+            elif event.type == EventType.CHIEF_CHANGED:
+                if event.previous is not None:
+                    self.__remove(event.previous.get_id())
+                self.__add(event.employee, event.workshop)
+            elif event.type == EventType.WORKSHOP_ADDED:
+                workshop = self.__factory.get_workshop(event.workshop)
+                if workshop is not None:
+                    self.__add(workshop.get_chief(), workshop.name)
+                    for employee in workshop.get_employees():
+                        self.__add(employee, workshop.name)
+            elif event.type == EventType.WORKSHOP_REMOVED:
+                for emp_id in list(self.__by_workshop.pop(event.workshop, ())):
+                    self.__remove(emp_id)
+            elif event.type == EventType.FACTORY_LOADED:
+                self.__stale = True
+                return
+
+    def search(self, name: Optional[str] = None, surname: Optional[str] = None,
+               age_min: Optional[int] = None, age_max: Optional[int] = None,
+               gender: Optional[str] = None, role: Optional[str] = None,
+               workshop: Optional[str] = None) -> List[Tuple[Employee, str]]:
+        """
+        Поиск работников по сочетанию условий.
+
+        Args:
+            name: Префикс имени (без учета регистра)
+            surname: Префикс фамилии (без учета регистра)
+            age_min: Минимальный возраст (включительно)
+            age_max: Максимальный возраст (включительно)
+            gender: Пол ("male"/"female")
+            role: Специализация или должность ("Токарь", "Начальник цеха", ...)
+            workshop: Название цеха
+
+        Returns:
+            Список (работник, название цеха)
+        """
+        if self.__stale:
+            self.__rebuild()
+
+        candidates: List[Set[str]] = []
+        if name:
+            candidates.append(self.__names.find(name))
+        if surname:
+            candidates.append(self.__surnames.find(surname))
+        if gender is not None:
+            candidates.append(self.__genders.get(gender, set()))
+        if role is not None:
+            candidates.append(self.__roles.get(role, set()))
+        if workshop is not None:
+            candidates.append(self.__by_workshop.get(workshop, set()))
+
+        by_age = age_min is not None or age_max is not None
+        low = age_min if age_min is not None else float("-inf")
+        high = age_max if age_max is not None else float("inf")
+
+        if not candidates:
+            if by_age:
+                start = 0 if age_min is None else bisect_left(self.__ages, age_min)
+                stop = len(self.__ages) if age_max is None else bisect_right(self.__ages, age_max)
+                ids = [i for age in self.__ages[start:stop] for i in self.__age_buckets[age]]
+            else:
+                ids = list(self.__employees)
+            return [self.__employees[i] for i in ids]
+
+        candidates.sort(key=len)
+        base, others = candidates[0], candidates[1:]
+        result = []
+        for emp_id in base:
+            if all(emp_id in other for other in others):
+                entry = self.__employees[emp_id]
+                if not by_age or low <= entry[0].age <= high:
+                    result.append(entry)
+        return result
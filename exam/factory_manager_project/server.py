@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from factory import Factory
+from workshop import WorkShop
+from employees import Chief
+from workers import employee_from_dict
+from validation import check_employee, check_workshop_name
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    """Компактная сериализация сообщения протокола в строку JSON."""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class FactoryServer:
+    """
+    Сервер завода на Unix-сокете.
+
+    Держит один экземпляр Factory в памяти и обслуживает операции меню
+    для множества клиентов. Протокол: одна строка JSON на запрос
+    ({"id": 1, "op": "hire", "args": {...}}) и одна строка JSON на ответ
+    ({"id": 1, "ok": true, "result": ...}).
+
+    Чтения выполняются конкурентно, изменения - строго по очереди под
+    блокировкой, а сохранение в файл откладывается и объединяет все
+    изменения, накопившиеся за save_delay секунд.
+    """
+
+    READ_OPS = ("view_factory", "list_workshops", "view_workshop", "compare")
+    WRITE_OPS = ("add_workshop", "remove_workshop", "hire", "fire", "save")
+
+    def __init__(self, socket_path: str, factory: Factory, save_delay: float = 1.0):
+        """
+        Инициализация сервера.
+
+        Args:
+            socket_path: Путь к Unix-сокету
+            factory: Завод, с которым работает сервер
+            save_delay: Задержка перед сохранением изменений (секунды)
+        """
+        self.socket_path = socket_path
+        self.factory = factory
+        self.save_delay = save_delay
+        self._write_lock = asyncio.Lock()
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "view_factory": self._view_factory,
+            "list_workshops": self._list_workshops,
+            "view_workshop": self._view_workshop,
+            "compare": self._compare,
+            "add_workshop": self._add_workshop,
+            "remove_workshop": self._remove_workshop,
+            "hire": self._hire,
+            "fire": self._fire,
+        }
+
+    async def start(self) -> None:
+        """Запуск прослушивания сокета."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+
+    async def serve_forever(self) -> None:
+        """Запуск сервера и обслуживание клиентов до остановки."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """Остановка сервера с сохранением несохраненных изменений."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Блокировка записи дожидается уже идущего отложенного сохранения
+        # (оно держит блокировку, пока пишет файл) и не дает начаться новому
+        async with self._write_lock:
+            pending = self._save_task
+            self._save_task = None
+            if pending is not None:
+                # Сохранение еще ждет задержки или блокировки: его заменяет сохранение ниже
+                pending.cancel()
+            if self._dirty:
+                try:
+                    await self._flush()
+                except Exception as e:
+                    # Изменения остаются в журнале: их восстановит следующий запуск
+                    self.factory.log_action("Ошибка сохранения при остановке сервера", {"error": str(e)})
+        if pending is not None:
+            await asyncio.wait([pending])
+        self.factory.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Обработка соединения одного клиента."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(line)
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line: bytes) -> Dict[str, Any]:
+        """Разбор запроса и вызов соответствующей операции."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = request["op"]
+            args = request.get("args", {})
+
+            if op in self.READ_OPS:
+                result = self._handlers[op](args)
+            elif op == "save":
+                async with self._write_lock:
+                    await self._flush()
+                result = True
+            elif op in self.WRITE_OPS:
+                async with self._write_lock:
+                    result = self._handlers[op](args)
+                    self._mark_dirty()
+            else:
+                raise ValueError(f"Неизвестная операция: {op}")
+
+            return {"id": request_id, "ok": True, "result": result}
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+
+    def _mark_dirty(self) -> None:
+        """Пометка состояния как измененного и планирование сохранения."""
+        self._dirty = True
+        if self._save_task is None:
+            self._save_task = asyncio.get_running_loop().create_task(self._delayed_save())
+
+    async def _delayed_save(self) -> None:
+        """
+        Отложенное сохранение, объединяющее серию изменений в одну запись.
+
+        Ошибка сохранения (конфликт, ошибка ввода-вывода) записывается в лог,
+        и сохранение планируется повторно через save_delay.
+        """
+        try:
+            await asyncio.sleep(self.save_delay)
+            async with self._write_lock:
+                self._save_task = None
+                try:
+                    await self._flush()
+                except Exception as e:
+                    self.factory.log_action("Ошибка отложенного сохранения", {"error": str(e)})
+                    self._mark_dirty()
+        except asyncio.CancelledError:
+            pass
+
+    async def _flush(self) -> None:
+        """
+        Сохранение данных завода в отдельном потоке (вызывать под блокировкой записи).
+
+        Признак изменений снимается только после успешной записи.
+        """
+        if not self._dirty:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.factory.save_data)
+        self._dirty = False
+
+    def _require_workshop(self, name: str) -> WorkShop:
+        """Получение цеха по имени или ошибка, если его нет."""
+        workshop = self.factory.get_workshop(name)
+        if workshop is None:
+            raise LookupError(f"Цех с названием '{name}' не найден")
+        return workshop
+
+    def _view_factory(self, args: Dict[str, Any]) -> str:
+        """Строковое представление завода."""
+        return str(self.factory)
+
+    def _list_workshops(self, args: Dict[str, Any]) -> list:
+        """Список цехов с количеством работников."""
+        return [
+            {"name": w.name, "employee_count": len(w.get_employees())}
+            for w in self.factory.get_all_workshops()
+        ]
+
+    def _view_workshop(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Полная информация о цехе."""
+        return self._require_workshop(args["name"]).to_dict()
+
+    def _compare(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Сравнение двух цехов."""
+        w1 = self._require_workshop(args["first"])
+        w2 = self._require_workshop(args["second"])
+        return {
+            "are_equal_distribution": w1 == w2,
+            "workshop1_count": len(w1.get_employees()),
+            "workshop2_count": len(w2.get_employees()),
+            "workshop1_lt_workshop2": w1 < w2,
+            "workshop1_gt_workshop2": w1 > w2,
+        }
+
+    @staticmethod
+    def _checked_employee(data: Any) -> Dict[str, Any]:
+        """
+        Проверка данных работника по правилам загрузки файла.
+
+        Raises:
+            ValueError: Если поле работника некорректно
+        """
+        error = check_employee(data)
+        if error is not None:
+            field, message = error
+            raise ValueError(f"Поле работника '{field}': {message}" if field else f"Работник: {message}")
+        return data
+
+    def _add_workshop(self, args: Dict[str, Any]) -> str:
+        """Создание цеха."""
+        name = args["name"]
+        error = check_workshop_name(name)
+        if error is not None:
+            raise ValueError(f"Название цеха: {error}")
+        if self.factory.get_workshop(name) is not None:
+            raise ValueError(f"Цех '{name}' уже существует")
+        chief = employee_from_dict(self._checked_employee({**args["chief"], "type": "Chief"}))
+        self.factory.add_workshop(WorkShop(name, chief, []))
+        return name
+
+    def _remove_workshop(self, args: Dict[str, Any]) -> bool:
+        """Удаление цеха."""
+        return self.factory.remove_workshop(args["name"])
+
+    def _hire(self, args: Dict[str, Any]) -> str:
+        """Добавление работника в цех."""
+        workshop = self._require_workshop(args["workshop"])
+        employee = employee_from_dict(self._checked_employee(args["employee"]))
+        if isinstance(employee, Chief):
+            raise ValueError("Начальник цеха не может быть добавлен как работник")
+        workshop += employee
+        self.factory.log_action("Добавление работника", {
+            "workshop": workshop.name,
+            "employee": str(employee),
+            "position": employee.get_post()
+        })
+        return employee.get_id()
+
+    def _fire(self, args: Dict[str, Any]) -> bool:
+        """Удаление работника из цеха по ID."""
+        workshop = self._require_workshop(args["workshop"])
+        employee = workshop.get_emloyee(args["employee_id"])
+        if employee is None:
+            return False
+        workshop.remove_employee(employee.get_id())
+        self.factory.log_action("Удаление работника", {
+            "workshop": workshop.name,
+            "employee": str(employee),
+            "position": employee.get_post()
+        })
+        return True
+
+
+class FactoryClient:
+    """Тонкий асинхронный клиент сервера завода."""
+
+    def __init__(self, socket_path: str):
+        """
+        Инициализация клиента.
+
+        Args:
+            socket_path: Путь к Unix-сокету сервера
+        """
+        self.socket_path = socket_path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._next_id = 0
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """Подключение к серверу."""
+        self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+
+    async def close(self) -> None:
+        """Закрытие соединения."""
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, op: str, **args) -> Any:
+        """
+        Выполнение операции на сервере.
+
+        Args:
+            op: Название операции
+            **args: Аргументы операции
+
+        Returns:
+            Результат операции
+
+        Raises:
+            RuntimeError: Если сервер вернул ошибку
+        """
+        async with self._lock:
+            self._next_id += 1
+            self._writer.write(_encode({"id": self._next_id, "op": op, "args": args}))
+            await self._writer.drain()
+            line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Сервер закрыл соединение")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def view_factory(self) -> str:
+        return await self.request("view_factory")
+
+    async def list_workshops(self) -> list:
+        return await self.request("list_workshops")
+
+    async def view_workshop(self, name: str) -> Dict[str, Any]:
+        return await self.request("view_workshop", name=name)
+
+    async def compare(self, first: str, second: str) -> Dict[str, Any]:
+        return await self.request("compare", first=first, second=second)
+
+    async def add_workshop(self, name: str, chief: Dict[str, Any]) -> str:
+        return await self.request("add_workshop", name=name, chief=chief)
+
+    async def remove_workshop(self, name: str) -> bool:
+        return await self.request("remove_workshop", name=name)
+
+    async def hire(self, workshop: str, employee: Dict[str, Any]) -> str:
+        return await self.request("hire", workshop=workshop, employee=employee)
+
+    async def fire(self, workshop: str, employee_id: str) -> bool:
+        return await self.request("fire", workshop=workshop, employee_id=employee_id)
+
+    async def save(self) -> bool:
+        return await self.request("save")
+
+
+def main():
+    """Запуск сервера завода из командной строки."""
+    parser = argparse.ArgumentParser(description="Сервер завода на Unix-сокете")
+    parser.add_argument("--socket", default="factory.sock", help="Путь к Unix-сокету")
+    parser.add_argument("--name", default="ООО 'Промышленный Завод'", help="Название завода")
+    parser.add_argument("--save-delay", type=float, default=1.0, help="Задержка сохранения (секунды)")
+    args = parser.parse_args()
+
+    factory = Factory(args.name)
+    # Как и меню, сервер восстанавливает несохраненные изменения из журнала
+    factory.recover()
+    server = FactoryServer(args.socket, factory, save_delay=args.save_delay)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
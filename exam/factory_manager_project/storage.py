@@ -0,0 +1,372 @@
+import fcntl
+import gzip
+import io
+import json
+import lzma
+import os
+import re
+import time
+import zlib
+from contextlib import contextmanager
+from json.encoder import encode_basestring
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, TextIO
+
+VERSION_PATTERN = re.compile(rb'"version"\s*:\s*(\d+)')
+WORKSHOPS_KEY_PATTERN = re.compile(rb'"workshops"\s*:')
+HEADER_SIZE = 256
+
+# Сжатие файлов данных и лога: формат по расширению (или явно) и уровень по умолчанию
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".xz": "lzma", ".lzma": "lzma", ".zz": "zlib"}
+DEFAULT_LEVELS = {"gzip": 6, "lzma": 6, "zlib": 6}
+CHUNK_SIZE = 1 << 16
+
+
+class ConflictError(Exception):
+    """Конфликт одновременного изменения одного и того же цеха."""
+
+
+# Статистика блокировок в процессе: путь -> [захватов, с ожиданием, ожидание (с), наибольшее ожидание (с)]
+LOCK_STATS: Dict[str, List[float]] = {}
+
+
+def lock_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Статистика ожидания блокировок файлов в текущем процессе.
+
+    Returns:
+        {путь: {"acquired", "contended", "wait", "max_wait"}}
+    """
+    return {
+        path: {"acquired": s[0], "contended": s[1], "wait": s[2], "max_wait": s[3]}
+        for path, s in LOCK_STATS.items()
+    }
+
+
+def reset_lock_stats() -> None:
+    """Сброс статистики блокировок."""
+    LOCK_STATS.clear()
+
+
+class FileLock:
+    """
+    Рекомендательная блокировка файла данных (fcntl.flock).
+
+    Блокируется отдельный файл <path>.lock, поэтому сам файл данных
+    можно атомарно заменять, не теряя блокировку. Захваты и время
+    ожидания занятой блокировки учитываются в LOCK_STATS.
+    """
+
+    def __init__(self, path: str, exclusive: bool = True):
+        """
+        Инициализация блокировки.
+
+        Args:
+            path: Путь к защищаемому файлу
+            exclusive: Эксклюзивная (запись) или разделяемая (чтение) блокировка
+        """
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.exclusive = exclusive
+        self.__fd = None
+
+    def __enter__(self):
+        self.__fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        mode = fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH
+        stats = LOCK_STATS.setdefault(self.path, [0, 0, 0.0, 0.0])
+        stats[0] += 1
+        try:
+            fcntl.flock(self.__fd, mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Блокировка занята: ожидание учитывается как конкуренция за файл
+            start = time.perf_counter()
+            fcntl.flock(self.__fd, mode)
+            waited = time.perf_counter() - start
+            stats[1] += 1
+            stats[2] += waited
+            stats[3] = max(stats[3], waited)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.__fd, fcntl.LOCK_UN)
+        os.close(self.__fd)
+        self.__fd = None
+
+
+def compression_for(path: str, compression: Optional[str] = None) -> Optional[str]:
+    """
+    Формат сжатия для записи файла.
+
+    Args:
+        path: Путь к файлу
+        compression: Явно заданный формат ("gzip", "lzma", "zlib" или "none");
+                     по умолчанию - по расширению файла
+
+    Returns:
+        Формат сжатия или None для обычного текста
+
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    if compression is None:
+        return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if compression == "none":
+        return None
+    if compression not in DEFAULT_LEVELS:
+        raise ValueError(f"Неизвестный формат сжатия: {compression!r}")
+    return compression
+
+
+def _detect_compression(head: bytes) -> Optional[str]:
+    """Формат сжатия по первым байтам файла (JSON начинается с "{" или "[")."""
+    if head.startswith(b"\x1f\x8b"):
+        return "gzip"
+    if head.startswith(b"\xfd7zXZ\x00"):
+        return "lzma"
+    if len(head) >= 2 and head[0] == 0x78 and (head[0] << 8 | head[1]) % 31 == 0:
+        return "zlib"
+    return None
+
+
+class _ZlibReader(io.RawIOBase):
+    """Потоковое чтение файла, сжатого zlib (в stdlib нет файлового интерфейса)."""
+
+    def __init__(self, raw: BinaryIO):
+        self.__raw = raw
+        self.__decompressor = zlib.decompressobj()
+        self.__buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self.__buffer:
+            chunk = self.__raw.read(CHUNK_SIZE)
+            if not chunk:
+                self.__buffer = self.__decompressor.flush()
+                if not self.__buffer:
+                    return 0
+                break
+            self.__buffer = self.__decompressor.decompress(chunk)
+        n = min(len(b), len(self.__buffer))
+        b[:n] = self.__buffer[:n]
+        self.__buffer = self.__buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            super().close()
+            self.__raw.close()
+
+
+class _ZlibWriter(io.RawIOBase):
+    """Потоковая запись файла со сжатием zlib."""
+
+    def __init__(self, raw: BinaryIO, level: int):
+        self.__raw = raw
+        self.__compressor = zlib.compressobj(level)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.__raw.write(self.__compressor.compress(b))
+        return len(b)
+
+    def flush(self) -> None:
+        if not self.closed:
+            self.__raw.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.__raw.write(self.__compressor.flush())
+            super().close()
+            self.__raw.close()
+
+
+def open_binary(path: str) -> BinaryIO:
+    """
+    Открытие файла на чтение с прозрачной распаковкой.
+
+    Формат определяется по первым байтам, поэтому файл читается
+    независимо от расширения и настроек сжатия.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Поток распакованных байтов
+
+    Raises:
+        FileNotFoundError: Если файла нет
+    """
+    raw = open(path, 'rb')
+    compression = _detect_compression(raw.read(6))
+    raw.seek(0)
+    if compression == "zlib":
+        return io.BufferedReader(_ZlibReader(raw), CHUNK_SIZE)
+    if compression is None:
+        return raw
+    raw.close()
+    return gzip.open(path, 'rb') if compression == "gzip" else lzma.open(path, 'rb')
+
+
+def _open_writer(path: str, compression: Optional[str], level: Optional[int]) -> TextIO:
+    """Открытие текстового файла (UTF-8) на запись со сжатием."""
+    if compression is None:
+        return open(path, 'w', encoding='utf-8')
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+    if compression == "gzip":
+        binary = gzip.open(path, 'wb', compresslevel=level)
+    elif compression == "lzma":
+        binary = lzma.open(path, 'wb', preset=level)
+    else:
+        binary = io.BufferedWriter(_ZlibWriter(open(path, 'wb'), level), CHUNK_SIZE)
+    return io.TextIOWrapper(binary, encoding='utf-8')
+
+
+def open_text(path: str) -> TextIO:
+    """
+    Открытие текстового файла (UTF-8) на чтение с прозрачной распаковкой.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Текстовый поток
+
+    Raises:
+        FileNotFoundError: Если файла нет
+    """
+    return io.TextIOWrapper(open_binary(path), encoding='utf-8')
+
+
+def read_version(path: str) -> int:
+    """
+    Чтение версии файла данных без его полной загрузки.
+
+    Версия записывается первым ключом, поэтому достаточно прочитать
+    начало файла.
+
+    Args:
+        path: Путь к файлу данных
+
+    Returns:
+        Версия файла или 0, если файла нет или версия не указана
+    """
+    try:
+        with open_binary(path) as f:
+            header = f.read(HEADER_SIZE)
+    except FileNotFoundError:
+        return 0
+    match = VERSION_PATTERN.search(header)
+    return int(match.group(1)) if match else 0
+
+
+def read_header(path: str, limit: int = 16 * 2**20) -> Optional[Dict[str, Any]]:
+    """
+    Чтение заголовка файла данных (все ключи до списка цехов).
+
+    Заголовок записывается перед "workshops", поэтому для его разбора
+    не нужно читать и разбирать данные о работниках. Начало файла
+    читается блоками, пока не найден ключ "workshops".
+
+    Args:
+        path: Путь к файлу данных
+        limit: Максимальный размер читаемого начала файла
+
+    Returns:
+        Словарь заголовка или None, если файла нет или заголовок не найден
+    """
+    prefix = b""
+    match = None
+    try:
+        with open_binary(path) as f:
+            while match is None and len(prefix) < limit:
+                block = f.read(max(65536, len(prefix)))
+                if not block:
+                    break
+                # Ключ мог попасть на границу блоков: ищем с небольшим перекрытием
+                start = max(0, len(prefix) - 32)
+                prefix += block
+                match = WORKSHOPS_KEY_PATTERN.search(prefix, start)
+    except FileNotFoundError:
+        return None
+
+    if match is None:
+        return None
+    end = match.start()
+    head = prefix[:end].rstrip().rstrip(b",")
+    try:
+        return json.loads(head.decode("utf-8") + "}")
+    except ValueError:
+        return None
+
+
+def _json_scalar(value: Any) -> str:
+    """JSON-текст скалярного значения."""
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    return json.dumps(value)
+
+
+def json_fragment(data: Any, indent: int = 0) -> str:
+    """
+    JSON-текст значения в формате файла данных (отступ 2) для вставки на заданном уровне.
+
+    Args:
+        data: Значение
+        indent: Отступ строки, на которой начинается значение
+
+    Returns:
+        Текст, совпадающий с фрагментом json.dump(..., indent=2) на этом уровне
+    """
+    if isinstance(data, dict) and data and not any(isinstance(v, (dict, list)) for v in data.values()):
+        # Плоский словарь (работник, распределение) собирается построчно: json.dumps
+        # с indent работает на медленном кодировщике на Python
+        pad = "\n" + " " * (indent + 2)
+        items = ",".join(pad + encode_basestring(k) + ": " + _json_scalar(v) for k, v in data.items())
+        return "{" + items + "\n" + " " * indent + "}"
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    return text.replace("\n", "\n" + " " * indent) if indent else text
+
+
+@contextmanager
+def atomic_write(path: str, compression: Optional[str] = None,
+                 level: Optional[int] = None) -> Iterator[TextIO]:
+    """
+    Атомарная запись текстового файла.
+
+    Данные пишутся во временный файл рядом с целевым, который после
+    fsync заменяет целевой через os.replace. При сбое во время записи
+    старый файл остается нетронутым.
+
+    Args:
+        path: Путь к целевому файлу
+        compression: Формат сжатия (по умолчанию - по расширению файла, см. compression_for)
+        level: Уровень сжатия (по умолчанию - DEFAULT_LEVELS)
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with _open_writer(tmp_path, compression_for(path, compression), level) as f:
+            yield f
+            f.flush()
+        # fsync после закрытия: сжатый поток дописывает данные при закрытии
+        fd = os.open(tmp_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
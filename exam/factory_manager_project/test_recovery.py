@@ -0,0 +1,132 @@
+from employees import Chief, Gender
+from factory import Factory
+from registry import FactoryRegistry
+from wal import WriteAheadLog
+from workers import Locksmith, Miller, Turner
+from workshop import WorkShop
+
+
+def make_factory(tmp_path, **options) -> Factory:
+    """Завод с файлами данных и лога во временном каталоге."""
+    return Factory(data_file=str(tmp_path / "factory_data.json"),
+                   log_file=str(tmp_path / "factory_log.json"), **options)
+
+
+def staff_ids(factory: Factory, name: str):
+    """ID работников цеха в порядке списка."""
+    return [e.get_id() for e in factory.get_workshop(name).get_employees()]
+
+
+def restart(tmp_path, factory: Factory) -> Factory:
+    """Падение процесса с заводом и восстановление в новом сеансе."""
+    factory.close()
+    recovered = make_factory(tmp_path, snapshot_every=3)
+    recovered.recover()
+    return recovered
+
+
+def test_list_hire_and_fire_survive_snapshot(tmp_path):
+    # Списки длиннее snapshot_every: снимок по журналу не должен попасть посреди списка
+    factory = make_factory(tmp_path, snapshot_every=3)
+    factory.add_workshop(WorkShop("Цех 1", Chief("Олег", "Волков", 50, Gender.MALE)))
+    hired = [Turner("Иван", f"Иванов {i}", 30 + i, Gender.MALE) for i in range(5)]
+    workshop = factory.get_workshop("Цех 1")
+    workshop += hired
+    expected = staff_ids(factory, "Цех 1")
+
+    factory = restart(tmp_path, factory)
+    assert staff_ids(factory, "Цех 1") == expected
+
+    workshop = factory.get_workshop("Цех 1")
+    workshop += [Locksmith("Анна", "Петрова", 25, Gender.FEMALE),
+                 Miller("Петр", "Сидоров", 40, Gender.MALE)]
+    workshop -= hired[:4]
+    expected = staff_ids(factory, "Цех 1")
+    assert len(expected) == 3
+
+    factory = restart(tmp_path, factory)
+    assert staff_ids(factory, "Цех 1") == expected
+
+
+def test_save_keeps_other_sessions_journal(tmp_path):
+    first = make_factory(tmp_path)
+    first.add_workshop(WorkShop("Цех 1", Chief("Олег", "Волков", 50, Gender.MALE)))
+    first.save_data()
+
+    second = make_factory(tmp_path)
+    second.recover()
+    turner = Turner("Иван", "Иванов", 30, Gender.MALE)
+    second.get_workshop("Цех 1").__iadd__(turner)
+
+    # Сохранение первого сеанса не должно очищать журнал второго
+    first.add_workshop(WorkShop("Цех 2", Chief("Анна", "Петрова", 45, Gender.FEMALE)))
+    first.save_data()
+
+    recovered = restart(tmp_path, second)
+    assert staff_ids(recovered, "Цех 1") == [turner.get_id()]
+    assert recovered.get_workshop("Цех 2") is not None
+
+
+def test_apply_changes_is_journaled_and_indexed(tmp_path):
+    factory = make_factory(tmp_path, snapshot_every=3)
+    factory.add_workshop(WorkShop("Цех 1", Chief("Олег", "Волков", 50, Gender.MALE)))
+    turner = Turner("Иван", "Иванов", 30, Gender.MALE)
+    factory.get_workshop("Цех 1").__iadd__(turner)
+    factory.save_data()
+    assert len(factory.search_employees(surname="Иванов")) == 1
+
+    chief = factory.get_workshop("Цех 1").get_chief()
+    (tmp_path / "target").mkdir()
+    target = make_factory(tmp_path / "target")
+    target.add_workshop(WorkShop("Цех 1", Chief("Олег", "Волков", 50, Gender.MALE, chief.get_id()), [
+        Turner("Иван", "Петров", 31, Gender.MALE, turner.get_id()),
+        Miller("Анна", "Сидорова", 28, Gender.FEMALE)
+    ]))
+    factory.apply_changes(factory.diff(target))
+
+    assert len(factory.search_employees(surname="Иванов")) == 0
+    assert len(factory.search_employees(surname="Петров")) == 1
+
+    recovered = restart(tmp_path, factory)
+    assert recovered.digest() == target.digest()
+    assert sorted(e.surname for e in recovered.get_workshop("Цех 1").get_employees()) == ["Петров", "Сидорова"]
+
+
+def test_replay_over_saved_snapshot_is_idempotent(tmp_path, monkeypatch):
+    factory = make_factory(tmp_path)
+    factory.add_workshop(WorkShop("Цех 1", Chief("Олег", "Волков", 50, Gender.MALE)))
+    workshop = factory.get_workshop("Цех 1")
+    workshop += [Turner("Иван", "Иванов", 30, Gender.MALE),
+                 Miller("Петр", "Сидоров", 40, Gender.MALE)]
+    workshop -= workshop.get_employees()[0]
+    expected = staff_ids(factory, "Цех 1")
+
+    # Падение после записи снимка, но до очистки журнала
+    monkeypatch.setattr(WriteAheadLog, "truncate", lambda self: None)
+    factory.save_data()
+    monkeypatch.undo()
+
+    recovered = restart(tmp_path, factory)
+    assert [w.name for w in recovered.get_all_workshops()] == ["Цех 1"]
+    assert staff_ids(recovered, "Цех 1") == expected
+
+
+def test_eviction_conflict_keeps_plant_loaded(tmp_path):
+    registry = FactoryRegistry(str(tmp_path), max_loaded=1)
+    plant = registry.create("p1", "Завод 1")
+    plant.add_workshop(WorkShop("Цех 1", Chief("Олег", "Волков", 50, Gender.MALE)))
+    plant.save_data()
+
+    # Другой процесс меняет тот же цех
+    data_file, log_file = registry.paths("p1")
+    other = Factory(data_file=data_file, log_file=log_file)
+    other.recover()
+    other.get_workshop("Цех 1").__iadd__(Turner("Иван", "Иванов", 30, Gender.MALE))
+    other.save_data()
+    other.close()
+
+    plant.get_workshop("Цех 1").__iadd__(Miller("Петр", "Сидоров", 40, Gender.MALE))
+    # Конфликт вытесняемого завода не мешает созданию другого
+    registry.create("p2", "Завод 2")
+    assert registry.is_loaded("p1") and registry.is_loaded("p2")
+    assert plant.has_unsaved_changes()
@@ -0,0 +1,325 @@
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from employees import Gender
+from storage import FileLock, atomic_write, open_text
+from workers import EMPLOYEE_TYPES
+
+GENDERS = frozenset(g.value for g in Gender)
+
+# Проверка записи работника: None или (поле, описание ошибки)
+Validator = Callable[[Any], Optional[Tuple[str, str]]]
+
+
+class LoadReport:
+    """Итог проверки файла данных при загрузке."""
+
+    def __init__(self, source: str = ""):
+        """
+        Инициализация отчета.
+
+        Args:
+            source: Путь к проверенному файлу
+        """
+        self.source = source
+        self.workshops = 0
+        self.employees = 0
+        self.quarantine_file: Optional[str] = None
+        self.issues: List[Dict[str, Any]] = []
+
+    @property
+    def ok(self) -> bool:
+        """Все ли записи прошли проверку."""
+        return not self.issues
+
+    def add(self, path: str, error: str, record: Any) -> None:
+        """
+        Добавление отбракованной записи.
+
+        Args:
+            path: JSON-путь к ошибочному значению
+            error: Описание ошибки
+            record: Отбракованная запись (работник или цех целиком)
+        """
+        self.issues.append({"path": path, "error": error, "record": record})
+
+    def extend(self, other: "LoadReport") -> None:
+        """Добавление результатов другого отчета (проверки части файла)."""
+        self.workshops += other.workshops
+        self.employees += other.employees
+        self.issues.extend(other.issues)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Отчет в виде словаря (без самих записей)."""
+        return {
+            "source": self.source,
+            "workshops": self.workshops,
+            "employees": self.employees,
+            "quarantined": len(self.issues),
+            "quarantine_file": self.quarantine_file,
+            "errors": [{"path": i["path"], "error": i["error"]} for i in self.issues],
+        }
+
+    def __str__(self) -> str:
+        text = f"Загружено цехов: {self.workshops}, работников: {self.employees}"
+        if self.issues:
+            text += f"; отбраковано записей: {len(self.issues)}"
+            if self.quarantine_file:
+                text += f" (см. {self.quarantine_file})"
+        return text
+
+
+def _is_text(value: Any) -> bool:
+    return isinstance(value, str) and bool(value)
+
+
+def _is_age(value: Any) -> bool:
+    return type(value) is int and 0 <= value < 150
+
+
+def _is_gender(value: Any) -> bool:
+    return isinstance(value, str) and value in GENDERS
+
+
+# Поля записи работника: (поле, проверка, описание ошибки)
+EMPLOYEE_FIELDS = (
+    ("id", _is_text, "ожидается непустая строка"),
+    ("name", _is_text, "ожидается непустая строка"),
+    ("surname", _is_text, "ожидается непустая строка"),
+    ("age", _is_age, "ожидается целое число от 0 до 149"),
+    ("gender", _is_gender, f"ожидается одно из {sorted(GENDERS)}"),
+)
+
+# Проверка поля по имени: (проверка, описание ошибки)
+FIELD_CHECKS = {field: (check, message) for field, check, message in EMPLOYEE_FIELDS}
+
+
+def check_field(field: str, value: Any) -> Optional[str]:
+    """
+    Проверка значения поля работника по правилам загрузки.
+
+    Те же правила применяются при вводе (меню, сервер): запись, которую
+    приложение создало, не отбраковывается при следующей загрузке.
+
+    Args:
+        field: Имя поля из EMPLOYEE_FIELDS
+        value: Значение поля
+
+    Returns:
+        None или описание ошибки
+    """
+    check, message = FIELD_CHECKS[field]
+    if check(value):
+        return None
+    return f"{message}, получено {value!r}"
+
+
+def check_employee(record: Any) -> Optional[Tuple[str, str]]:
+    """
+    Проверка данных нового работника (ID может отсутствовать: он назначается при создании).
+
+    Args:
+        record: Словарь с полями работника
+
+    Returns:
+        None или (поле, ошибка)
+    """
+    if not isinstance(record, dict):
+        return "", "ожидается объект"
+    for field in FIELD_CHECKS:
+        if field not in record:
+            if field == "id":
+                continue
+            return field, "поле отсутствует"
+        error = check_field(field, record[field])
+        if error is not None:
+            return field, error
+    return None
+
+
+def check_workshop_name(name: Any) -> Optional[str]:
+    """
+    Проверка названия цеха.
+
+    Args:
+        name: Название цеха
+
+    Returns:
+        None или описание ошибки
+    """
+    if _is_text(name):
+        return None
+    return f"ожидается непустая строка, получено {name!r}"
+
+
+def compile_validator(emp_type: str) -> Validator:
+    """
+    Сборка функции проверки записей работника заданного типа.
+
+    Кроме общих полей проверяются производные поля типа ("post", "role"):
+    если они есть в записи, они должны совпадать с должностью и
+    специализацией класса.
+
+    Args:
+        emp_type: Имя класса работника
+
+    Returns:
+        Функция validate(record) -> None или (поле, ошибка)
+    """
+    checks = EMPLOYEE_FIELDS
+    # Должность и специализация берутся у образца класса
+    sample = EMPLOYEE_TYPES[emp_type]("-", "-", 0, Gender.MALE, "-").get_info()
+    derived = tuple((field, sample[field]) for field in ("post", "role") if field in sample)
+
+    def validate(record: Any) -> Optional[Tuple[str, str]]:
+        if not isinstance(record, dict):
+            return "", "ожидается объект"
+        for field, check, message in checks:
+            if field not in record:
+                return field, "поле отсутствует"
+            if not check(record[field]):
+                return field, f"{message}, получено {record[field]!r}"
+        if record.get("type", emp_type) != emp_type:
+            return "type", f"ожидается {emp_type!r}, получено {record['type']!r}"
+        for field, expected in derived:
+            if field in record and record[field] != expected:
+                return field, f"для {emp_type} ожидается {expected!r}, получено {record[field]!r}"
+        return None
+
+    return validate
+
+
+# Проверки собираются один раз для всех известных типов
+VALIDATORS: Dict[str, Validator] = {name: compile_validator(name) for name in EMPLOYEE_TYPES}
+
+
+def _field_path(path: str, field: str) -> str:
+    return f"{path}.{field}" if field else path
+
+
+def validate_workshop(data: Any, index: int, report: LoadReport) -> Optional[Dict[str, Any]]:
+    """
+    Проверка записи цеха.
+
+    Ошибочные работники исключаются из цеха и попадают в отчет; цех с
+    ошибочным названием или начальником отбраковывается целиком.
+
+    Args:
+        data: Запись цеха из файла
+        index: Номер цеха в файле
+        report: Отчет для результатов проверки
+
+    Returns:
+        Запись цеха только с корректными работниками или None
+    """
+    path = f"$.workshops[{index}]"
+    if not isinstance(data, dict):
+        report.add(path, "ожидается объект", data)
+        return None
+    error = check_workshop_name(data.get("name"))
+    if error is not None:
+        report.add(f"{path}.name", error, data)
+        return None
+    error = VALIDATORS["Chief"](data.get("chief"))
+    if error is not None:
+        report.add(_field_path(f"{path}.chief", error[0]), error[1], data)
+        return None
+    staff = data.get("employees", [])
+    if not isinstance(staff, list):
+        report.add(f"{path}.employees", "ожидается список", data)
+        return None
+
+    bad = None
+    for i, record in enumerate(staff):
+        if not isinstance(record, dict):
+            error = ("", "ожидается объект")
+        else:
+            validator = VALIDATORS.get(record.get("type"))
+            if validator is None:
+                error = ("type", f"неизвестный тип работника {record.get('type')!r}")
+            else:
+                error = validator(record)
+        if error is not None:
+            if bad is None:
+                bad = set()
+            bad.add(i)
+            report.add(_field_path(f"{path}.employees[{i}]", error[0]), error[1], record)
+
+    if bad is not None:
+        # Копия записи без отбракованных работников (исходный словарь не меняется)
+        data = dict(data, employees=[r for i, r in enumerate(staff) if i not in bad])
+    report.workshops += 1
+    report.employees += len(data.get("employees", []))
+    return data
+
+
+def validate_data(data: Any, source: str = "") -> Tuple[List[Dict[str, Any]], LoadReport]:
+    """
+    Проверка всех записей файла данных за один проход.
+
+    Args:
+        data: Разобранное содержимое файла
+        source: Путь к файлу (для отчета)
+
+    Returns:
+        (корректные записи цехов, отчет)
+
+    Raises:
+        ValueError: Если файл не является данными завода (не объект или
+                    "workshops" не список)
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Файл данных должен содержать объект")
+    workshops = data.get("workshops", [])
+    if not isinstance(workshops, list):
+        raise ValueError('Поле "workshops" должно быть списком')
+
+    report = LoadReport(source)
+    clean = []
+    for index, workshop in enumerate(workshops):
+        workshop = validate_workshop(workshop, index, report)
+        if workshop is not None:
+            clean.append(workshop)
+    return clean, report
+
+
+def write_quarantine(path: str, report: LoadReport, version: int) -> None:
+    """
+    Дозапись отбракованных записей в файл карантина.
+
+    Файл - список записей о загрузках (как лог): записи прошлых загрузок
+    сохраняются. Повторная загрузка той же версии с теми же ошибками
+    новую запись не добавляет.
+
+    Args:
+        path: Путь к файлу карантина
+        report: Отчет проверки
+        version: Версия проверенного файла данных
+    """
+    entry = {
+        "source": report.source,
+        "version": version,
+        "timestamp": datetime.now().isoformat(),
+        "records": report.issues,
+    }
+    with FileLock(path):
+        entries = []
+        try:
+            with open_text(path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            entries = []
+        if isinstance(entries, dict):
+            # Файл прежнего формата: одна запись
+            entries = [entries]
+
+        last = entries[-1] if entries else {}
+        if (last.get("source"), last.get("version"), last.get("records")) != \
+                (entry["source"], entry["version"], entry["records"]):
+            entries.append(entry)
+            with atomic_write(path) as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+    report.quarantine_file = path
@@ -0,0 +1,309 @@
+import fcntl
+import json
+import os
+import threading
+from typing import Any, Iterator, List, Optional
+
+from employees import Employee, Gender
+from workers import EMPLOYEE_TYPES
+
+# Коды операций журнала (прием и увольнение: цех, затем один или несколько
+# работников / ID - список работников пишется одной записью)
+ADD_WORKSHOP = "aw"
+REMOVE_WORKSHOP = "rw"
+HIRE = "he"
+FIRE = "fe"
+CLEAR = "ce"
+CHIEF = "cc"
+
+_GENDERS = {g.value: g for g in Gender}
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_employee(employee: Employee) -> List[Any]:
+    """
+    Компактное представление работника для журнала.
+
+    Args:
+        employee: Работник
+
+    Returns:
+        Список [тип, id, имя, фамилия, возраст, пол]
+    """
+    return [
+        employee.__class__.__name__,
+        employee.get_id(),
+        employee.name,
+        employee.surname,
+        employee.age,
+        employee.gender.value
+    ]
+
+
+def decode_employee(record: List[Any]) -> Employee:
+    """
+    Восстановление работника из компактного представления.
+
+    Args:
+        record: Список [тип, id, имя, фамилия, возраст, пол]
+
+    Returns:
+        Работник соответствующего класса
+    """
+    emp_type, emp_id, name, surname, age, gender = record
+    return EMPLOYEE_TYPES[emp_type](name, surname, age, _GENDERS[gender], emp_id)
+
+
+def session_path(data_file: str) -> str:
+    """
+    Путь к журналу нового сеанса работы с файлом данных.
+
+    У каждого сеанса (процесса или объекта Factory) свой журнал
+    "<файл данных>.<pid>-<сеанс>.wal", поэтому сохранение в одном процессе
+    не удаляет несохраненные изменения других.
+
+    Args:
+        data_file: Путь к файлу данных
+
+    Returns:
+        Путь к файлу журнала
+    """
+    return f"{data_file}.{os.getpid()}-{os.urandom(4).hex()}.wal"
+
+
+def session_logs(data_file: str) -> List[str]:
+    """
+    Журналы всех сеансов файла данных (от старых к новым).
+
+    Args:
+        data_file: Путь к файлу данных
+
+    Returns:
+        Пути к файлам журналов (включая общий журнал "<файл данных>.wal"
+        прежних версий)
+    """
+    # glob нужен только при восстановлении: не загружается при каждом запуске
+    import glob
+
+    paths = glob.glob(glob.escape(data_file) + ".*.wal")
+    legacy = data_file + ".wal"
+    if os.path.exists(legacy):
+        paths.append(legacy)
+    return sorted(paths, key=_mtime)
+
+
+def _mtime(path: str) -> float:
+    """Время изменения файла (0, если файл уже удален)."""
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0
+
+
+class WriteAheadLog:
+    """
+    Журнал упреждающей записи (WAL) изменений завода.
+
+    Каждое изменение записывается одной строкой JSON до того, как оно
+    применяется к объектам в памяти. После сохранения снимка
+    (factory_data.json) журнал очищается; при запуске изменения из журнала
+    повторно применяются поверх последнего снимка.
+
+    Пока журнал открыт, сеанс держит блокировку "<журнал>.lock": журналы
+    без блокировки остались от завершившихся (или упавших) сеансов, и их
+    забирает себе восстановление (claim).
+    """
+
+    def __init__(self, path: str, sync: bool = False):
+        """
+        Инициализация журнала.
+
+        Args:
+            path: Путь к файлу журнала
+            sync: Выполнять fsync после каждой записи (защита от сбоя питания,
+                  а не только от падения процесса)
+        """
+        self.path = path
+        self.sync = sync
+        self.__file = None
+        self.__lock_fd: Optional[int] = None
+        self.__count = 0
+        # Запись и очистка могут выполняться из разных потоков (фоновое сохранение)
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Количество записей, добавленных с момента последней очистки."""
+        return self.__count
+
+    def append(self, *record) -> None:
+        """
+        Добавление записи в журнал.
+
+        Args:
+            *record: Код операции и ее аргументы
+        """
+        line = _ENCODER.encode(record) + "\n"
+        with self.__lock:
+            self.__open()
+            self.__file.write(line)
+            self.__file.flush()
+            if self.sync:
+                os.fsync(self.__file.fileno())
+            self.__count += 1
+
+    def claim(self, path: str) -> int:
+        """
+        Перенос в журнал записей журнала завершившегося сеанса.
+
+        Журнал, блокировку которого держит работающий сеанс, пропускается.
+        Перенесенный журнал удаляется.
+
+        Args:
+            path: Путь к журналу другого сеанса
+
+        Returns:
+            Количество перенесенных записей
+        """
+        lock_path = path + ".lock"
+        try:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            return 0
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Журнал уже забрал другой сеанс
+                return 0
+            # Недописанная последняя строка отбрасывается, как при чтении
+            data = data[:data.rfind(b"\n") + 1]
+            with self.__lock:
+                self.__open()
+                self.__file.flush()
+                self.__file.buffer.write(data)
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+                claimed = data.count(b"\n")
+                self.__count += claimed
+            os.unlink(path)
+            os.unlink(lock_path)
+            return claimed
+        finally:
+            os.close(fd)
+
+    def position(self) -> int:
+        """Текущая позиция конца журнала (в байтах)."""
+        with self.__lock:
+            try:
+                return os.path.getsize(self.path)
+            except FileNotFoundError:
+                return 0
+
+    def discard(self, position: int) -> None:
+        """
+        Удаление записей до позиции (вошедших в сохраненный снимок).
+
+        Записи, добавленные после position, сохраняются.
+
+        Args:
+            position: Позиция из position()
+        """
+        with self.__lock:
+            self.__close()
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(position)
+                    rest = f.read()
+            except FileNotFoundError:
+                rest = b""
+            if rest:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(rest)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            elif os.path.exists(self.path):
+                os.unlink(self.path)
+            self.__count = rest.count(b"\n")
+
+    def read(self) -> Iterator[List[Any]]:
+        """
+        Чтение всех записей журнала.
+
+        Недописанная последняя строка (сбой во время записи) пропускается.
+
+        Yields:
+            Записи журнала в порядке добавления
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return
+        # Строка без перевода строки в конце недописана (как при claim)
+        end = text.rfind("\n")
+        if end < 0:
+            return
+        text = text[:end]
+
+        # Быстрый путь: весь журнал разбирается одним вызовом как массив JSON
+        # (переводы строк внутри записей JSON экранированы)
+        try:
+            yield from json.loads("[" + text.replace("\n", ",") + "]")
+            return
+        except ValueError:
+            pass
+
+        decode = json.loads
+        for line in text.split("\n"):
+            if not line:
+                continue
+            try:
+                yield decode(line)
+            except ValueError:
+                break
+
+    def truncate(self) -> None:
+        """Очистка журнала (после сохранения снимка)."""
+        with self.__lock:
+            self.__close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.__count = 0
+
+    def close(self) -> None:
+        """
+        Закрытие журнала и снятие блокировки сеанса.
+
+        Несохраненные записи остаются в файле: их заберет восстановление
+        следующего сеанса.
+        """
+        with self.__lock:
+            self.__close()
+            if self.__lock_fd is not None:
+                if not os.path.exists(self.path):
+                    # Журнал пуст: файл блокировки больше не нужен
+                    os.unlink(self.path + ".lock")
+                os.close(self.__lock_fd)
+                self.__lock_fd = None
+
+    def __open(self) -> None:
+        """Открытие файла журнала на дозапись с блокировкой сеанса (под блокировкой)."""
+        if self.__lock_fd is None:
+            fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            self.__lock_fd = fd
+        if self.__file is None:
+            self.__file = open(self.path, 'a', encoding='utf-8')
+
+    def __close(self) -> None:
+        """Закрытие файла журнала (под блокировкой)."""
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
@@ -1,22 +1,11 @@
 from typing import Dict, Any
 
-from employees import Worker, Gender
+from employees import Chief, Employee, Worker, Gender
 
 class Turner(Worker):
     """Класс токаря."""
 
-    def __init__(self, name: str, surname: str, age: int, gender: Gender):
-        """
-        Инициализация токаря.
-
-        Args:
-            name: Имя токаря
-            surname: Фамилия токаря
-            age: Возраст токаря
-            gender: Пол токаря
-        """
-        super().__init__(name, surname, age, gender)
-        self.__role = "Токарь"
+    __role = "Токарь"
 
     def get_role(self) -> str:
         """Получение специализации токаря."""
@@ -43,18 +32,7 @@ class Turner(Worker):
 class Locksmith(Worker):
     """Класс слесаря."""
 
-    def __init__(self, name: str, surname: str, age: int, gender: Gender):
-        """
-        Инициализация слесаря.
-
-        Args:
-            name: Имя слесаря
-            surname: Фамилия слесаря
-            age: Возраст слесаря
-            gender: Пол слесаря
-        """
-        super().__init__(name, surname, age, gender)
-        self.__role = "Слесарь"
+    __role = "Слесарь"
 
     def get_role(self) -> str:
         """Получение специализации слесаря."""
@@ -75,18 +53,7 @@ class Locksmith(Worker):
 class Miller(Worker):
     """Класс фрезеровщика."""
 
-    def __init__(self, name: str, surname: str, age: int, gender: Gender):
-        """
-        Инициализация фрезеровщика.
-
-        Args:
-            name: Имя фрезеровщика
-            surname: Фамилия фрезеровщика
-            age: Возраст фрезеровщика
-            gender: Пол фрезеровщика
-        """
-        super().__init__(name, surname, age, gender)
-        self.__role = "Фрезеровщик"
+    __role = "Фрезеровщик"
 
     def get_role(self) -> str:
         """Получение специализации фрезеровщика."""
@@ -101,4 +68,38 @@ class Miller(Worker):
         """
         info = super().get_info()
         info["role"] = self.__role
-        return info
\ No newline at end of file
+        return info
+
+
+EMPLOYEE_TYPES = {
+    "Chief": Chief,
+    "Turner": Turner,
+    "Locksmith": Locksmith,
+    "Miller": Miller,
+}
+
+
+def employee_from_dict(data: Dict[str, Any]) -> Employee:
+    """
+    Создание работника из словаря (результата to_dict).
+
+    Args:
+        data: Словарь с данными работника
+
+    Returns:
+        Работник соответствующего класса с восстановленным ID
+
+    Raises:
+        ValueError: Если тип работника неизвестен
+    """
+    emp_class = EMPLOYEE_TYPES.get(data.get("type"))
+    if emp_class is None:
+        raise ValueError(f"Неизвестный тип работника: {data.get('type')}")
+
+    return emp_class(
+        name=data["name"],
+        surname=data["surname"],
+        age=data["age"],
+        gender=Gender(data["gender"]),
+        employee_id=data.get("id")
+    )
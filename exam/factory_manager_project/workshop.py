@@ -1,10 +1,18 @@
-from typing import Any, List, Dict, Optional, Union
+from typing import Any, Callable, List, Dict, Optional, Union
 
 from employees import Chief, Employee, Worker
+from events import Event, EventBus, EventType
+from merkle import MODULUS, workshop_digest
+from storage import json_fragment
 
 class WorkShop():
     """Класс цеха."""
-    def __init__(self, name, chief: Chief, employees: List[Employee] = []):
+
+    # Кешированный хеш и узел-родитель (завод) в дереве хешей
+    _digest: Optional[int] = None
+    _merkle_parent = None
+
+    def __init__(self, name, chief: Chief, employees: Optional[List[Employee]] = None):
         """
         Инициализация цеха.
 
@@ -15,15 +23,111 @@ class WorkShop():
         """
         self.name = name
         self.__chief = chief
-        self.__employees = employees
+        self.__employees = employees if employees is not None else []
+        self.__journal: Optional[Callable[..., None]] = None
+        self.__distribution: Optional[Dict[str, int]] = None
+        self.__genders: Optional[Dict[str, int]] = None
+        self.events = EventBus()
+
+    def set_journal(self, journal: Optional[Callable[..., None]]) -> None:
+        """
+        Установка журнала изменений цеха.
+
+        Журнал вызывается как journal(workshop, op, *args) до применения
+        каждого изменения состава цеха; прием и увольнение списка работников
+        передаются одним вызовом со всеми работниками (ID) в args.
+
+        Args:
+            journal: Функция записи в журнал или None для отключения
+        """
+        self.__journal = journal
+
+    def __setattr__(self, key, value):
+        """Установка атрибута со сбросом хеша при переименовании цеха."""
+        object.__setattr__(self, key, value)
+        if key == "name":
+            self.invalidate_digest()
+
+    def invalidate_digest(self) -> None:
+        """Сброс хеша цеха и его родителя (вызывается при изменении цеха или работника)."""
+        if self._digest is not None:
+            self._digest = None
+            if self._merkle_parent is not None:
+                self._merkle_parent.invalidate_digest()
+
+    def digest(self) -> int:
+        """
+        Хеш содержимого цеха (дерево Меркла: начальник и работники).
+
+        Пересчитывается только после изменений; хеши неизменившихся
+        работников берутся из их кеша.
+        """
+        if self._digest is None:
+            total = 0
+            for employee in self.__employees:
+                employee._merkle_parent = self
+                total += employee.digest()
+            self.__chief._merkle_parent = self
+            self._digest = workshop_digest(self.name, self.__chief.digest(),
+                                           total % MODULUS, len(self.__employees))
+        return self._digest
+
+    def __record(self, op: str, *args) -> None:
+        """Запись изменения в журнал (если он установлен) и сброс кешей."""
+        if self.__journal is not None:
+            self.__journal(self, op, *args)
+        # Кеши сбрасываются после журнала: он может сохранить снимок и
+        # заново посчитать хеш по состоянию до изменения
+        self.__distribution = None
+        self.__genders = None
+        self.invalidate_digest()
+
+    def __notify(self, event_type: EventType, employees: List[Employee]) -> None:
+        """Публикация событий об изменении состава цеха (после применения)."""
+        if employees and self.events.has_listeners():
+            self.events.emit_many([Event(event_type, self.name, e) for e in employees])
+
+    def set_chief(self, chief: Chief) -> None:
+        """
+        Смена начальника цеха.
+
+        Args:
+            chief: Новый начальник цеха
+        """
+        if not isinstance(chief, Chief):
+            raise TypeError("Workshop chief must be Chief")
+        self.__record("chief", chief)
+        previous = self.__chief
+        self.__chief = chief
+        if self.events.has_listeners():
+            self.events.emit(Event(EventType.CHIEF_CHANGED, self.name, chief, previous=previous))
 
     def get_employees(self) -> List[Employee]:
         """Получение списка всех работников цеха."""
         return self.__employees.copy()
 
+    def get_employee_count(self) -> int:
+        """Получение количества работников цеха (без копирования списка)."""
+        return len(self.__employees)
+
+    def get_employees_slice(self, start: int, stop: int) -> List[Employee]:
+        """
+        Получение работников из диапазона позиций (для постраничного вывода).
+
+        Args:
+            start: Начальная позиция (включительно)
+            stop: Конечная позиция (не включительно)
+
+        Returns:
+            Список работников диапазона
+        """
+        return self.__employees[start:stop]
+
     def del_employees(self) -> None:
         """Очистка списка работников цеха."""
-        self.__employees = []
+        self.__record("clear")
+        removed, self.__employees = self.__employees, []
+        self.__notify(EventType.EMPLOYEE_REMOVED, removed)
 
     def remove_employee(self, identifier: Union[int, str]) -> bool:
         """
@@ -36,12 +140,15 @@ class WorkShop():
             True если удаление прошло успешно, иначе False
         """
         if isinstance(identifier, int) and 0 <= identifier < len(self.__employees):
-            self.__employees.pop(identifier)
+            self.__record("fire", self.__employees[identifier].get_id())
+            self.__notify(EventType.EMPLOYEE_REMOVED, [self.__employees.pop(identifier)])
             return True
         elif isinstance(identifier, str):
             for i, employee in enumerate(self.__employees):
                 if employee.get_id() == identifier:
+                    self.__record("fire", identifier)
                     self.__employees.pop(i)
+                    self.__notify(EventType.EMPLOYEE_REMOVED, [employee])
                     return True
         return False
 
@@ -72,7 +179,7 @@ class WorkShop():
         Returns:
             Новый цех с добавленными работниками
         """
-        if isinstance(other, List) and all(isinstance(i, Employee) for i in other):
+        if isinstance(other, list) and all(isinstance(i, Employee) for i in other):
             new_employees = self.get_employees().copy()
             new_employees.extend(other)
             new_workshop = WorkShop(self.name, self.__chief, new_employees)
@@ -95,11 +202,17 @@ class WorkShop():
         Returns:
             Текущий цех с добавленными работниками
         """
-        if isinstance(other, List) and all(isinstance(i, Employee) for i in other):
+        if isinstance(other, list) and all(isinstance(i, Employee) for i in other):
+            # Весь список - одна запись журнала: снимок не попадет посреди приема
+            if other:
+                self.__record("hire", *other)
             self.__employees.extend(other)
+            self.__notify(EventType.EMPLOYEE_HIRED, other)
             return self
         elif isinstance(other, Employee):
+            self.__record("hire", other)
             self.__employees.append(other)
+            self.__notify(EventType.EMPLOYEE_HIRED, [other])
             return self
         else:
             raise TypeError("Workshop can only be added with Employee or list of Employees")
@@ -114,8 +227,8 @@ class WorkShop():
         Returns:
             Новый цех без удаленных работников
         """
-        if isinstance(other, List) and all(isinstance(i, Employee) for i in other):
-            ids = [i.get_id for i in other]
+        if isinstance(other, list) and all(isinstance(i, Employee) for i in other):
+            ids = [i.get_id() for i in other]
             employees = []
             for employee in self.__employees:
                 if not employee.get_id() in ids:
@@ -140,43 +253,64 @@ class WorkShop():
         Returns:
             Текущий цех без удаленных работников
         """
-        if isinstance(other, List) and all(isinstance(i, Employee) for i in other):
-            ids = [i.get_id for i in other]
-            for i, employee in enumerate(self.__employees):
+        if isinstance(other, list) and all(isinstance(i, Employee) for i in other):
+            ids = {i.get_id() for i in other}
+            employees = []
+            removed = []
+            for employee in self.__employees:
                 if employee.get_id() in ids:
-                    self.__employees.pop(i)
-        if isinstance(other, Employee):
+                    removed.append(employee)
+                else:
+                    employees.append(employee)
+            if removed:
+                self.__record("fire", *[e.get_id() for e in removed])
+            self.__employees = employees
+            self.__notify(EventType.EMPLOYEE_REMOVED, removed)
+            return self
+        elif isinstance(other, Employee):
             for i, employee in enumerate(self.__employees):
                 if employee.get_id() == other.get_id():
+                    self.__record("fire", employee.get_id())
                     self.__employees.pop(i)
+                    self.__notify(EventType.EMPLOYEE_REMOVED, [employee])
                     break
+            return self
         else:
             raise TypeError("Workshop can only be subtracted with Employee or list of Employees")
 
     def get_employees_by_role(self) -> Dict[str, int]:
-        """Получение распределения работников по специализациям."""
-        distribution = {}
-        for employee in self.__employees:
-            if isinstance(employee, Worker):
-                role = employee.get_role()
-                distribution[role] = distribution.get(role, 0) + 1
-            else:
-                post = employee.get_post()
-                distribution[post] = distribution.get(post, 0) + 1
-        return distribution
+        """Получение распределения работников по специализациям (кешируется до изменения состава)."""
+        if self.__distribution is None:
+            distribution = {}
+            for employee in self.__employees:
+                if isinstance(employee, Worker):
+                    role = employee.get_role()
+                    distribution[role] = distribution.get(role, 0) + 1
+                else:
+                    post = employee.get_post()
+                    distribution[post] = distribution.get(post, 0) + 1
+            self.__distribution = distribution
+        return self.__distribution.copy()
+
+    def get_employees_by_gender(self) -> Dict[str, int]:
+        """Получение распределения работников по полу (кешируется до изменения состава)."""
+        if self.__genders is None:
+            genders = {}
+            for employee in self.__employees:
+                gender = employee.gender.value
+                genders[gender] = genders.get(gender, 0) + 1
+            self.__genders = genders
+        return self.__genders.copy()
 
     def __str__(self) -> str:
         """Строковое представление цеха."""
-        employees_by_role = self.get_employees_by_role()
-
-        result = f"Цех: {self.name}\n"
-        result += f"Начальник: {self.__chief}\n"
-        result += f"Общее количество работников: {len(self.__employees)}\n"
-
-        for role, count in employees_by_role.items():
-            result += f"  {role}: {count}\n"
-
-        return result
+        lines = [
+            f"Цех: {self.name}",
+            f"Начальник: {self.__chief}",
+            f"Общее количество работников: {len(self.__employees)}"
+        ]
+        lines += [f"  {role}: {count}" for role, count in self.get_employees_by_role().items()]
+        return "\n".join(lines) + "\n"
 
     def __eq__(self, value):
         """
@@ -289,4 +423,35 @@ class WorkShop():
             "employees": [e.to_dict() for e in self.__employees],
             "employee_count": len(self.__employees),
             "distribution": self.get_employees_by_role()
-        }
\ No newline at end of file
+        }
+
+    def to_json(self, indent: int = 0) -> str:
+        """
+        JSON-представление цеха в формате файла данных (как json.dump(to_dict(), indent=2)).
+
+        Собирается из кешированных JSON-фрагментов работников, поэтому для
+        неизменившихся работников это только склейка строк.
+
+        Args:
+            indent: Отступ строки, на которой начинается объект
+
+        Returns:
+            JSON-текст цеха
+        """
+        pad = " " * (indent + 2)
+        if self.__employees:
+            item_pad = pad + "  "
+            separator = ",\n" + item_pad
+            employees = ("[\n" + item_pad
+                         + separator.join(e.to_json(indent + 4) for e in self.__employees)
+                         + "\n" + pad + "]")
+        else:
+            employees = "[]"
+        return "".join((
+            "{\n", pad, '"name": ', json_fragment(self.name), ",\n",
+            pad, '"chief": ', self.__chief.to_json(indent + 2), ",\n",
+            pad, '"employees": ', employees, ",\n",
+            pad, '"employee_count": ', str(len(self.__employees)), ",\n",
+            pad, '"distribution": ', json_fragment(self.get_employees_by_role(), indent + 2), "\n",
+            " " * indent, "}"
+        ))
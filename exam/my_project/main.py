@@ -1,7 +1,7 @@
 from notes_manager import NotesManager
 
 if __name__ == "__main__":
-    manager = NotesManager()
+    manager = NotesManager(journal=True)
 
     results = manager.search_notes("демо")
     print(f"Найдено заметок: {len(results)}")
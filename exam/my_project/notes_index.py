@@ -0,0 +1,103 @@
+import json
+import re
+from bisect import bisect_left, insort
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Разбиение текста на слова без учета регистра (ё и е не различаются)"""
+    return WORD.findall(text.casefold().replace("ё", "е"))
+
+
+class NotesIndex:
+    """Инвертированный индекс заметок: слово заголовка или содержания -> ID заметок"""
+
+    def __init__(self):
+        self.postings = {}
+        # Слова индекса по алфавиту для поиска по началу слова
+        self.words = []
+
+    @staticmethod
+    def note_words(note):
+        """Слова заголовка и содержания заметки"""
+        return set(tokenize(note["title"])) | set(tokenize(note["content"]))
+
+    def add(self, note):
+        """Добавление заметки в индекс"""
+        for word in self.note_words(note):
+            ids = self.postings.get(word)
+            if ids is None:
+                ids = self.postings[word] = set()
+                insort(self.words, word)
+            ids.add(note["id"])
+
+    def remove(self, note):
+        """Удаление заметки из индекса"""
+        for word in self.note_words(note):
+            ids = self.postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(note["id"])
+            if not ids:
+                del self.postings[word]
+                del self.words[bisect_left(self.words, word)]
+
+    def matching(self, term):
+        """ID заметок со словами, начинающимися с term"""
+        ids = set()
+        i = bisect_left(self.words, term)
+        while i < len(self.words) and self.words[i].startswith(term):
+            ids |= self.postings[self.words[i]]
+            i += 1
+        return ids
+
+    def search(self, query, mode="and"):
+        """
+        Поиск заметок по словам запроса.
+
+        mode="and" - заметки, где есть все слова запроса, mode="or" - хотя бы одно.
+        Слово запроса совпадает со словами заметки, которые с него начинаются.
+        Возвращает множество ID или None, если в запросе нет слов.
+        """
+        if mode not in ("and", "or"):
+            raise ValueError(f"Неизвестный режим поиска: {mode}")
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return None
+        result = None
+        for term in terms:
+            ids = self.matching(term)
+            if result is None:
+                result = ids
+            elif mode == "and":
+                result &= ids
+            else:
+                result |= ids
+            if mode == "and" and not result:
+                break
+        return result
+
+    def save(self, filename, stamp):
+        """Сохранение индекса в JSON файл с отметкой файла заметок, по которому он построен"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                "stamp": stamp,
+                "postings": {word: sorted(self.postings[word]) for word in self.words}
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename, stamp):
+        """Загрузка индекса; None, если файла нет, он поврежден или построен по другой версии заметок"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("stamp") != stamp:
+            return None
+        index = cls()
+        # Слова записываются по алфавиту, поэтому список слов не сортируется заново
+        index.postings = {word: set(ids) for word, ids in data["postings"].items()}
+        index.words = list(index.postings)
+        return index
@@ -2,10 +2,57 @@ import json
 import os
 from datetime import datetime
 
+from notes_index import NotesIndex
+
 class NotesManager:
-    def __init__(self, filename="notes.json"):
+    def __init__(self, filename="notes.json", journal=False, compact_min=1000, compact_ratio=0.5):
+        """
+        journal=True - режим журнала: добавления и удаления дописываются в
+        файл <имя>.journal, а notes.json перезаписывается только при сжатии
+        журнала - когда записей в нем не меньше compact_min и доли
+        compact_ratio от числа заметок (или при вызове save_notes).
+        """
         self.filename = filename
+        self.journal = journal
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self.journal_filename = os.path.splitext(filename)[0] + ".journal"
+        self._journal_records = 0
         self.notes = self.load_notes()
+        self._build_index()
+        self.index_filename = os.path.splitext(filename)[0] + ".index.json"
+        self.search_index = NotesIndex.load(self.index_filename, self._stamp())
+        if self.search_index is None:
+            self.search_index = NotesIndex()
+            for note in self._by_id.values():
+                self.search_index.add(note)
+            if os.path.exists(self.filename):
+                self.search_index.save(self.index_filename, self._stamp())
+        self._replay()
+
+    def _stamp(self):
+        """Отметка версии файла заметок (размер и время изменения)"""
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _build_index(self):
+        """Индекс заметок по ID и позиций заметок в списке"""
+        self._by_id = {}
+        self._positions = {}
+        self._holes = 0
+        for position, note in enumerate(self.notes["notes"]):
+            self._by_id[note["id"]] = note
+            self._positions[note["id"]] = position
+
+    def _compact(self):
+        """Удаление пустых мест, оставшихся от удаленных заметок"""
+        if self._holes:
+            self.notes["notes"] = [note for note in self.notes["notes"] if note is not None]
+            self._positions = {note["id"]: position for position, note in enumerate(self.notes["notes"])}
+            self._holes = 0
 
     def load_notes(self):
         """Загрузка заметок из JSON файла"""
@@ -14,10 +61,67 @@ class NotesManager:
                 return json.load(f)
         return {"notes": [], "last_id": 0}
 
+    def _replay(self):
+        """Применение журнала к загруженному снимку (недописанная последняя запись отбрасывается)"""
+        if not os.path.exists(self.journal_filename):
+            return
+        valid = 0
+        with open(self.journal_filename, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                if record["op"] == "add":
+                    # Запись уже вошла в снимок, если сжатие прервалось до очистки журнала
+                    if record["note"]["id"] > self.notes["last_id"]:
+                        self._insert(record["note"])
+                elif record["op"] == "delete":
+                    for note_id in record["ids"]:
+                        self._remove(note_id)
+                valid += len(line)
+                self._journal_records += 1
+        if valid < os.path.getsize(self.journal_filename):
+            with open(self.journal_filename, 'r+b') as f:
+                f.truncate(valid)
+        if not self.journal and self._journal_records:
+            self.save_notes()
+        else:
+            self._compact_if_needed()
+
+    def _append(self, record):
+        """Дозапись изменения в журнал"""
+        with open(self.journal_filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._journal_records += 1
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        """Сжатие журнала в снимок, когда журнал стал большим относительно архива"""
+        if self._journal_records >= max(self.compact_min, self.compact_ratio * len(self._by_id)):
+            self.save_notes()
+
     def save_notes(self):
-        """Сохранение заметок в JSON файл"""
-        with open(self.filename, 'w', encoding='utf-8') as f:
+        """Сохранение заметок в JSON файл (в режиме журнала - сжатие журнала в снимок)"""
+        self._compact()
+        temp = self.filename + ".tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
             json.dump(self.notes, f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.filename)
+        self.search_index.save(self.index_filename, self._stamp())
+        if os.path.exists(self.journal_filename):
+            os.remove(self.journal_filename)
+        self._journal_records = 0
+
+    def _insert(self, note):
+        """Добавление заметки в список и индексы"""
+        self._positions[note["id"]] = len(self.notes["notes"])
+        self._by_id[note["id"]] = note
+        self.notes["notes"].append(note)
+        self.search_index.add(note)
+        self.notes["last_id"] = max(self.notes["last_id"], note["id"])
 
     def add_note(self, title, content, tags=None):
         """Добавление новой заметки"""
@@ -29,17 +133,16 @@ class NotesManager:
             "created": datetime.now().strftime("%Y-%m-%d"),
             "tags": tags or []
         }
-        self.notes["notes"].append(note)
-        self.notes["last_id"] = new_id
-        self.save_notes()
+        self._insert(note)
+        if self.journal:
+            self._append({"op": "add", "note": note})
+        else:
+            self.save_notes()
         return new_id
 
     def get_note(self, note_id):
         """Поиск заметки по ID"""
-        for note in self.notes["notes"]:
-            if note["id"] == note_id:
-                return note
-        return None
+        return self._by_id.get(note_id)
 
     def display_note(self, note, width=70):
         """Отображение одной заметки в терминале"""
@@ -73,24 +176,54 @@ class NotesManager:
     def display_all(self):
         """Отображение всех заметок в терминале"""
         for note in self.notes["notes"]:
-            self.display_note(note)
+            if note is not None:
+                self.display_note(note)
+
+    def _remove(self, note_id):
+        """Удаление заметки из индекса и списка (место в списке остается пустым до сжатия)"""
+        note = self._by_id.pop(note_id, None)
+        if note is None:
+            return False
+        self.search_index.remove(note)
+        self.notes["notes"][self._positions.pop(note_id)] = None
+        self._holes += 1
+        if self._holes * 2 > len(self.notes["notes"]):
+            self._compact()
+        return True
 
     def delete_note(self, note_id):
         """Удаление заметки по ID"""
-        self.notes["notes"] = [
-            note for note in self.notes["notes"]
-            if note["id"] != note_id
-        ]
-        self.save_notes()
-
-    def search_notes(self, keyword):
-        """Поиск заметок по ключевому слову"""
-        results = []
-        for note in self.notes["notes"]:
-            if (keyword.lower() in note["title"].lower() or
-                keyword.lower() in note["content"].lower()):
-                results.append(note)
-        return results
+        deleted = self._remove(note_id)
+        if deleted:
+            self._save_deletion([note_id])
+        return deleted
+
+    def delete_notes(self, ids):
+        """Удаление нескольких заметок по ID с одним сохранением"""
+        removed = [note_id for note_id in ids if self._remove(note_id)]
+        if removed:
+            self._save_deletion(removed)
+        return len(removed)
+
+    def _save_deletion(self, ids):
+        """Сохранение удаления: запись в журнал или перезапись файла"""
+        if self.journal:
+            self._append({"op": "delete", "ids": ids})
+        else:
+            self.save_notes()
+
+    def search_notes(self, keyword, mode="and"):
+        """
+        Поиск заметок по словам заголовка и содержания.
+
+        Слова ищутся в инвертированном индексе без учета регистра и по началу
+        слова ("демо" находит "демонстрация"). mode="and" - заметки со всеми
+        словами запроса, mode="or" - хотя бы с одним.
+        """
+        ids = self.search_index.search(keyword, mode)
+        if ids is None:
+            return [note for note in self.notes["notes"] if note is not None]
+        return [self._by_id[note_id] for note_id in sorted(ids)]
 
     def console_control(self):
         print("=" * 60)